@@ -0,0 +1,37 @@
+"""catalog listing query indexes
+
+Revision ID: 5b0fb6a2c7e4
+Revises: d6c2334f4816
+Create Date: 2026-10-18 20:15:41.512604
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b0fb6a2c7e4"
+down_revision = "d6c2334f4816"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE INDEX ix_catalog_listing_seller_id ON catalog_listing ((data ->> 'seller_id'))"
+    )
+    op.execute(
+        "CREATE INDEX ix_catalog_listing_status ON catalog_listing ((data ->> 'status'))"
+    )
+    op.execute(
+        "CREATE INDEX ix_catalog_listing_title ON catalog_listing ((data ->> 'title'), id)"
+    )
+    op.execute(
+        "CREATE INDEX ix_catalog_listing_ask_price_amount ON catalog_listing "
+        "((CAST(data #>> '{ask_price, amount}' AS NUMERIC)), id)"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_catalog_listing_ask_price_amount", table_name="catalog_listing")
+    op.drop_index("ix_catalog_listing_title", table_name="catalog_listing")
+    op.drop_index("ix_catalog_listing_status", table_name="catalog_listing")
+    op.drop_index("ix_catalog_listing_seller_id", table_name="catalog_listing")
@@ -0,0 +1,41 @@
+"""listing versions
+
+Revision ID: c3a9e5b1d2f7
+Revises: 8e1d4c7a9f30
+Create Date: 2026-10-18 20:41:03.114862
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3a9e5b1d2f7"
+down_revision = "8e1d4c7a9f30"
+branch_labels = None
+depends_on = None
+
+
+def get_listing_tables():
+    # bidding_listing is not created by migrations, but by `Base.metadata.create_all`
+    existing_tables = sa.inspect(op.get_bind()).get_table_names()
+    return [
+        table_name
+        for table_name in ["catalog_listing", "bidding_listing"]
+        if table_name in existing_tables
+    ]
+
+
+def upgrade():
+    # existing rows start with version 1, new rows get their versions from the ORM
+    for table_name in get_listing_tables():
+        op.add_column(
+            table_name,
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        )
+        op.alter_column(table_name, "version", server_default=None)
+
+
+def downgrade():
+    for table_name in get_listing_tables():
+        op.drop_column(table_name, "version")
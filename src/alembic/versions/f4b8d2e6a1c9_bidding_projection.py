@@ -0,0 +1,67 @@
+"""bidding projection
+
+Read models of bidding listings, which are empty after the upgrade, so they should be
+generated from existing listings with RebuildBiddingProjectionCommand.
+
+Revision ID: f4b8d2e6a1c9
+Revises: c3a9e5b1d2f7
+Create Date: 2026-10-18 21:02:41.518203
+
+"""
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f4b8d2e6a1c9"
+down_revision = "c3a9e5b1d2f7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "bidding_details",
+        sa.Column(
+            "listing_id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            nullable=False,
+        ),
+        sa.Column("current_price", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column(
+            "highest_bidder_id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            nullable=True,
+        ),
+        sa.Column("number_of_bids", sa.Integer(), nullable=False),
+        sa.Column("ends_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("listing_id"),
+    )
+    op.create_table(
+        "bidding_bid",
+        sa.Column(
+            "listing_id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "bidder_id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            nullable=False,
+        ),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("placed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("listing_id", "bidder_id"),
+    )
+    op.create_index(
+        "ix_bidding_bid_listing_id_amount", "bidding_bid", ["listing_id", "amount"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_bidding_bid_listing_id_amount", table_name="bidding_bid")
+    op.drop_table("bidding_bid")
+    op.drop_table("bidding_details")
@@ -6,6 +6,8 @@ from lato import Application, TransactionContext
 
 from modules.iam.application.services import IamService
 from modules.iam.domain.entities import User
+from seedwork.application.execution import MessageExecutor
+from seedwork.application.unit_of_work import UnitOfWork
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -14,17 +16,37 @@ async def get_application(request: Request) -> Application:
     return request.state.lato_application
 
 
+async def get_message_executor(request: Request) -> MessageExecutor:
+    return request.state.message_executor
+
+
+async def get_unit_of_work(
+    executor: Annotated[MessageExecutor, Depends(get_message_executor)],
+) -> UnitOfWork:
+    """
+    Creates a unit of work for each request, shared by the route and its dependencies (i.e. an authentication lookup).
+    Changes are committed at commit points of the route and when the request succeeds.
+    """
+    async with UnitOfWork(executor, request_scoped=True) as uow:
+        yield uow
+
+
 async def get_transaction_context(
-    app: Annotated[Application, Depends(get_application)],
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
 ) -> TransactionContext:
-    """Creates a new transaction context for each request"""
-    async with app.transaction_context() as ctx:
-        yield ctx
+    """Returns the transaction context of the unit of work of a request"""
+    return uow.ctx
 
 
 async def get_authenticated_user(
     access_token: Annotated[str, Depends(oauth2_scheme)],
-    ctx: Annotated[TransactionContext, Depends(get_transaction_context)],
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
 ) -> User:
-    current_user = ctx[IamService].find_user_by_access_token(access_token)
+    iam_service = uow.ctx[IamService]
+    found, current_user = iam_service.find_cached_user_by_access_token(access_token)
+    if not found:
+        # a cache miss reads the user with the blocking session of the unit of work
+        current_user = await uow.run_blocking(
+            iam_service.find_user_by_access_token, access_token
+        )
     return current_user
@@ -12,11 +12,16 @@ from seedwork.domain.exceptions import DomainException, EntityNotFoundException
 from seedwork.infrastructure.database import Base
 from seedwork.infrastructure.logging import LoggerFactory, logger
 
+config = ApiConfig()
+
 # configure logger prior to first usage
-LoggerFactory.configure(logger_name="api")
+LoggerFactory.configure(
+    logger_name="api",
+    queue_size=config.LOG_QUEUE_SIZE,
+    debug_sample_rate=config.LOG_DEBUG_SAMPLE_RATE,
+)
 
 # dependency injection container
-config = ApiConfig()
 container = ApplicationContainer(config=config)
 db_engine = container.db_engine()
 logger.info(f"using db engine {db_engine}, creating tables")
@@ -84,9 +89,42 @@ async def entity_not_found_exception_handler(
     )
 
 
+if config.OUTBOX_ENABLED:
+
+    @app.on_event("startup")
+    def start_outbox_relay():
+        container.outbox_relay().start()
+
+    @app.on_event("shutdown")
+    def stop_outbox_relay():
+        container.outbox_relay().stop()
+
+
+if config.DATABASE_REPLICA_URL:
+
+    @app.on_event("startup")
+    def start_replica_lag_monitor():
+        container.replica_lag_monitor().start()
+
+    @app.on_event("shutdown")
+    def stop_replica_lag_monitor():
+        container.replica_lag_monitor().stop()
+
+
+@app.on_event("shutdown")
+def shutdown_container():
+    container.shutdown_resources()
+
+
+@app.on_event("shutdown")
+def flush_logs():
+    LoggerFactory.shutdown()
+
+
 @app.middleware("http")
 async def add_lato_application(request: Request, call_next):
     request.state.lato_application = container.application()
+    request.state.message_executor = container.message_executor()
     return await call_next(request)
 
 
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -9,7 +10,7 @@ class BidReadModel(BaseModel):
     amount: float
     currency: str
     bidder_id: GenericUUID
-    bidder_username: str
+    bidder_username: Optional[str] = None  # usernames are not known in the bidding context
     
     class Config:
         arbitrary_types_allowed = True
@@ -19,6 +20,10 @@ class BiddingResponse(BaseModel):
     listing_id: GenericUUID
     auction_status: str = "active"  # active, ended
     auction_end_date: datetime
+    current_price: float
+    currency: str
+    highest_bidder_id: Optional[GenericUUID]
+    number_of_bids: int
     bids: list[BidReadModel]
     
     class Config:
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel
@@ -33,3 +34,4 @@ class ListingReadModel(BaseModel):
 
 class ListingIndexModel(BaseModel):
     data: list[ListingReadModel]
+    next_cursor: Optional[str] = None
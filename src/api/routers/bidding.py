@@ -1,13 +1,13 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
-from lato import Application
 
-from api.dependencies import get_application
-from api.models.bidding import BiddingResponse, PlaceBidRequest
+from api.dependencies import MessageExecutor, get_message_executor
+from api.models.bidding import BiddingResponse, BidReadModel, PlaceBidRequest
 from config.container import inject
 from modules.bidding.application.command import PlaceBidCommand, RetractBidCommand
 from modules.bidding.application.query.get_bidding_details import GetBiddingDetails
+from modules.bidding.application.query.model_mappers import ListingDAO
 
 router = APIRouter()
 
@@ -16,21 +16,34 @@ Inspired by https://developer.ebay.com/api-docs/buy/offer/types/api:Bidding
 """
 
 
+def to_bidding_response(result: ListingDAO) -> BiddingResponse:
+    return BiddingResponse(
+        listing_id=result.id,
+        auction_end_date=result.ends_at,
+        current_price=result.current_price,
+        currency=result.currency,
+        highest_bidder_id=result.highest_bidder_id,
+        number_of_bids=result.number_of_bids,
+        bids=[
+            BidReadModel(
+                amount=bid.amount, currency=bid.currency, bidder_id=bid.bidder_id
+            )
+            for bid in result.bids
+        ],
+    )
+
+
 @router.get("/bidding/{listing_id}", tags=["bidding"], response_model=BiddingResponse)
 @inject
 async def get_bidding_details_of_listing(
-    listing_id, app: Annotated[Application, Depends(get_application)]
+    listing_id, executor: Annotated[MessageExecutor, Depends(get_message_executor)]
 ):
     """
     Shows listing details
     """
     query = GetBiddingDetails(listing_id=listing_id)
-    result = await app.execute_async(query)
-    return BiddingResponse(
-        listing_id=result.id,
-        auction_end_date=result.ends_at,
-        bids=result.bids,
-    )
+    result = await executor.execute(query)
+    return to_bidding_response(result)
 
 
 @router.post(
@@ -40,7 +53,7 @@ async def get_bidding_details_of_listing(
 async def place_bid(
     listing_id,
     request_body: PlaceBidRequest,
-    app: Annotated[Application, Depends(get_application)],
+    executor: Annotated[MessageExecutor, Depends(get_message_executor)],
 ):
     """
     Places a bid on a listing
@@ -52,16 +65,12 @@ async def place_bid(
         bidder_id=request_body.bidder_id,
         amount=request_body.amount,
     )
-    await app.execute_async(command)
+    await executor.execute(command)
     # execute_async, or execute?
 
     query = GetBiddingDetails(listing_id=listing_id)
-    result = await app.execute_async(query)
-    return BiddingResponse(
-        listing_id=result.id,
-        auction_end_date=result.ends_at,
-        bids=result.bids,
-    )
+    result = await executor.execute(query)
+    return to_bidding_response(result)
 
 
 @router.post(
@@ -71,7 +80,7 @@ async def place_bid(
 )
 @inject
 async def retract_bid(
-    listing_id, app: Annotated[Application, Depends(get_application)]
+    listing_id, executor: Annotated[MessageExecutor, Depends(get_message_executor)]
 ):
     """
     Retracts a bid from a listing
@@ -80,13 +89,8 @@ async def retract_bid(
         listing_id=listing_id,
         bidder_id="",
     )
-    app.execute(command)
+    await executor.execute(command)
 
     query = GetBiddingDetails(listing_id=listing_id)
-    query_result = app.execute_query(query)
-    payload = query_result.payload
-    return BiddingResponse(
-        listing_id=str(payload.id),
-        auction_end_date=payload.ends_at,
-        bids=payload.bids,
-    )
+    result = await executor.execute(query)
+    return to_bidding_response(result)
@@ -1,8 +1,15 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends
 
-from api.dependencies import Application, User, get_application, get_authenticated_user
+from api.dependencies import (
+    MessageExecutor,
+    UnitOfWork,
+    User,
+    get_authenticated_user,
+    get_message_executor,
+    get_unit_of_work,
+)
 from api.models.catalog import ListingIndexModel, ListingReadModel, ListingWriteModel
 from config.container import inject
 from modules.catalog.application.command import (
@@ -12,6 +19,8 @@ from modules.catalog.application.command import (
 )
 from modules.catalog.application.query.get_all_listings import GetAllListings
 from modules.catalog.application.query.get_listing_details import GetListingDetails
+from modules.catalog.application.query.listing_pages import ListingSortOrder
+from modules.catalog.domain.value_objects import ListingStatus
 from seedwork.domain.value_objects import GenericUUID, Money
 
 """
@@ -21,27 +30,74 @@ Inspired by https://developer.ebay.com/api-docs/sell/inventory/resources/offer/m
 router = APIRouter()
 
 
-@router.get("/catalog", tags=["catalog"], response_model=ListingIndexModel)
-async def get_all_listings(app: Annotated[Application, Depends(get_application)]):
+@router.get(
+    "/catalog",
+    tags=["catalog"],
+    response_model=ListingIndexModel,
+    response_model_exclude_none=True,
+)
+async def get_all_listings(
+    executor: Annotated[MessageExecutor, Depends(get_message_executor)],
+    seller_id: Optional[GenericUUID] = None,
+    sort: ListingSortOrder = ListingSortOrder.TITLE,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
     """
-    Shows all published listings in the catalog
+    Shows published listings in the catalog, a page at a time.
+    Use `next_cursor` of a response as a `cursor` to get the next page.
     """
-    query = GetAllListings()
-    result = await app.execute_async(query)
-    return dict(data=result)
+    query = GetAllListings(
+        seller_id=seller_id,
+        status=ListingStatus.PUBLISHED,
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+    )
+    page = await executor.execute(query)
+    return dict(data=page.items, next_cursor=page.next_cursor)
+
+
+@router.get(
+    "/catalog/mine",
+    tags=["catalog"],
+    response_model=ListingIndexModel,
+    response_model_exclude_none=True,
+)
+async def get_my_listings(
+    executor: Annotated[MessageExecutor, Depends(get_message_executor)],
+    current_user: Annotated[User, Depends(get_authenticated_user)],
+    status: Optional[ListingStatus] = None,
+    sort: ListingSortOrder = ListingSortOrder.TITLE,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """
+    Shows listings of the current user (drafts included, unless filtered by `status`), a page at a time.
+    Use `next_cursor` of a response as a `cursor` to get the next page.
+    """
+    query = GetAllListings(
+        seller_id=current_user.id,
+        status=status,
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+    )
+    page = await executor.execute(query)
+    return dict(data=page.items, next_cursor=page.next_cursor)
 
 
 @router.get("/catalog/{listing_id}", tags=["catalog"], response_model=ListingReadModel)
 @inject
 async def get_listing_details(
-    listing_id, app: Annotated[Application, Depends(get_application)]
+    listing_id, executor: Annotated[MessageExecutor, Depends(get_message_executor)]
 ):
     """
     Shows listing details
     """
     query = GetListingDetails(listing_id=listing_id)
-    query_result = await app.execute_async(query)
-    return dict(data=query_result.payload)
+    details = await executor.execute(query)
+    return details
 
 
 @router.post(
@@ -50,7 +106,7 @@ async def get_listing_details(
 @inject
 async def create_listing(
     request_body: ListingWriteModel,
-    app: Annotated[Application, Depends(get_application)],
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
     current_user: Annotated[User, Depends(get_authenticated_user)],
 ):
     """
@@ -63,11 +119,13 @@ async def create_listing(
         ask_price=Money(request_body.ask_price_amount, request_body.ask_price_currency),
         seller_id=current_user.id,
     )
-    app.execute(command)
+    await uow.execute(command)
+    await uow.commit()
 
     query = GetListingDetails(listing_id=command.listing_id)
-    query_result = app.execute_query(query)
-    return dict(query_result.payload)
+    # a replica may not have replayed the new listing yet
+    details = await uow.execute(query, read_your_writes=True)
+    return details
 
 
 @router.delete(
@@ -76,7 +134,7 @@ async def create_listing(
 @inject
 async def delete_listing(
     listing_id,
-    app: Annotated[Application, Depends(get_application)],
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
     current_user: Annotated[User, Depends(get_authenticated_user)],
 ):
     """
@@ -86,7 +144,8 @@ async def delete_listing(
         listing_id=listing_id,
         seller_id=current_user.id,
     )
-    await app.execute_async(command)
+    await uow.execute(command)
+    await uow.commit()
 
 
 @router.post(
@@ -98,7 +157,7 @@ async def delete_listing(
 @inject
 async def publish_listing(
     listing_id: GenericUUID,
-    app: Annotated[Application, Depends(get_application)],
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
     current_user: Annotated[User, Depends(get_authenticated_user)],
 ):
     """
@@ -108,8 +167,9 @@ async def publish_listing(
         listing_id=listing_id,
         seller_id=current_user.id,
     )
-    await app.execute_async(command)
+    await uow.execute(command)
+    await uow.commit()
 
     query = GetListingDetails(listing_id=listing_id)
-    response = await app.execute_async(query)
+    response = await uow.execute(query, read_your_writes=True)
     return response
@@ -1,6 +1,7 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 
 from api.dependencies import (
     Application,
@@ -8,17 +9,35 @@ from api.dependencies import (
     get_authenticated_user,
     get_application,
 )
+from seedwork.infrastructure.database import InstrumentedQueuePool
 
 from .iam import UserResponse
 
 router = APIRouter()
 
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def get_instrumented_pools(app: Application) -> dict[str, InstrumentedQueuePool]:
+    """Returns connection pools of database engines of the application, by engine name"""
+    pools = {}
+    for name, engine in [
+        ("primary", app["db_engine"]),
+        ("replica", app["replica_db_engine"]),
+    ]:
+        if engine is not None and isinstance(engine.pool, InstrumentedQueuePool):
+            pools[name] = engine.pool
+    return pools
+
 
 @router.get("/debug", tags=["diagnostics"])
 async def debug(
     app: Annotated[Application, Depends(get_application)],
     current_user: Annotated[User, Depends(get_authenticated_user)],
 ):
+    access_token_cache = app["access_token_cache"]
+    query_cache = app["query_cache"]
+    replica_lag_monitor = app["replica_lag_monitor"]
     return dict(
         app_id=id(app),
         name=app.name,
@@ -28,4 +47,24 @@ async def debug(
             username=current_user.username,
             access_token=current_user.access_token,
         ),
+        access_token_cache=access_token_cache.stats() if access_token_cache else None,
+        query_cache=query_cache.stats() if query_cache else None,
+        db_pools={
+            name: pool.status_dict()
+            for name, pool in get_instrumented_pools(app).items()
+        },
+        replica_lag=replica_lag_monitor.lag if replica_lag_monitor else None,
     )
+
+
+@router.get("/metrics", tags=["diagnostics"], response_class=PlainTextResponse)
+async def metrics(app: Annotated[Application, Depends(get_application)]):
+    """Metrics of message handlers and the database in Prometheus text format"""
+    handler_metrics = app["handler_metrics"]
+    text = handler_metrics.render() if handler_metrics else ""
+    for name, pool in get_instrumented_pools(app).items():
+        text += pool.render(engine=name)
+    replica_lag_monitor = app["replica_lag_monitor"]
+    if replica_lag_monitor is not None:
+        text += replica_lag_monitor.render()
+    return PlainTextResponse(text, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -4,7 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 
-from api.dependencies import TransactionContext, get_transaction_context
+from api.dependencies import (
+    TransactionContext,
+    UnitOfWork,
+    get_transaction_context,
+    get_unit_of_work,
+)
 from config.container import inject
 from modules.iam.application.exceptions import InvalidCredentialsException
 from modules.iam.application.services import IamService
@@ -32,13 +37,16 @@ class LoginResponse(BaseModel):
 @router.post("/token", tags=["iam"])
 @inject
 async def login(
-    ctx: Annotated[TransactionContext, Depends(get_transaction_context)],
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> LoginResponse:
     try:
-        iam_service = ctx[IamService]
-        user = iam_service.authenticate_with_name_and_password(
-            form_data.username, form_data.password
+        # reading the user, verifying the password and persisting a rehashed one block, so none of them
+        # runs on the event loop (bcrypt runs in worker processes of the hasher, if configured)
+        user = await uow.run_blocking(
+            uow.ctx[IamService].authenticate_with_name_and_password,
+            form_data.username,
+            form_data.password,
         )
     except InvalidCredentialsException:
         # TODO: automatically map application exceptions to HTTP exceptions
@@ -61,3 +61,7 @@ async def test_place_bid(app, api_client):
     response = api_client.post(url, json={"bidder_id": str(bidder_id), "amount": 11})
     json = response.json()
     assert response.status_code == 200
+    # the bid is shown in bidding details
+    assert json["highest_bidder_id"] == str(bidder_id)
+    assert json["number_of_bids"] == 1
+    assert [bid["bidder_id"] for bid in json["bids"]] == [str(bidder_id)]
@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import event
 
 from modules.catalog.application.command import (
     CreateListingDraftCommand,
@@ -7,6 +8,23 @@ from modules.catalog.application.command import (
 from seedwork.domain.value_objects import GenericUUID, Money
 
 
+async def create_published_listing(
+    app, listing_id, title, seller_id=GenericUUID(int=2)
+):
+    await app.execute_async(
+        CreateListingDraftCommand(
+            listing_id=listing_id,
+            title=title,
+            description="Bar",
+            ask_price=Money(10),
+            seller_id=seller_id,
+        )
+    )
+    await app.execute_async(
+        PublishListingDraftCommand(listing_id=listing_id, seller_id=seller_id)
+    )
+
+
 @pytest.mark.integration
 def test_empty_catalog_list(api_client):
     response = api_client.get("/catalog")
@@ -18,15 +36,7 @@ def test_empty_catalog_list(api_client):
 @pytest.mark.asyncio
 async def test_catalog_list_with_one_item(app, api_client):
     # arrange
-    await app.execute_async(
-        CreateListingDraftCommand(
-            listing_id=GenericUUID(int=1),
-            title="Foo",
-            description="Bar",
-            ask_price=Money(10),
-            seller_id=GenericUUID(int=2),
-        )
-    )
+    await create_published_listing(app, GenericUUID(int=1), "Foo")
 
     # act
     response = api_client.get("/catalog")
@@ -52,32 +62,47 @@ async def test_catalog_list_with_one_item(app, api_client):
 @pytest.mark.asyncio
 async def test_catalog_list_with_two_items(app, api_client):
     # arrange
-    await app.execute_async(
-        CreateListingDraftCommand(
-            listing_id=GenericUUID(int=1),
-            title="Foo #1",
-            description="Bar",
-            ask_price=Money(10),
-            seller_id=GenericUUID(int=2),
-        )
+    await create_published_listing(app, GenericUUID(int=1), "Foo #1")
+    await create_published_listing(app, GenericUUID(int=2), "Foo #2")
+
+    # act
+    response = api_client.get("/catalog")
+
+    # assert
+    assert response.status_code == 200
+    response_data = response.json()["data"]
+    assert len(response_data) == 2
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_catalog_list_shows_drafts_only_to_their_seller(
+    app, api_client, authenticated_api_client
+):
+    # arrange
+    current_user = authenticated_api_client.current_user
+    await create_published_listing(
+        app, GenericUUID(int=1), "Published", seller_id=current_user.id
     )
     await app.execute_async(
         CreateListingDraftCommand(
             listing_id=GenericUUID(int=2),
-            title="Foo #2",
+            title="Draft",
             description="Bar",
             ask_price=Money(10),
-            seller_id=GenericUUID(int=2),
+            seller_id=current_user.id,
         )
     )
 
     # act
-    response = api_client.get("/catalog")
+    public_listings = api_client.get("/catalog").json()["data"]
+    drafts = api_client.get("/catalog", params={"status": "draft"}).json()["data"]
+    my_listings = authenticated_api_client.get("/catalog/mine").json()["data"]
 
     # assert
-    assert response.status_code == 200
-    response_data = response.json()["data"]
-    assert len(response_data) == 2
+    assert [listing["title"] for listing in public_listings] == ["Published"]
+    assert [listing["title"] for listing in drafts] == ["Published"]
+    assert [listing["title"] for listing in my_listings] == ["Draft", "Published"]
 
 
 def test_catalog_create_draft_fails_due_to_incomplete_data(
@@ -106,6 +131,34 @@ async def test_catalog_delete_draft(app, authenticated_api_client):
     assert response.status_code == 204
 
 
+@pytest.mark.integration
+def test_catalog_create_draft_uses_one_connection(app, authenticated_api_client):
+    checkouts = []
+    db_engine = app["db_engine"]
+
+    def on_checkout(*args):
+        checkouts.append(args)
+
+    event.listen(db_engine, "checkout", on_checkout)
+    try:
+        response = authenticated_api_client.post(
+            "/catalog",
+            json=dict(
+                title="Foo",
+                description="Bar",
+                ask_price_amount=10,
+                ask_price_currency="USD",
+            ),
+        )
+    finally:
+        event.remove(db_engine, "checkout", on_checkout)
+
+    # the command and its read-back query are executed in a unit of work of the request
+    assert response.status_code == 201
+    assert response.json()["title"] == "Foo"
+    assert len(checkouts) == 1
+
+
 @pytest.mark.integration
 def test_catalog_delete_non_existing_draft_returns_404(authenticated_api_client):
     listing_id = GenericUUID(int=1)
@@ -160,3 +213,38 @@ async def test_published_listing_appears_in_biddings(app, authenticated_api_clie
     url = f"/bidding/{listing_id}"
     response = authenticated_api_client.get(url)
     assert response.status_code == 200
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_catalog_list_is_paginated(app, api_client):
+    # arrange
+    for i in range(1, 4):
+        await create_published_listing(app, GenericUUID(int=i), f"Foo #{i}")
+
+    # act
+    first_page = api_client.get("/catalog", params={"limit": 2}).json()
+    second_page = api_client.get(
+        "/catalog", params={"limit": 2, "cursor": first_page["next_cursor"]}
+    ).json()
+
+    # assert
+    assert [listing["title"] for listing in first_page["data"]] == ["Foo #1", "Foo #2"]
+    assert second_page == {
+        "data": [
+            {
+                "id": str(GenericUUID(int=3)),
+                "title": "Foo #3",
+                "description": "Bar",
+                "ask_price_amount": 10.0,
+                "ask_price_currency": "USD",
+            }
+        ]
+    }
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("cursor", ["not a cursor", "WzFd"])
+def test_catalog_list_with_invalid_cursor_returns_422(api_client, cursor):
+    response = api_client.get("/catalog", params={"cursor": cursor})
+    assert response.status_code == 422
@@ -5,3 +5,19 @@ import pytest
 def test_debug_endpoint(authenticated_api_client):
     response = authenticated_api_client.get("/debug")
     assert response.status_code == 200
+
+
+@pytest.mark.integration
+def test_metrics_endpoint(api_client):
+    api_client.get("/catalog")
+
+    response = api_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'lato_messages_total{message_type="GetAllListings"}' in response.text
+    assert (
+        'lato_handler_seconds_bucket{message_type="GetAllListings",le="+Inf"}'
+        in response.text
+    )
+    assert 'db_pool_checked_out{engine="primary"}' in response.text
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# add base project path to PYTHONPATH
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
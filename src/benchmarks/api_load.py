@@ -0,0 +1,109 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from api.main import app, container
+from modules.catalog.application.query.get_all_listings import get_all_listings
+from modules.catalog.domain.entities import Listing
+from modules.catalog.infrastructure.listing_repository import (
+    ListingModel,
+    PostgresJsonListingRepository,
+    listing_seller_id,
+)
+from seedwork.application.execution import ExecutionPolicy
+from seedwork.domain.value_objects import GenericUUID, Money
+from seedwork.infrastructure.logging import logger
+
+# p50/p99 latency of GET /catalog with 200 concurrent clients, with handlers executed
+# on the event loop (before) and in a thread pool sized to the database pool (after)
+# a network round trip to the database is simulated by sleeping before each statement
+# with DATABASE_ASYNC=true, query handlers use an async engine and run on the event loop
+# uses the database, run with "cd src && python -m benchmarks.api_load"
+
+CLIENTS = 200
+REQUESTS_PER_CLIENT = 5
+DATABASE_LATENCIES = [0, 0.005]  # seconds per statement
+SELLER_ID = GenericUUID(int=0xBE9C)
+
+
+def seed_listings(number):
+    with Session(container.db_engine()) as session:
+        repository = PostgresJsonListingRepository(db_session=session)
+        for i in range(number):
+            listing = Listing(
+                id=Listing.next_id(),
+                title=f"Benchmark listing {i}",
+                description="",
+                ask_price=Money(10),
+                seller_id=SELLER_ID,
+            )
+            listing.publish()  # the catalog shows published listings only
+            repository.add(listing)
+        session.commit()
+
+
+def remove_listings():
+    with Session(container.db_engine()) as session:
+        session.query(ListingModel).filter(listing_seller_id == str(SELLER_ID)).delete(
+            synchronize_session=False
+        )
+        session.commit()
+
+
+async def client(http, latencies):
+    for _ in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        response = await http.get("/catalog", params={"seller_id": str(SELLER_ID)})
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+
+
+async def run(name, database_latency):
+    # policies are cached by the executor
+    container.message_executor()._policies.clear()
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http, latencies) for _ in range(CLIENTS)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<12} latency: {database_latency * 1000:3.0f} ms/statement, p50: {quantiles[49] * 1000:7.1f} ms, p99: {quantiles[98] * 1000:7.1f} ms, "
+        f"{len(latencies) / elapsed:6.0f} requests/s"
+    )
+
+
+async def main():
+    if container.config().DATABASE_ASYNC:
+        # sleeping in a listener would block the event loop, so no latency is simulated
+        await run("async engine", database_latency=0)
+        await container.async_db_engine().dispose()
+        return
+
+    for database_latency in DATABASE_LATENCIES:
+
+        def simulate_latency(*args):
+            time.sleep(database_latency)
+
+        event.listen(container.db_engine(), "before_cursor_execute", simulate_latency)
+        for name, policy in [
+            ("event loop", ExecutionPolicy.NATIVE),
+            ("thread pool", ExecutionPolicy.THREADPOOL),
+        ]:
+            get_all_listings.execution_policy = policy
+            await run(name, database_latency)
+        event.remove(container.db_engine(), "before_cursor_execute", simulate_latency)
+
+
+logger.setLevel("WARNING")
+seed_listings(50)
+try:
+    asyncio.run(main())
+finally:
+    remove_listings()
@@ -0,0 +1,55 @@
+import inspect
+import timeit
+import uuid
+
+from dependency_injector.providers import Dependency, Factory, Singleton
+from sqlalchemy.orm import Session
+
+from config.container import ContainerProvider, TransactionContainer, get_provider_index
+from modules.bidding.domain.repositories import ListingRepository
+from modules.iam.application.services import IamService
+from seedwork.infrastructure.logging import logger
+
+# compares the cost of resolving a dependency by type with a linear scan over all providers (before)
+# and with a per-class provider index (after)
+# run with "cd src && python -m benchmarks.container_resolution"
+
+NUMBER = 100_000
+
+container = TransactionContainer(
+    db_session=Session(), correlation_id=uuid.uuid4(), logger=logger
+)
+dependency_provider = ContainerProvider(container)
+index = get_provider_index(container)
+
+
+def scan_lookup(cls):
+    """Resolution as it was done before the index was introduced"""
+
+    def inspect_provider(provider):
+        if isinstance(provider, (Factory, Singleton)):
+            return issubclass(provider.cls, cls)
+        elif isinstance(provider, Dependency):
+            return issubclass(provider.instance_of, cls)
+        return False
+
+    ((name, _),) = inspect.getmembers(container, inspect_provider)
+    return name
+
+
+for cls in [Session, ListingRepository, IamService]:
+    assert scan_lookup(cls) == index.resolve(cls)
+
+    before = timeit.timeit(lambda: scan_lookup(cls), number=NUMBER)
+    after = timeit.timeit(lambda: index.resolve(cls), number=NUMBER)
+    print(
+        f"{cls.__name__:<20} scan: {before / NUMBER * 1e6:7.3f} us/lookup, "
+        f"index: {after / NUMBER * 1e6:7.3f} us/lookup ({before / after:.0f}x)"
+    )
+
+elapsed = timeit.timeit(
+    lambda: ContainerProvider(container).get_dependency(Session), number=NUMBER
+)
+print(
+    f"ContainerProvider(...).get_dependency(Session): {elapsed / NUMBER * 1e6:.3f} us/call"
+)
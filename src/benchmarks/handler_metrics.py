@@ -0,0 +1,76 @@
+import asyncio
+import operator
+import statistics
+import time
+import timeit
+
+from sqlalchemy import create_engine
+
+from config.api_config import ApiConfig
+from config.container import create_application
+from seedwork.application.metrics import HandlerMetrics
+from seedwork.application.queries import Query
+from seedwork.infrastructure.logging import logger
+
+# overhead of handler metrics per dispatch of a message, measured by dispatching a query
+# with a trivial handler without metrics (before) and with metrics (after)
+# the database is not used, run with "cd src && python -m benchmarks.handler_metrics"
+#
+# the overhead measured in a dispatch (about 10-15 µs) is several times the cost of the instrumentation
+# measured in a tight loop (about 1.5 µs, "begin/end dispatch" below), most likely as a dispatch runs enough code
+# (lato, dependency injector, middlewares) to evict the instrumentation from CPU caches between
+# dispatches, so its code runs cold every time
+
+NUMBER = 10_000
+ROUNDS = 20
+
+
+class GetNothing(Query):
+    ...
+
+
+async def get_nothing(query: GetNothing):
+    return None
+
+
+def create(handler_metrics):
+    engine = create_engine(ApiConfig().DATABASE_URL)
+    application = create_application(engine, handler_metrics=handler_metrics)
+    application.handler(GetNothing)(get_nothing)
+    return application
+
+
+async def measure(application) -> float:
+    query = GetNothing()
+    async with application.transaction_context() as ctx:
+        start = time.perf_counter()
+        for _ in range(NUMBER):
+            await ctx.execute_async(query)
+        return (time.perf_counter() - start) / NUMBER
+
+
+async def main():
+    applications = create(HandlerMetrics()), create(None)
+    with_metrics, without_metrics = [], []
+    # runs alternate, so both variants are measured under the same load of the machine,
+    # and the overhead is the median of differences of paired runs
+    for _ in range(ROUNDS):
+        with_metrics.append(await measure(applications[0]))
+        without_metrics.append(await measure(applications[1]))
+    overhead = statistics.median(map(operator.sub, with_metrics, without_metrics))
+    print(f"without metrics: {min(without_metrics) * 1e6:6.2f} µs/dispatch")
+    print(f"with metrics:    {min(with_metrics) * 1e6:6.2f} µs/dispatch")
+    print(f"overhead:        {overhead * 1e6:6.2f} µs/dispatch")
+
+    handler_metrics = HandlerMetrics()
+
+    def begin_end_dispatch():
+        dispatch = handler_metrics.begin_dispatch(GetNothing, 0.0)
+        handler_metrics.end_dispatch(dispatch, 0.0, False)
+
+    instrumentation = min(timeit.repeat(begin_end_dispatch, number=NUMBER)) / NUMBER
+    print(f"begin/end dispatch: {instrumentation * 1e6:6.2f} µs/dispatch")
+
+
+logger.setLevel("INFO")
+asyncio.run(main())
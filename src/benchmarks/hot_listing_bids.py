@@ -0,0 +1,109 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config.api_config import ApiConfig
+from config.container import ApplicationContainer, create_message_executor
+from modules.bidding.application.command import PlaceBidCommand
+from modules.bidding.domain.entities import Listing
+from modules.bidding.domain.value_objects import Seller
+from modules.bidding.infrastructure.listing_repository import (
+    ListingModel,
+    PostgresJsonListingRepository,
+)
+from seedwork.domain.value_objects import GenericUUID, Money
+from seedwork.infrastructure.database import Base
+from seedwork.infrastructure.logging import logger
+
+# bids/s placed on a single listing by concurrent bidders, with each command executed in its own transaction
+# and retried on conflicts (before) and with commands queued in a mailbox of the listing and executed in batches (after)
+# a network round trip to the database is simulated by sleeping before each statement
+# uses the database, run with "cd src && python -m benchmarks.hot_listing_bids"
+
+BIDS = 200
+DATABASE_LATENCY = 0.002  # seconds per statement
+BATCH_SIZES = [1, 10, 50]
+
+
+def add_listing(engine) -> GenericUUID:
+    listing_id = GenericUUID.next_id()
+    with Session(engine) as session:
+        PostgresJsonListingRepository(db_session=session).add(
+            Listing(
+                id=listing_id,
+                seller=Seller(id=GenericUUID.next_id()),
+                ask_price=Money(1),
+                starts_at=datetime.utcnow(),
+                ends_at=datetime.utcnow() + timedelta(days=1),
+            )
+        )
+        session.commit()
+    return listing_id
+
+
+def remove_listing(engine, listing_id):
+    with Session(engine) as session:
+        session.query(ListingModel).filter(ListingModel.id == listing_id).delete()
+        session.commit()
+
+
+async def run(name, config, container, statements):
+    engine = container.db_engine()
+    listing_id = add_listing(engine)
+    executor = create_message_executor(container.application(), engine, config)
+    statements.clear()
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            executor.execute(
+                PlaceBidCommand(
+                    listing_id=listing_id,
+                    bidder_id=GenericUUID.next_id(),
+                    amount=10 + i,
+                )
+            )
+            for i in range(BIDS)
+        ),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+    remove_listing(engine, listing_id)
+
+    accepted = sum(not isinstance(result, Exception) for result in results)
+    print(
+        f"{name:<16} {BIDS / elapsed:6.0f} bids/s, accepted: {accepted:3}/{BIDS}, "
+        f"{len(statements) / BIDS:5.2f} statements/bid"
+    )
+
+
+async def main():
+    configs = [("per command", ApiConfig(COMMAND_MAILBOX_ENABLED=False))] + [
+        (
+            f"mailbox ({batch_size})",
+            ApiConfig(
+                COMMAND_MAILBOX_ENABLED=True, COMMAND_MAILBOX_MAX_BATCH_SIZE=batch_size
+            ),
+        )
+        for batch_size in BATCH_SIZES
+    ]
+    for name, config in configs:
+        container = ApplicationContainer(config=config)
+        engine = container.db_engine()
+        Base.metadata.create_all(engine)
+        statements: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def simulate_latency(conn, cursor, statement, *args):
+            statements.append(statement)
+            time.sleep(DATABASE_LATENCY)
+
+        await run(name, config, container, statements)
+        engine.dispose()
+
+
+logger.setLevel("ERROR")  # rejected bids are logged as warnings
+asyncio.run(main())
@@ -0,0 +1,108 @@
+import datetime
+import json
+import time
+
+from modules.bidding.domain.entities import Bid, Bidder, Listing, Money, Seller
+from modules.bidding.infrastructure.listing_codec import (
+    decode_listing,
+    deserialize_bid,
+    deserialize_datetime,
+    deserialize_id,
+    deserialize_money,
+    encode_listing,
+    serialize_bid,
+    serialize_datetime,
+    serialize_id,
+    serialize_money,
+)
+from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.database import _default, dumps, loads, orjson
+
+# time of encoding a bidding listing to JSON text and decoding it back, and the size of the text,
+# with bids stored as a list of objects and encoded with json (before) and stored as parallel arrays
+# and encoded with orjson, if installed (after)
+# run with "cd src && python -m benchmarks.listing_codec"
+
+NUMBERS_OF_BIDS = [10, 1_000, 50_000]
+NUMBER_OF_BIDDERS = 500
+
+
+def create_listing(number_of_bids) -> Listing:
+    bidders = [Bidder(id=GenericUUID.next_id()) for _ in range(NUMBER_OF_BIDDERS)]
+    placed_at = datetime.datetime(2024, 1, 1)
+    return Listing(
+        id=GenericUUID.next_id(),
+        seller=Seller(id=GenericUUID.next_id()),
+        ask_price=Money(1),
+        starts_at=placed_at,
+        ends_at=placed_at + datetime.timedelta(days=7),
+        bids=[
+            Bid(
+                bidder=bidders[i % NUMBER_OF_BIDDERS],
+                max_price=Money(10 + i),
+                placed_at=placed_at + datetime.timedelta(seconds=i, microseconds=i),
+            )
+            for i in range(number_of_bids)
+        ],
+    )
+
+
+def encode_nested(listing: Listing) -> str:
+    """Encoding as it was done before the codec was introduced"""
+    return json.dumps(
+        {
+            "starts_at": serialize_datetime(listing.starts_at),
+            "ends_at": serialize_datetime(listing.ends_at),
+            "ask_price": serialize_money(listing.ask_price),
+            "seller_id": serialize_id(listing.seller.id),
+            "bids": [serialize_bid(b) for b in listing.bids],
+        },
+        default=_default,
+    )
+
+
+def decode_nested(listing_id, text: str) -> Listing:
+    d = json.loads(text)
+    return Listing(
+        id=deserialize_id(listing_id),
+        seller=Seller(id=deserialize_id(d["seller_id"])),
+        ask_price=deserialize_money(d["ask_price"]),
+        starts_at=deserialize_datetime(d["starts_at"]),
+        ends_at=deserialize_datetime(d["ends_at"]),
+        bids=[deserialize_bid(b) for b in d.get("bids", [])],
+    )
+
+
+def encode_codec(listing: Listing) -> str:
+    return dumps(encode_listing(listing))
+
+
+def decode_codec(listing_id, text: str) -> Listing:
+    return decode_listing(listing_id, loads(text))
+
+
+def measure(func, *args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(name, encode, decode, listing, repeat):
+    encode_time, text = measure(encode, listing, repeat=repeat)
+    decode_time, decoded = measure(decode, str(listing.id), text, repeat=repeat)
+    assert decoded == listing
+    print(
+        f"{len(listing.bids):>6} bids, {name:<7} encode: {encode_time * 1000:8.2f} ms, "
+        f"decode: {decode_time * 1000:8.2f} ms, size: {len(text) / 1024:8.1f} KiB"
+    )
+
+
+print(f"JSON backend: {'orjson' if orjson is not None else 'json'}")
+for number_of_bids in NUMBERS_OF_BIDS:
+    listing = create_listing(number_of_bids)
+    repeat = 3 if number_of_bids > 10_000 else 20
+    run("nested", encode_nested, decode_nested, listing, repeat)
+    run("codec", encode_codec, decode_codec, listing, repeat)
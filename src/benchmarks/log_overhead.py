@@ -0,0 +1,64 @@
+import timeit
+
+from lato import TransactionContext
+
+from config.container import describe_action, describe_message
+from modules.catalog.application.command import CreateListingDraftCommand
+from modules.catalog.domain.events import ListingDraftCreatedEvent
+from seedwork.domain.value_objects import GenericUUID, Money
+from seedwork.infrastructure.logging import lazy, lazy_logger, logger
+
+# per-command cost of debug statements of the transaction middlewares (logging_middleware
+# and event_collector_middleware) with the logger at INFO level, with messages built
+# by f-strings (before) and with lazy messages and an early level check (after)
+# run with "cd src && python -m benchmarks.log_overhead"
+
+NUMBER = 100_000
+
+command = CreateListingDraftCommand(
+    listing_id=GenericUUID.next_id(),
+    title="Foo",
+    description="Bar",
+    ask_price=Money(10),
+    seller_id=GenericUUID.next_id(),
+)
+event = ListingDraftCreatedEvent(listing_id=command.listing_id)
+
+
+def create_listing_draft(command):
+    ...
+
+
+ctx = TransactionContext()
+ctx.set_dependency("message", command)
+ctx.current_handler = create_listing_draft
+
+
+def eager_logging():
+    description = (
+        f"{ctx.current_action[1]} -> {repr(ctx.current_action[0])}"
+        if ctx.current_action
+        else ""
+    )
+    logger.debug(f"Executing {description}...")
+    logger.debug(f"Collecting event from {ctx['message'].__class__}")
+    logger.debug(f"Publishing {event}")
+    logger.debug(f"Finished executing {description}")
+
+
+def lazy_logging():
+    description = lazy(describe_action, ctx)
+    lazy_logger.debug("Executing %s...", description)
+    lazy_logger.debug("Collecting events from %s", lazy(describe_message, ctx))
+    lazy_logger.debug("Publishing %s", event)
+    lazy_logger.debug("Finished executing %s", description)
+
+
+def measure(name, statements):
+    seconds = min(timeit.repeat(statements, number=NUMBER, repeat=5))
+    print(f"{name:<6} {seconds / NUMBER * 1e6:6.2f} µs/command")
+
+
+logger.setLevel("INFO")
+measure("eager", eager_logging)
+measure("lazy", lazy_logging)
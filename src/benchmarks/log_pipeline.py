@@ -0,0 +1,99 @@
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+import httpx
+
+from api.main import app
+from seedwork.infrastructure.logging import LoggerFactory
+
+# p50/p99 latency of GET /catalog with DEBUG logging on, with records formatted and written
+# when logged (before) and handed to a background thread through a bounded queue (after)
+# console output goes to /dev/null, JSON records to a temporary file, whose flushes are slowed down
+# to simulate a slow disk (or a network file system)
+# uses the database, run with "cd src && python -m benchmarks.log_pipeline"
+
+CLIENTS = 50
+REQUESTS_PER_CLIENT = 20
+QUEUE_SIZE = 10_000
+FLUSH_LATENCIES = [0, 0.0005]  # seconds per flush of the log file
+
+
+class SlowStream:
+    def __init__(self, stream, latency):
+        self._stream = stream
+        self._latency = latency
+
+    def write(self, data):
+        return self._stream.write(data)
+
+    def flush(self):
+        time.sleep(self._latency)
+        self._stream.flush()
+
+    def close(self):
+        self._stream.close()
+
+
+def slow_down_file_handler(logger, latency):
+    listener = LoggerFactory._listener
+    handlers = listener.handlers if listener else logger.handlers
+    for handler in handlers:
+        if isinstance(handler, RotatingFileHandler):
+            handler.stream = SlowStream(handler.stream, latency)
+
+
+async def client(http, latencies):
+    for _ in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        response = await http.get("/catalog")
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+
+
+async def run(name, log_filename, queue_size, flush_latency):
+    LoggerFactory.configure(
+        logger_name="api", log_filename=log_filename, queue_size=queue_size
+    )
+    logger = LoggerFactory.create_logger()
+    logger.setLevel("DEBUG")
+    slow_down_file_handler(logger, flush_latency)
+
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        await http.get("/catalog")  # warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http, latencies) for _ in range(CLIENTS)))
+        elapsed = time.perf_counter() - start
+
+    LoggerFactory.shutdown()
+    quantiles = statistics.quantiles(latencies, n=100)
+    dropped = LoggerFactory.queue_handler.stats.dropped if queue_size else 0
+    print(
+        f"{name:<6} flush {flush_latency * 1000:3.1f} ms: "
+        f"{CLIENTS * REQUESTS_PER_CLIENT / elapsed:6.1f} requests/s, "
+        f"p50: {quantiles[49] * 1000:6.2f} ms, p99: {quantiles[98] * 1000:6.2f} ms, "
+        f"log file: {os.path.getsize(log_filename) / 1024:6.0f} KiB, dropped: {dropped}"
+    )
+
+
+async def main(directory):
+    for i, flush_latency in enumerate(FLUSH_LATENCIES):
+        for name, queue_size in [("direct", 0), ("queue", QUEUE_SIZE)]:
+            log_filename = os.path.join(directory, f"{name}-{i}.json")
+            await run(name, log_filename, queue_size, flush_latency)
+
+
+stderr = sys.stderr
+sys.stderr = open(os.devnull, "w")
+try:
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main(directory))
+finally:
+    sys.stderr.close()
+    sys.stderr = stderr
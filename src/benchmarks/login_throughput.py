@@ -0,0 +1,100 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy.orm import Session
+
+from api.main import app, container
+from modules.iam.application.password_hasher import check_password
+from modules.iam.domain.entities import User
+from modules.iam.infrastructure.repository import PostgresJsonUserRepository, UserModel
+from seedwork.domain.value_objects import Email, GenericUUID
+from seedwork.infrastructure.logging import logger
+
+# logins/s of POST /token with 10 concurrent clients, and p99 latency of GET / requested meanwhile,
+# with bcrypt running in the worker thread of a login (before) and in a process pool (after)
+# the cost factor is set with PASSWORD_HASH_ROUNDS, the pool size with PASSWORD_HASH_WORKERS
+# uses the database, run with "cd src && python -m benchmarks.login_throughput"
+
+CLIENTS = 10  # below the size of the database pool, as each login holds a connection while hashing
+LOGINS_PER_CLIENT = 4
+EMAIL = "benchmark@example.com"
+PASSWORD = "password"
+
+
+def seed_user(hasher):
+    with Session(container.db_engine()) as session:
+        PostgresJsonUserRepository(db_session=session).add(
+            User(
+                id=GenericUUID.next_id(),
+                email=Email(EMAIL),
+                password_hash=hasher.hash(PASSWORD),
+                access_token="benchmark-token",
+            )
+        )
+        session.commit()
+
+
+def remove_user():
+    with Session(container.db_engine()) as session:
+        session.query(UserModel).filter(UserModel.email == EMAIL).delete()
+        session.commit()
+
+
+async def login_client(http):
+    for _ in range(LOGINS_PER_CLIENT):
+        response = await http.post(
+            "/token", data={"username": EMAIL, "password": PASSWORD}
+        )
+        assert response.status_code == 200
+
+
+async def probe_client(http, latencies, done):
+    while not done.is_set():
+        start = time.perf_counter()
+        await http.get("/")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def run(name):
+    latencies: list[float] = []
+    done = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        probe = asyncio.create_task(probe_client(http, latencies, done))
+        start = time.perf_counter()
+        await asyncio.gather(*(login_client(http) for _ in range(CLIENTS)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<12} {CLIENTS * LOGINS_PER_CLIENT / elapsed:6.1f} logins/s, "
+        f"GET / p50: {quantiles[49] * 1000:7.1f} ms, p99: {quantiles[98] * 1000:7.1f} ms"
+    )
+
+
+async def main(hasher):
+    # bcrypt called in the calling thread, as without worker processes
+    hasher.verify = check_password
+    await run("thread")
+    del hasher.verify
+
+    hasher.verify(PASSWORD, hasher.hash(PASSWORD))  # starts the pool
+    await run("process pool")
+
+
+logger.setLevel("WARNING")
+password_hasher = container.password_hasher()
+print(
+    f"bcrypt cost: {password_hasher.rounds}, worker processes: {password_hasher.max_workers}"
+)
+seed_user(password_hasher)
+try:
+    asyncio.run(main(password_hasher))
+finally:
+    remove_user()
+    password_hasher.shutdown()
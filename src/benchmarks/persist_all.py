@@ -0,0 +1,83 @@
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from config.api_config import ApiConfig
+from modules.catalog.domain.entities import Listing
+from modules.catalog.infrastructure.listing_repository import (
+    ListingModel,
+    PostgresJsonListingRepository,
+)
+from seedwork.domain.value_objects import Money
+from seedwork.infrastructure.database import Base
+
+# loads 1000 listings, changes 10 of them and counts SQL statements emitted when changes are written,
+# with a per-entity merge (before) and with a change set flush (after)
+# uses the database, run with "cd src && python -m benchmarks.persist_all"
+
+NUMBER_OF_LISTINGS = 1000
+NUMBER_OF_CHANGES = 10
+
+config = ApiConfig()
+engine = create_engine(config.DATABASE_URL)
+Base.metadata.create_all(engine)
+
+statements = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statements(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+def merge_all(session, repository):
+    """Persistence as it was done before the change set flush was introduced"""
+    for entity in repository._identity_map.values():
+        session.merge(repository.map_entity_to_model(entity))
+
+
+def flush_changes(session, repository):
+    repository.persist_all()
+
+
+def run(session, write_changes):
+    repository = PostgresJsonListingRepository(db_session=session)
+    listings = [
+        repository._get_entity(instance)
+        for instance in session.query(ListingModel).all()
+    ]
+    for listing in listings[:NUMBER_OF_CHANGES]:
+        listing.title = f"{listing.title} (changed)"
+
+    statements.clear()
+    start = time.perf_counter()
+    write_changes(session, repository)
+    session.flush()
+    return len(statements), time.perf_counter() - start
+
+
+with engine.connect() as connection:
+    transaction = connection.begin()
+    with Session(bind=connection) as session:
+        repository = PostgresJsonListingRepository(db_session=session)
+        for i in range(NUMBER_OF_LISTINGS):
+            repository.add(
+                Listing(
+                    id=Listing.next_id(),
+                    title=f"Listing {i}",
+                    description="",
+                    ask_price=Money(10),
+                    seller_id=Listing.next_id(),
+                )
+            )
+        session.flush()
+
+    for name, write_changes in [("merge", merge_all), ("change set", flush_changes)]:
+        with Session(bind=connection) as session:
+            count, elapsed = run(session, write_changes)
+        print(
+            f"{name:<12} {count:5} statements, {elapsed * 1000:8.1f} ms "
+            f"({NUMBER_OF_CHANGES} of {NUMBER_OF_LISTINGS} listings changed)"
+        )
+    transaction.rollback()
@@ -0,0 +1,114 @@
+import asyncio
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import event
+
+from config.api_config import ApiConfig
+from config.container import ApplicationContainer
+from modules.catalog.application.command import CreateListingDraftCommand
+from modules.catalog.application.query import GetListingDetails
+from modules.iam.application.services import IamService
+from seedwork.application.unit_of_work import UnitOfWork
+from seedwork.domain.value_objects import GenericUUID, Money
+from seedwork.infrastructure.database import Base
+from seedwork.infrastructure.logging import logger
+
+# cost of a request of POST /catalog (an authentication lookup, a command and a read-back query)
+# executed in three transaction contexts with a new transaction container each (before)
+# and in a request-scoped unit of work with a pooled container (after)
+# caches are disabled, so every message uses the database
+# uses the database, run with "cd src && python -m benchmarks.request_unit_of_work"
+
+REQUESTS = 500
+
+
+def create_container(pool_size: int) -> ApplicationContainer:
+    config = ApiConfig(
+        AUTH_CACHE_TTL=0,
+        QUERY_CACHE_TTL=0,
+        PASSWORD_HASH_ROUNDS=4,
+        TRANSACTION_CONTAINER_POOL_SIZE=pool_size,
+    )
+    return ApplicationContainer(config=config)
+
+
+def create_listing_command(seller_id):
+    return CreateListingDraftCommand(
+        listing_id=GenericUUID.next_id(),
+        title="Foo",
+        description="Bar",
+        ask_price=Money(10),
+        seller_id=seller_id,
+    )
+
+
+async def request_per_message(application, executor, access_token):
+    async with application.transaction_context() as ctx:
+        user = ctx[IamService].find_user_by_access_token(access_token)
+    command = create_listing_command(user.id)
+    await executor.execute(command)
+    await executor.execute(GetListingDetails(listing_id=command.listing_id))
+
+
+async def request_in_unit_of_work(application, executor, access_token):
+    async with UnitOfWork(executor, request_scoped=True) as uow:
+        user = await uow.run_blocking(
+            uow.ctx[IamService].find_user_by_access_token, access_token
+        )
+        command = create_listing_command(user.id)
+        await uow.execute(command)
+        await uow.commit()
+        await uow.execute(GetListingDetails(listing_id=command.listing_id))
+
+
+async def run(name, pool_size, request):
+    container = create_container(pool_size)
+    engine = container.db_engine()
+    Base.metadata.create_all(engine)
+    application = container.application()
+    executor = container.message_executor()
+    access_token = f"benchmark-{uuid.uuid4()}"
+    with application.transaction_context() as ctx:
+        ctx[IamService].create_user(
+            GenericUUID.next_id(),
+            f"{access_token}@example.com",
+            "password",
+            access_token,
+        )
+    await request(application, executor, access_token)  # warm up
+
+    checkouts = []
+    event.listen(engine, "checkout", lambda *args: checkouts.append(args))
+    pool = container.container_pool()
+    created = pool.created
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await request(application, executor, access_token)
+    elapsed = time.perf_counter() - start
+    checkouts_per_request = len(checkouts) / REQUESTS
+    containers_per_request = (pool.created - created) / REQUESTS
+
+    tracemalloc.start()
+    await request(application, executor, access_token)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    executor.shutdown()
+    engine.dispose()
+
+    print(
+        f"{name:<14} {elapsed / REQUESTS * 1e3:5.2f} ms/request, "
+        f"{checkouts_per_request:4.2f} connection checkouts/request, "
+        f"{containers_per_request:4.2f} containers created/request, "
+        f"peak memory of a request: {peak / 1024:4.0f} KiB"
+    )
+
+
+async def main():
+    await run("per message", 0, request_per_message)
+    await run("unit of work", 32, request_in_unit_of_work)
+
+
+logger.setLevel("ERROR")
+asyncio.run(main())
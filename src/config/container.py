@@ -1,9 +1,13 @@
 import asyncio
+import contextvars
 import copy
 import inspect
-import json
+import os
+import threading
+import time
 import uuid
-from typing import Optional
+from functools import partial
+from typing import Iterable, Iterator, Optional
 from uuid import UUID
 
 from dependency_injector import containers, providers
@@ -13,37 +17,98 @@ from dependency_injector.wiring import Provide, inject  # noqa
 from lato import Application, DependencyProvider, TransactionContext
 from pydantic_settings import BaseSettings
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
 
-from modules.bidding.application import bidding_module
+from modules.bidding.application import (
+    bidding_async_queries,
+    bidding_module,
+    bidding_queries,
+    bidding_subscriptions,
+)
+from modules.bidding.infrastructure.bidding_projection import BiddingProjection
+from modules.bidding.infrastructure.listing_repository import (
+    AsyncPostgresJsonListingRepository as BiddingAsyncPostgresJsonListingRepository,
+)
 from modules.bidding.infrastructure.listing_repository import (
     PostgresJsonListingRepository as BiddingPostgresJsonListingRepository,
 )
-from modules.catalog.application import catalog_module
+from modules.catalog.application import (
+    catalog_async_queries,
+    catalog_module,
+    catalog_queries,
+)
+from modules.catalog.application.query.cache_tags import (
+    CATALOG_QUERY_CACHE_INVALIDATIONS,
+)
+from modules.catalog.infrastructure.listing_repository import (
+    AsyncPostgresJsonListingRepository as CatalogAsyncPostgresJsonListingRepository,
+)
 from modules.catalog.infrastructure.listing_repository import (
     PostgresJsonListingRepository as CatalogPostgresJsonListingRepository,
 )
+from modules.iam.application.auth_cache import AccessTokenCache
+from modules.iam.application.password_hasher import BcryptPasswordHasher, PasswordHasher
 from modules.iam.application.services import IamService
-from modules.iam.infrastructure.repository import PostgresJsonUserRepository
-from seedwork.application.inbox_outbox import InMemoryOutbox
-from seedwork.infrastructure.logging import Logger, logger
-
-
-def _default(val):
-    import uuid
+from modules.iam.infrastructure.repository import (
+    AsyncPostgresJsonUserRepository,
+    PostgresJsonUserRepository,
+)
+from seedwork.application.execution import MessageExecutor
+from seedwork.application.handler_plans import (
+    compile_handler_plans,
+    get_dependency_types,
+    get_handler_plan,
+)
+from seedwork.application.mailbox import AggregateMailboxExecutor
+from seedwork.application.metrics import HandlerMetrics
+from seedwork.application.queries import Query
+from seedwork.application.query_cache import CachePolicy, QueryCache, get_cache_policy
+from seedwork.infrastructure.database import (
+    InstrumentedQueuePool,
+    PinnedSession,
+    ReadOnlySession,
+    ReplicaLagMonitor,
+    dumps,
+    loads,
+)
+from seedwork.infrastructure.logging import Logger, lazy, lazy_logger, logger
+from seedwork.infrastructure.outbox import (
+    OutboxRelay,
+    SqlAlchemyOutbox,
+    get_subscribed_event_types,
+)
+from seedwork.infrastructure.sql_accounting import (
+    StatementAccounting,
+    count_statements,
+    instrument_engine,
+)
 
-    if isinstance(val, uuid.UUID):
-        return str(val)
-    raise TypeError()
+# modules handling events published by other modules
+SUBSCRIPTION_MODULES = (bidding_subscriptions,)
 
 
-def dumps(d):
-    return json.dumps(d, default=_default)
+def get_pool_options(config) -> dict:
+    """Options of a connection pool of an engine, see DATABASE_POOL_* settings"""
+    return dict(
+        pool_size=config.DATABASE_POOL_SIZE,
+        max_overflow=config.DATABASE_MAX_OVERFLOW,
+        pool_timeout=config.DATABASE_POOL_TIMEOUT,
+        pool_recycle=config.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=config.DATABASE_POOL_PRE_PING,
+        pool_use_lifo=config.DATABASE_POOL_USE_LIFO,
+    )
 
 
 def create_db_engine(config):
     engine = create_engine(
-        config.DATABASE_URL, echo=config.DATABASE_ECHO, json_serializer=dumps
+        config.DATABASE_URL,
+        echo=config.DATABASE_ECHO,
+        json_serializer=dumps,
+        json_deserializer=loads,
+        poolclass=InstrumentedQueuePool,
+        **get_pool_options(config),
     )
     from seedwork.infrastructure.database import Base
 
@@ -52,79 +117,455 @@ def create_db_engine(config):
     return engine
 
 
-def create_application(db_engine) -> Application:
-    """Creates new instance of the application"""
+def create_replica_db_engine(config):
+    """Creates an engine of a read replica, or None if DATABASE_REPLICA_URL is not set"""
+    if not config.DATABASE_REPLICA_URL:
+        return None
+
+    return create_engine(
+        config.DATABASE_REPLICA_URL,
+        echo=config.DATABASE_ECHO,
+        json_serializer=dumps,
+        json_deserializer=loads,
+        poolclass=InstrumentedQueuePool,
+        **get_pool_options(config),
+    )
+
+
+def create_replica_lag_monitor(
+    config, replica_db_engine
+) -> Optional[ReplicaLagMonitor]:
+    """Creates a monitor of the replica lag (started with the API), or None if there is no replica"""
+    if replica_db_engine is None:
+        return None
+
+    return ReplicaLagMonitor(
+        replica_db_engine,
+        max_lag=config.DATABASE_REPLICA_MAX_LAG,
+        interval=config.DATABASE_REPLICA_LAG_INTERVAL,
+    )
+
+
+def create_async_db_engine(config) -> Optional[AsyncEngine]:
+    """Creates an async engine (using asyncpg), if async persistence mode is enabled"""
+    if not config.DATABASE_ASYNC:
+        return None
+
+    url = make_url(config.DATABASE_URL).set(drivername="postgresql+asyncpg")
+    return create_async_engine(
+        url,
+        echo=config.DATABASE_ECHO,
+        json_serializer=dumps,
+        json_deserializer=loads,
+        **get_pool_options(config),
+    )
+
+
+def create_access_token_cache(config) -> Optional[AccessTokenCache]:
+    """Creates a process-local cache of authenticated users, unless disabled with AUTH_CACHE_TTL=0"""
+    if config.AUTH_CACHE_TTL <= 0:
+        return None
+
+    return AccessTokenCache(
+        ttl=config.AUTH_CACHE_TTL,
+        negative_ttl=config.AUTH_CACHE_NEGATIVE_TTL,
+        max_size=config.AUTH_CACHE_MAX_SIZE,
+    )
+
+
+def create_query_cache(config) -> Optional[QueryCache]:
+    """Creates a process-local cache of query results, unless disabled with QUERY_CACHE_TTL=0"""
+    if config.QUERY_CACHE_TTL <= 0:
+        return None
+
+    return QueryCache(
+        ttl=config.QUERY_CACHE_TTL,
+        max_size=config.QUERY_CACHE_MAX_SIZE,
+        invalidations=CATALOG_QUERY_CACHE_INVALIDATIONS,
+    )
+
+
+def create_handler_metrics(config) -> Optional[HandlerMetrics]:
+    """Creates metrics of message handlers, unless disabled with HANDLER_METRICS_ENABLED=false"""
+    if not config.HANDLER_METRICS_ENABLED:
+        return None
+
+    return HandlerMetrics()
+
+
+def create_statement_accounting(
+    config, handler_metrics, *engines
+) -> Optional[StatementAccounting]:
+    """Instruments database engines to count SQL statements of messages, unless disabled with SQL_ACCOUNTING_ENABLED=false"""
+    if not config.SQL_ACCOUNTING_ENABLED:
+        return None
+
+    for engine in engines:
+        if engine is not None:
+            instrument_engine(engine)
+    return StatementAccounting(
+        budgets=config.SQL_STATEMENT_BUDGETS,
+        strict=config.SQL_STATEMENT_BUDGET_STRICT,
+        handler_metrics=handler_metrics,
+    )
+
+
+def init_password_hasher(config) -> Iterator[PasswordHasher]:
+    """
+    A hasher running in a pool of worker processes (one per CPU by default),
+    workers are stopped by `ApplicationContainer.shutdown_resources()`
+    """
+    password_hasher = BcryptPasswordHasher(
+        rounds=config.PASSWORD_HASH_ROUNDS,
+        max_workers=config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    )
+    password_hasher.start()
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+def describe_message(ctx: TransactionContext) -> str:
+    return type(ctx["message"]).__name__
+
+
+def describe_action(ctx: TransactionContext) -> str:
+    message, handler = ctx.current_action
+    return f"{handler} -> {message!r}"
+
+
+def create_application(
+    db_engine,
+    async_db_engine=None,
+    access_token_cache=None,
+    password_hasher=None,
+    outbox_enabled=False,
+    query_cache=None,
+    container_pool=None,
+    handler_metrics=None,
+    statement_accounting=None,
+    replica_db_engine=None,
+    replica_lag_monitor=None,
+) -> Application:
+    """Creates new instance of the application
+
+    If `async_db_engine` is given, query handlers use an AsyncSession, and transactions are
+    committed and rolled back asynchronously (so transaction contexts must be entered with `async with`).
+
+    If `outbox_enabled` is set, events handled by subscription modules are saved in the outbox
+    and delivered by the outbox relay (see `create_outbox_relay`), instead of being handled in the same transaction.
+
+    A transaction context created with `write_behind=True` (a batch of commands, see AggregateMailboxExecutor)
+    uses repositories which defer writes until `persist_all` is called.
+
+    If `query_cache` is given, results of query handlers decorated with `cached_query` are cached, and tags
+    invalidated by events published in a transaction are invalidated when the transaction is committed.
+    Queries executed with `read_your_writes` bypass the cache, results read from a replica are cached
+    for at most the maximum replica lag.
+
+    A transaction context created with `request_scoped=True` (see UnitOfWork) keeps its database connection
+    across commit points. Transaction containers are reused from `container_pool`.
+
+    If `handler_metrics` is given, dispatches of messages and commits are measured (see HandlerMetrics).
+
+    If `statement_accounting` is given, SQL statements of messages (including statements of event handlers
+    and commits) are counted, and checked against their budgets when the transaction is committed.
+
+    If `replica_db_engine` is given, query handlers get a read-only session of the replica (see ReadOnlySession),
+    while command handlers and repositories use the session of the primary. Queries read the primary if the replica
+    is stale (see `replica_lag_monitor`), or if they are executed with `read_your_writes` (see UnitOfWork.execute).
+    """
+    password_hasher = password_hasher or BcryptPasswordHasher()
+    container_pool = container_pool or TransactionContainerPool()
     application = Application(
         "BiddingApp",
         app_version=0.1,
         db_engine=db_engine,
+        async_db_engine=async_db_engine,
+        access_token_cache=access_token_cache,
+        password_hasher=password_hasher,
+        query_cache=query_cache,
+        handler_metrics=handler_metrics,
+        statement_accounting=statement_accounting,
+        replica_db_engine=replica_db_engine,
+        replica_lag_monitor=replica_lag_monitor,
     )
     application.include_submodule(catalog_module)
     application.include_submodule(bidding_module)
+    if async_db_engine is None:
+        application.include_submodule(catalog_queries)
+        application.include_submodule(bidding_queries)
+    else:
+        application.include_submodule(catalog_async_queries)
+        application.include_submodule(bidding_async_queries)
+    if outbox_enabled:
+        outbox_event_types = get_subscribed_event_types(SUBSCRIPTION_MODULES)
+    else:
+        outbox_event_types = ()
+        for module in SUBSCRIPTION_MODULES:
+            application.include_submodule(module)
+    compile_handler_plans(application)
+    # types resolved for handlers, checked when the index of the transaction container is built
+    dependency_types = get_dependency_types(application)
+    # sessions of query handlers do not keep transactions open on the replica
+    read_engine = (
+        replica_db_engine.execution_options(isolation_level="AUTOCOMMIT")
+        if replica_db_engine is not None
+        else None
+    )
 
     @application.on_create_transaction_context
     def on_create_transaction_context(**kwargs):
         engine = application.get_dependency("db_engine")
-        session = Session(engine)
+        if kwargs.get("request_scoped", False):
+            session = PinnedSession(engine)
+        else:
+            session = Session(engine)
+        async_session = AsyncSession(async_db_engine) if async_db_engine else None
+        read_session = None
+        if read_engine is not None and not (
+            replica_lag_monitor is not None and replica_lag_monitor.is_stale()
+        ):
+            read_session = ReadOnlySession(read_engine)
         correlation_id = uuid.uuid4()
         logger.correlation_id.set(uuid.uuid4())  # type: ignore
 
-        # create IoC container for the transaction
+        # get IoC container for the transaction, it is released when the transaction ends
         dependency_provider = ContainerProvider(
-            TransactionContainer(
-                db_session=session, correlation_id=correlation_id, logger=logger
-            )
+            container_pool.acquire(
+                db_session=session,
+                async_db_session=async_session,
+                read_db_session=read_session,
+                read_your_writes=False,
+                access_token_cache=access_token_cache,
+                invalidated_access_tokens=set(),
+                password_hasher=password_hasher,
+                write_behind=kwargs.get("write_behind", False),
+                correlation_id=correlation_id,
+                logger=logger,
+            ),
+            read_session="read_db_session" if read_session is not None else None,
+            dependency_types=dependency_types,
         )
 
         return TransactionContext(dependency_provider)
 
+    def collect_invalidated_cache_tags(ctx: TransactionContext, event):
+        if query_cache is not None:
+            ctx["invalidated_cache_tags"].update(query_cache.tags_invalidated_by(event))
+
     @application.on_enter_transaction_context
     def on_enter_transaction_context(ctx: TransactionContext):
-        ctx.set_dependencies(publish=ctx.publish)
-        logger.debug("Entering transaction")
+        def publish(message, *args, **kwargs):
+            collect_invalidated_cache_tags(ctx, message)
+            return ctx.publish(message, *args, **kwargs)
+
+        # cache tags are invalidated when the transaction is committed
+        ctx.set_dependencies(
+            publish=publish,
+            invalidated_cache_tags=set(),
+            commit=partial(
+                commit_async if async_db_engine is not None else commit, ctx
+            ),
+        )
+        if handler_metrics is not None:
+            # types of messages dispatched since the last commit, which is measured for each of them
+            ctx.set_dependency("dispatched_message_types", set())
+        if statement_accounting is not None:
+            # statements of messages dispatched since the last commit, by message type
+            ctx.set_dependency("message_statements", [])
+        lazy_logger.debug("Entering transaction")
+
+    def commit(ctx: TransactionContext, start: Optional[float] = None):
+        if start is None:
+            start = time.perf_counter()
+        if statement_accounting is None:
+            ctx["db_session"].commit()
+        else:
+            with count_statements() as commit_stats:
+                ctx["db_session"].commit()
+            observe_statements(ctx, commit_stats)
+        lazy_logger.debug("committed")
+        if handler_metrics is not None:
+            dispatched_message_types = ctx["dispatched_message_types"]
+            handler_metrics.observe_commit(
+                dispatched_message_types, time.perf_counter() - start
+            )
+            dispatched_message_types.clear()
+        if query_cache is not None:
+            invalidated_cache_tags = ctx["invalidated_cache_tags"]
+            query_cache.invalidate(invalidated_cache_tags)
+            invalidated_cache_tags.clear()
+        if access_token_cache is not None:
+            invalidated_access_tokens = ctx["invalidated_access_tokens"]
+            for access_token in invalidated_access_tokens:
+                access_token_cache.invalidate(access_token)
+            invalidated_access_tokens.clear()
+
+    def observe_statements(ctx: TransactionContext, commit_stats):
+        """Accounts statements of messages dispatched since the last commit, including statements of the commit"""
+        message_statements = ctx["message_statements"]
+        for message_type, stats in message_statements:
+            stats.add(commit_stats)
+            statement_accounting.observe(message_type, stats)
+        message_statements.clear()
+
+    async def commit_async(ctx: TransactionContext):
+        start = time.perf_counter()
+        await ctx["async_db_session"].commit()
+        # the synchronous session blocks on the database, so it is committed in a worker thread
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, commit, ctx, start)
 
-    @application.on_exit_transaction_context
     def on_exit_transaction_context(
         ctx: TransactionContext, exception: Optional[Exception] = None
     ):
+        end_transaction(ctx, exception)
+        logger.correlation_id.set(uuid.UUID(int=0))  # type: ignore
+
+    def end_transaction(ctx: TransactionContext, exception: Optional[Exception]):
         session = ctx["db_session"]
         if exception:
             session.rollback()
-            logger.warning(f"rollback due to {exception}")
+            lazy_logger.warning("rollback due to %s", exception)
 
             # from pydantic import ValidationError
             # if type(exception) not in [ValidationError]:
             #     raise exception
         else:
-            session.commit()
-            logger.debug(f"committed")
+            commit(ctx)
         session.close()
-        logger.debug(f"transaction ended")
+        read_session = ctx["read_db_session"]
+        if read_session is not None:
+            read_session.close()
+        container_pool.release(ctx.dependency_provider.container)
+        lazy_logger.debug("transaction ended")
+
+    async def on_exit_transaction_context_async(
+        ctx: TransactionContext, exception: Optional[Exception] = None
+    ):
+        async_session = ctx["async_db_session"]
+        if exception:
+            await async_session.rollback()
+        else:
+            await async_session.commit()
+        await async_session.close()
+        # the synchronous session is closed in a worker thread, in a copy of the context (so records logged there
+        # have the correlation id of the transaction), the correlation id is reset in the context of the caller
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, contextvars.copy_context().run, end_transaction, ctx, exception
+        )
         logger.correlation_id.set(uuid.UUID(int=0))  # type: ignore
 
+    if async_db_engine is None:
+        application.on_exit_transaction_context(on_exit_transaction_context)
+    else:
+        application.on_exit_transaction_context(on_exit_transaction_context_async)
+
+    query_cache_policies: dict[type, Optional[CachePolicy]] = {}
+
+    def get_query_cache_policy(message_cls: type) -> Optional[CachePolicy]:
+        try:
+            return query_cache_policies[message_cls]
+        except KeyError:
+            pass
+
+        policy = None
+        for message_handler in application.get_handlers_for(message_cls):
+            policy = policy or get_cache_policy(message_handler.fn)
+        query_cache_policies[message_cls] = policy
+        return policy
+
+    async def query_cache_middleware(ctx: TransactionContext, call_next):
+        message = ctx["message"]
+        policy = get_query_cache_policy(type(message))
+
+        async def load():
+            result = call_next()
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+
+        if policy is None or ctx["invalidated_cache_tags"] or ctx["read_your_writes"]:
+            # a transaction with changes not committed yet, or a query reading its writes, reads the database
+            return await load()
+
+        ttl = policy.ttl
+        if ctx["read_db_session"] is not None:
+            # results read from the replica may be as stale as the replica lag allows, so they expire sooner
+            if replica_lag_monitor is None:
+                return await load()
+            ttl = min(
+                query_cache.ttl if ttl is None else ttl, replica_lag_monitor.max_lag
+            )
+        return await query_cache.get_or_load(
+            policy.get_key(message), policy.get_tags(message), load, ttl
+        )
+
+    async def measure_dispatch(ctx: TransactionContext, call_next):
+        message_type = type(ctx["message"])
+        dispatch = handler_metrics.begin_dispatch(
+            message_type, ctx.dependency_provider.resolution_time
+        )
+        if dispatch.parent is None:
+            ctx["dispatched_message_types"].add(message_type)
+        start = time.perf_counter()
+        try:
+            result = call_next()
+            if asyncio.iscoroutine(result):
+                result = await result
+        except Exception:
+            handler_metrics.end_dispatch(dispatch, time.perf_counter() - start, True)
+            raise
+        handler_metrics.end_dispatch(dispatch, time.perf_counter() - start, False)
+        return result
+
+    async def count_dispatch_statements(ctx: TransactionContext, call_next):
+        message_type = type(ctx["message"])
+        with statement_accounting.dispatch() as stats:
+            if stats is not None:
+                # a top-level dispatch, statements of nested ones are counted by it
+                ctx["message_statements"].append((message_type, stats))
+            if handler_metrics is None:
+                result = call_next()
+                if asyncio.iscoroutine(result):
+                    result = await result
+                return result
+            return await measure_dispatch(ctx, call_next)
+
+    # registered first, so it measures other middlewares (i.e. results served by the query cache) as well;
+    # dispatches are measured here instead of in a middleware of their own, as each middleware adds
+    # several microseconds to a dispatch
     @application.transaction_middleware
     async def logging_middleware(ctx: TransactionContext, call_next):
-        description = (
-            f"{ctx.current_action[1]} -> {repr(ctx.current_action[0])}"
-            if ctx.current_action
-            else ""
-        )
-        logger.debug(f"Executing {description}...")
-        result = call_next()
-        if asyncio.iscoroutine(result):
-            result = await result
-        logger.debug(f"Finished executing {description}")
+        description = lazy(describe_action, ctx)
+        lazy_logger.debug("Executing %s...", description)
+        if statement_accounting is not None:
+            result = await count_dispatch_statements(ctx, call_next)
+        elif handler_metrics is not None:
+            result = await measure_dispatch(ctx, call_next)
+        else:
+            result = call_next()
+            if asyncio.iscoroutine(result):
+                result = await result
+        lazy_logger.debug("Finished executing %s", description)
         return result
 
+    if query_cache is not None:
+        application.transaction_middleware(query_cache_middleware)
+
     @application.transaction_middleware
     async def event_collector_middleware(ctx: TransactionContext, call_next):
         handler_kwargs = call_next.keywords
+        if not handler_kwargs and call_next.args:
+            # a sync handler is wrapped by lato with `maybe_await`
+            handler_kwargs = getattr(call_next.args[0], "keywords", {})
 
         result = call_next()
         if asyncio.iscoroutine(result):
             result = await result
 
-        logger.debug(f"Collecting event from {ctx['message'].__class__}")
+        lazy_logger.debug("Collecting events from %s", lazy(describe_message, ctx))
 
         domain_events = []
         repositories = filter(
@@ -133,14 +574,117 @@ def create_application(db_engine) -> Application:
         for repo in repositories:
             domain_events.extend(repo.collect_events())
         for event in domain_events:
-            logger.debug(f"Publishing {event}")
+            lazy_logger.debug("Publishing %s", event)
             await ctx.publish_async(event)
+            collect_invalidated_cache_tags(ctx, event)
+            if isinstance(event, outbox_event_types):
+                ctx["outbox"].save(event)
 
         return result
 
     return application
 
 
+def create_outbox_relay(application, db_engine, config) -> OutboxRelay:
+    return OutboxRelay(
+        application,
+        db_engine,
+        subscribers=SUBSCRIPTION_MODULES,
+        batch_size=config.OUTBOX_BATCH_SIZE,
+        poll_interval=config.OUTBOX_POLL_INTERVAL,
+        claim_timeout=config.OUTBOX_CLAIM_TIMEOUT,
+    )
+
+
+def create_message_executor(application, db_engine, config) -> MessageExecutor:
+    """
+    Creates an executor with a thread pool sized to the database connection pool. With COMMAND_MAILBOX_ENABLED,
+    commands targeting the same aggregate are executed in batches, one batch of an aggregate at a time.
+    """
+    pool = db_engine.pool
+    max_workers = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    if config.COMMAND_MAILBOX_ENABLED:
+        return AggregateMailboxExecutor(
+            application,
+            max_workers=max_workers,
+            batch_window=config.COMMAND_MAILBOX_BATCH_WINDOW,
+            max_batch_size=config.COMMAND_MAILBOX_MAX_BATCH_SIZE,
+        )
+    return MessageExecutor(application, max_workers=max_workers)
+
+
+class TransactionContainerPool:
+    """
+    Pool of transaction containers, reused by transaction contexts instead of instantiating a container
+    (which copies all its providers) for each of them.
+
+    A container is acquired with values of its dependencies, and reset when released: its singletons are dropped,
+    dependencies are cleared and providers registered by a transaction context (i.e. `message`) are removed.
+    At most `max_size` released containers are kept, 0 disables pooling.
+    """
+
+    def __init__(self, container_cls=None, max_size: int = 32):
+        self.container_cls = container_cls or TransactionContainer
+        self.max_size = max_size
+        self.created = 0  # number of containers instantiated by the pool
+        self._free: list[_PooledContainer] = []
+        self._acquired: dict[int, _PooledContainer] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, **dependencies) -> Container:
+        with self._lock:
+            pooled = self._free.pop() if self._free else None
+        if pooled is None:
+            pooled = _PooledContainer(self.container_cls())
+            self.created += 1
+        for name, value in dependencies.items():
+            pooled.values[name].set_provides(value)
+        with self._lock:
+            self._acquired[id(pooled.container)] = pooled
+        return pooled.container
+
+    def release(self, container: Container):
+        with self._lock:
+            pooled = self._acquired.pop(id(container), None)
+        if pooled is None:
+            return  # not acquired from this pool
+
+        pooled.reset()
+        with self._lock:
+            if len(self._free) < self.max_size:
+                self._free.append(pooled)
+
+
+class _PooledContainer:
+    """A container with its own providers, and values of its dependencies set in place"""
+
+    def __init__(self, container: Container):
+        self.container = container
+        self.providers = dict(container.providers)
+        self.singletons = [
+            provider
+            for provider in self.providers.values()
+            if isinstance(provider, Singleton)
+        ]
+        self.values: dict[str, providers.Object] = {}
+        for name, provider in self.providers.items():
+            if isinstance(provider, Dependency):
+                self.values[name] = providers.Object(None)
+                provider.override(self.values[name])
+
+    def reset(self):
+        for name, provider in list(self.container.providers.items()):
+            original = self.providers.get(name)
+            if original is None:
+                delattr(self.container, name)
+            elif provider is not original:
+                setattr(self.container, name, original)
+        for singleton in self.singletons:
+            singleton.reset()
+        for value in self.values.values():
+            value.set_provides(None)
+
+
 class ApplicationContainer(containers.DeclarativeContainer):
     """Dependency Injection container for the application (application-level dependencies)
     see https://github.com/ets-labs/python-dependency-injector for more details
@@ -149,7 +693,47 @@ class ApplicationContainer(containers.DeclarativeContainer):
     __self__ = providers.Self()
     config = providers.Dependency(instance_of=BaseSettings)
     db_engine = providers.Singleton(create_db_engine, config)
-    application = providers.Singleton(create_application, db_engine)
+    replica_db_engine = providers.Singleton(create_replica_db_engine, config)
+    replica_lag_monitor = providers.Singleton(
+        create_replica_lag_monitor, config, replica_db_engine
+    )
+    async_db_engine = providers.Singleton(create_async_db_engine, config)
+    access_token_cache = providers.Singleton(create_access_token_cache, config)
+    password_hasher = providers.Resource(init_password_hasher, config)
+    query_cache = providers.Singleton(create_query_cache, config)
+    handler_metrics = providers.Singleton(create_handler_metrics, config)
+    statement_accounting = providers.Singleton(
+        create_statement_accounting,
+        config,
+        handler_metrics,
+        db_engine,
+        replica_db_engine,
+        async_db_engine,
+    )
+    container_pool = providers.Singleton(
+        TransactionContainerPool,
+        max_size=config.provided.TRANSACTION_CONTAINER_POOL_SIZE,
+    )
+    application = providers.Singleton(
+        create_application,
+        db_engine,
+        async_db_engine,
+        access_token_cache,
+        password_hasher,
+        config.provided.OUTBOX_ENABLED,
+        query_cache,
+        container_pool,
+        handler_metrics,
+        statement_accounting,
+        replica_db_engine,
+        replica_lag_monitor,
+    )
+    message_executor = providers.Singleton(
+        create_message_executor, application, db_engine, config
+    )
+    outbox_relay = providers.Singleton(
+        create_outbox_relay, application, db_engine, config
+    )
 
 
 class TransactionContainer(containers.DeclarativeContainer):
@@ -159,61 +743,202 @@ class TransactionContainer(containers.DeclarativeContainer):
 
     correlation_id = providers.Dependency(instance_of=UUID)
     db_session = providers.Dependency(instance_of=Session)
+    async_db_session = providers.Dependency(
+        instance_of=AsyncSession
+    )  # None, unless async persistence mode is enabled
+    # a ReadOnlySession of query handlers, or None if queries use `db_session` (so its type is not checked,
+    # and a session is resolved by type uniquely)
+    read_db_session = providers.Dependency()
+    read_your_writes = providers.Dependency(
+        instance_of=bool, default=False
+    )  # set to make queries read `db_session`, see UnitOfWork.execute
+    # an AccessTokenCache, or None if the cache is disabled (so its type is not checked)
+    access_token_cache = providers.Dependency()
+    # access tokens of users changed in the transaction, invalidated in `access_token_cache` on commit
+    invalidated_access_tokens = providers.Dependency(instance_of=set)
+    password_hasher = providers.Dependency(instance_of=PasswordHasher)
+    write_behind = providers.Dependency(
+        instance_of=bool, default=False
+    )  # set for batches of commands, repositories write changes in persist_all
     logger = providers.Dependency(instance_of=Logger)
 
-    outbox = providers.Singleton(InMemoryOutbox)
+    outbox = providers.Singleton(SqlAlchemyOutbox, db_session=db_session)
 
     catalog_listing_repository = providers.Singleton(
         CatalogPostgresJsonListingRepository,
         db_session=db_session,
+        write_behind=write_behind,
     )
 
     bidding_listing_repository = providers.Singleton(
         BiddingPostgresJsonListingRepository,
         db_session=db_session,
+        write_behind=write_behind,
+    )
+
+    bidding_projection = providers.Singleton(
+        BiddingProjection,
+        db_session=db_session,
+        write_behind=write_behind,
     )
 
     user_repository = providers.Singleton(
         PostgresJsonUserRepository,
         db_session=db_session,
+        write_behind=write_behind,
     )
 
-    iam_service = providers.Singleton(IamService, user_repository=user_repository)
-
+    catalog_async_listing_repository = providers.Singleton(
+        CatalogAsyncPostgresJsonListingRepository,
+        db_session=async_db_session,
+        write_behind=write_behind,
+    )
 
-def resolve_provider_by_type(container: Container, cls: type) -> Optional[Provider]:
-    def inspect_provider(provider: Provider) -> bool:
-        if isinstance(provider, (Factory, Singleton)):
-            return issubclass(provider.cls, cls)
-        elif isinstance(provider, Dependency):
-            return issubclass(provider.instance_of, cls)
+    bidding_async_listing_repository = providers.Singleton(
+        BiddingAsyncPostgresJsonListingRepository,
+        db_session=async_db_session,
+        write_behind=write_behind,
+    )
 
-        return False
+    async_user_repository = providers.Singleton(
+        AsyncPostgresJsonUserRepository,
+        db_session=async_db_session,
+        write_behind=write_behind,
+    )
 
-    matching_providers = inspect.getmembers(
-        container,
-        inspect_provider,
+    iam_service = providers.Singleton(
+        IamService,
+        user_repository=user_repository,
+        access_token_cache=access_token_cache,
+        password_hasher=password_hasher,
+        invalidated_access_tokens=invalidated_access_tokens,
     )
-    if matching_providers:
-        if len(matching_providers) > 1:
+
+
+def _get_provided_type(provider: Provider) -> Optional[type]:
+    if isinstance(provider, (Factory, Singleton)):
+        return provider.cls
+    elif isinstance(provider, Dependency):
+        return provider.instance_of
+    return None
+
+
+def scan_providers_by_type(providers: dict[str, Provider], cls: type) -> list[str]:
+    """Returns names of all providers providing `cls` (or its subclass), by scanning every provider"""
+    matching_names = []
+    for name, provider in providers.items():
+        provided_type = _get_provided_type(provider)
+        if provided_type is not None and issubclass(provided_type, cls):
+            matching_names.append(name)
+    return matching_names
+
+
+class ProviderIndex:
+    """Maps types to provider names. The index is built once per container class and then
+    shared by all instances of that container, so resolving a dependency by type is a dict lookup.
+
+    Every class in the MRO of a provided type is indexed, so a provider can be resolved by any of its
+    base classes (i.e. a repository interface). Types not present in any MRO (i.e. virtual subclasses of ABCs)
+    are resolved with a full scan on the first lookup, and the result is memoized.
+
+    `dependency_types` (i.e. types of handler parameters) are checked when the index is built, so a type provided
+    by several providers fails the build instead of a dispatch of a message. Other types provided by several
+    providers (i.e. `object`) fail when they are resolved.
+    """
+
+    def __init__(
+        self, providers: dict[str, Provider], dependency_types: Iterable[type] = ()
+    ):
+        self._providers = dict(providers)
+        self._names_by_type: dict[type, tuple[str, ...]] = {}
+        for name, provider in self._providers.items():
+            provided_type = _get_provided_type(provider)
+            if provided_type is None:
+                continue
+            for base in inspect.getmro(provided_type):
+                self._names_by_type[base] = self._names_by_type.get(base, ()) + (name,)
+        for cls in dependency_types:
+            self._check_unique(cls, self._get_names(cls))
+
+    def resolve(self, cls: type) -> Optional[str]:
+        """Returns a name of a provider providing `cls`, or None if there is no such provider"""
+        names = self._get_names(cls)
+        self._check_unique(cls, names)
+        return names[0] if names else None
+
+    def _get_names(self, cls: type) -> tuple[str, ...]:
+        try:
+            return self._names_by_type[cls]
+        except KeyError:
+            names = self._names_by_type[cls] = tuple(
+                scan_providers_by_type(self._providers, cls)
+            )
+            return names
+
+    @staticmethod
+    def _check_unique(cls: type, names: tuple[str, ...]) -> None:
+        if len(names) > 1:
             raise ValueError(
-                f"Cannot uniquely resolve {cls}. Found {len(providers)} matching resources."
+                f"Cannot uniquely resolve {cls}. Found {len(names)} matching resources."
             )
-        return matching_providers[0][1]
-    return None
+
+
+_provider_indexes: dict[tuple[type, frozenset[type]], ProviderIndex] = {}
+
+
+def get_provider_index(
+    container: Container, dependency_types: frozenset[type] = frozenset()
+) -> ProviderIndex:
+    """
+    Returns the index of a container class, building it on first use,
+    raises ValueError if any of `dependency_types` cannot be resolved uniquely (see ProviderIndex)
+    """
+    container_cls = getattr(container, "declarative_parent", None)
+    if container_cls is None:
+        # a container without a declarative class cannot share the index
+        return ProviderIndex(container.providers, dependency_types)
+
+    key = (container_cls, dependency_types)
+    index = _provider_indexes.get(key)
+    if index is None:
+        index = _provider_indexes[key] = ProviderIndex(
+            container_cls.providers, dependency_types
+        )
+    return index
+
+
+def resolve_provider_by_type(container: Container, cls: type) -> Optional[Provider]:
+    name = get_provider_index(container).resolve(cls)
+    if name is None:
+        return None
+    return getattr(container, name)
 
 
 class ContainerProvider(DependencyProvider):
-    """A dependency provider that uses a dependency injector container under the hood"""
+    """A dependency provider that uses a dependency injector container under the hood
 
-    def __init__(self, container: Container):
+    If `read_session` (a name of a provider) is given, a Session parameter of a query handler is resolved
+    with that provider, unless the `read_your_writes` dependency is set.
+    Building the index of the container fails if any of `dependency_types` (i.e. types of handler parameters,
+    see `get_dependency_types`) is provided by several providers.
+    """
+
+    def __init__(
+        self,
+        container: Container,
+        read_session: Optional[str] = None,
+        dependency_types: frozenset[type] = frozenset(),
+    ):
         self.container = container
+        self.read_session = read_session
+        self.dependency_types = dependency_types
         self.counter = 0
+        self.resolution_time = 0.0  # seconds, of the last `resolve_func_params`
+        self._index = get_provider_index(container, dependency_types)
+        self._routes: dict[type, str] = {}  # provider names overriding the index
 
     def has_dependency(self, identifier: str | type) -> bool:
-        if isinstance(identifier, type) and resolve_provider_by_type(
-            self.container, identifier
-        ):
+        if isinstance(identifier, type) and self._index.resolve(identifier):
             return True
         if type(identifier) is str:
             return identifier in self.container.providers
@@ -228,17 +953,39 @@ class ContainerProvider(DependencyProvider):
             self.counter += 1
 
     def get_dependency(self, identifier):
-        try:
-            if isinstance(identifier, type):
-                provider = resolve_provider_by_type(self.container, identifier)
-            else:
-                provider = getattr(self.container, identifier)
-            instance = provider()
-        except Exception as e:
-            raise e
-        return instance
+        if isinstance(identifier, type):
+            name = self._routes.get(identifier) or self._index.resolve(identifier)
+            provider = getattr(self.container, name) if name else None
+        else:
+            provider = getattr(self.container, identifier)
+        return provider()
+
+    def resolve_func_params(self, func, func_args=None, func_kwargs=None):
+        start = time.perf_counter()
+        plan = get_handler_plan(func)
+        if self._reads_replica(func_args):
+            # a Session of a query handler is resolved with the read session
+            self._routes = {Session: self.read_session}
+            try:
+                resolved_kwargs = plan.resolve_kwargs(self, func_args, func_kwargs)
+            finally:
+                self._routes = {}
+        else:
+            resolved_kwargs = plan.resolve_kwargs(self, func_args or (), func_kwargs)
+        self.resolution_time = time.perf_counter() - start
+        return resolved_kwargs
+
+    def _reads_replica(self, func_args) -> bool:
+        return (
+            self.read_session is not None
+            and bool(func_args)
+            and isinstance(func_args[0], Query)
+            and not self.container.read_your_writes()
+        )
 
     def copy(self, *args, **kwargs):
-        dp = ContainerProvider(copy.copy(self.container))
+        dp = ContainerProvider(
+            copy.copy(self.container), self.read_session, self.dependency_types
+        )
         dp.update(*args, **kwargs)
         return dp
@@ -0,0 +1,331 @@
+import abc
+import threading
+import time
+import uuid
+
+import pytest
+from dependency_injector import containers, providers
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import NoResultFound
+
+from config.api_config import ApiConfig
+from config.container import (
+    ContainerProvider,
+    TransactionContainer,
+    TransactionContainerPool,
+    create_replica_db_engine,
+    get_provider_index,
+)
+from modules.bidding.domain.repositories import (
+    ListingRepository as BiddingListingRepository,
+)
+from modules.catalog.application.command import PublishListingDraftCommand
+from modules.catalog.application.query import GetAllListings, GetListingDetails
+from modules.catalog.domain.repositories import (
+    ListingRepository as CatalogListingRepository,
+)
+from modules.catalog.infrastructure.listing_repository import (
+    AsyncPostgresJsonListingRepository as CatalogAsyncPostgresJsonListingRepository,
+)
+from seedwork.domain.repositories import GenericRepository
+from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.logging import logger
+from seedwork.infrastructure.outbox import OutboxMessageModel
+
+
+class Service(abc.ABC):
+    ...
+
+
+class ServiceA(Service):
+    ...
+
+
+class ServiceB(Service):
+    ...
+
+
+class VirtualService(abc.ABC):
+    ...
+
+
+VirtualService.register(ServiceA)
+
+
+class ServiceContainer(containers.DeclarativeContainer):
+    service_a = providers.Singleton(ServiceA)
+    service_b = providers.Singleton(ServiceB)
+
+
+def create_transaction_container():
+    return TransactionContainer(
+        db_session=Session(), correlation_id=uuid.uuid4(), logger=logger
+    )
+
+
+@pytest.mark.unit
+def test_provider_index_is_shared_by_container_instances():
+    container1 = create_transaction_container()
+    container2 = create_transaction_container()
+
+    assert get_provider_index(container1) is get_provider_index(container2)
+
+
+@pytest.mark.unit
+def test_container_pool_reuses_reset_containers():
+    pool = TransactionContainerPool()
+    session_1, session_2 = Session(), Session()
+
+    container_1 = pool.acquire(db_session=session_1, write_behind=True)
+    repository_1 = container_1.catalog_listing_repository()
+    container_1.message = providers.Object("registered by a transaction context")
+    pool.release(container_1)
+    container_2 = pool.acquire(db_session=session_2, write_behind=False)
+    repository_2 = container_2.catalog_listing_repository()
+
+    assert container_2 is container_1
+    assert pool.created == 1
+    assert repository_2 is not repository_1
+    assert repository_2._session is session_2
+    assert repository_2._write_behind is False
+    assert "message" not in container_2.providers
+
+
+@pytest.mark.unit
+def test_container_provider_resolves_dependency_by_base_class():
+    dependency_provider = ContainerProvider(create_transaction_container())
+
+    assert dependency_provider.has_dependency(CatalogListingRepository)
+    assert dependency_provider.has_dependency(BiddingListingRepository)
+    assert dependency_provider.get_dependency(
+        BiddingListingRepository
+    ) is dependency_provider.get_dependency("bidding_listing_repository")
+
+
+@pytest.mark.unit
+def test_provider_index_detects_ambiguous_types():
+    index = get_provider_index(ServiceContainer())
+
+    assert index.resolve(ServiceA) == "service_a"
+    with pytest.raises(ValueError):
+        index.resolve(Service)
+    with pytest.raises(ValueError):
+        get_provider_index(create_transaction_container()).resolve(GenericRepository)
+
+
+@pytest.mark.unit
+def test_container_provider_fails_to_build_index_with_ambiguous_dependency_type():
+    with pytest.raises(ValueError):
+        ContainerProvider(ServiceContainer(), dependency_types=frozenset({Service}))
+
+    dependency_provider = ContainerProvider(
+        ServiceContainer(), dependency_types=frozenset({ServiceA, VirtualService})
+    )
+    assert dependency_provider.get_dependency(ServiceA) is not None
+
+
+@pytest.mark.unit
+def test_provider_index_resolves_virtual_subclasses():
+    index = get_provider_index(ServiceContainer())
+
+    assert index.resolve(VirtualService) == "service_a"
+    assert index.resolve(int) is None
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_async_persistence_mode_uses_async_query_handlers(
+    engine, create_application_container, create_listing_draft_command
+):
+    container = create_application_container(DATABASE_ASYNC=True)
+    app = container.application()
+    listing_id = GenericUUID.next_id()
+
+    try:
+        await app.execute_async(create_listing_draft_command(listing_id))
+        page = await app.execute_async(GetAllListings())
+        details = await app.execute_async(GetListingDetails(listing_id=listing_id))
+
+        async with app.transaction_context() as ctx:
+            async_repository = ctx[CatalogAsyncPostgresJsonListingRepository]
+            listing = await async_repository.get_by_id(listing_id)
+    finally:
+        await container.async_db_engine().dispose()
+
+    assert [
+        handler.fn.__name__ for handler in app.get_handlers_for(GetAllListings)
+    ] == ["get_all_listings_async"]
+    assert [listing["id"] for listing in page.items] == [listing_id]
+    assert details["title"] == "Foo"
+    assert listing.title == "Foo"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_async_persistence_mode_resets_correlation_id_of_caller(
+    engine, create_application_container
+):
+    container = create_application_container(DATABASE_ASYNC=True)
+    app = container.application()
+
+    try:
+        async with app.transaction_context():
+            assert logger.correlation_id.get() != uuid.UUID(int=0)
+    finally:
+        await container.async_db_engine().dispose()
+
+    # the synchronous session is closed in a worker thread, but the id is reset in the context of the caller
+    assert logger.correlation_id.get() == uuid.UUID(int=0)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_outbox_mode_delivers_listing_published_event_via_relay(
+    engine, create_application_container, create_listing_draft_command
+):
+    container = create_application_container(OUTBOX_ENABLED=True)
+    app = container.application()
+    relay = container.outbox_relay()
+    listing_id = GenericUUID.next_id()
+    seller_id = GenericUUID.next_id()
+
+    await app.execute_async(create_listing_draft_command(listing_id, seller_id))
+    await app.execute_async(
+        PublishListingDraftCommand(listing_id=listing_id, seller_id=seller_id)
+    )
+
+    with Session(engine) as session:
+        assert session.query(OutboxMessageModel).count() == 1
+    with app.transaction_context() as ctx:
+        assert ctx[BiddingListingRepository].count() == 0
+
+    assert await relay.relay_batch() == 1
+
+    with app.transaction_context() as ctx:
+        assert ctx[BiddingListingRepository].get_by_id(listing_id).id == listing_id
+    assert relay.stats.relayed == 1
+
+
+def create_sqlite_engine(tmp_path, **pool_options):
+    """An engine with a pool configured like the one of the primary database, using SQLite as a stand-in"""
+    config = ApiConfig(
+        DATABASE_REPLICA_URL=f"sqlite:///{tmp_path / 'db.sqlite'}",
+        **{f"DATABASE_{key.upper()}": value for key, value in pool_options.items()},
+    )
+    return create_replica_db_engine(config)
+
+
+@pytest.mark.unit
+def test_exhausted_pool_times_out_and_counts_timeouts(tmp_path):
+    engine = create_sqlite_engine(
+        tmp_path, pool_size=2, max_overflow=0, pool_timeout=0.05
+    )
+    connections = [engine.connect() for _ in range(2)]
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    status = engine.pool.status_dict()
+    assert status["checked_out"] == 2
+    assert status["timeouts"] == 1
+    assert status["wait_seconds"] >= 0.05
+    for connection in connections:
+        connection.close()
+    assert engine.pool.status_dict()["checked_out"] == 0
+
+
+@pytest.mark.unit
+def test_saturated_pool_makes_threads_wait_for_connections(tmp_path):
+    engine = create_sqlite_engine(tmp_path, pool_size=2, max_overflow=1)
+
+    def use_connection():
+        with engine.connect():
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=use_connection) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    status = engine.pool.status_dict()
+    assert status["checkouts"] == 12
+    assert status["timeouts"] == 0
+    assert status["max_checked_out"] == 3  # the pool size and its overflow
+    assert status["wait_seconds"] > 0.02
+    assert 'db_pool_max_checked_out{engine="replica"} 3' in (
+        engine.pool.render(engine="replica").splitlines()
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_queries_read_replica_unless_reading_own_writes(
+    engine, create_application_container, create_listing_draft_command
+):
+    # the primary database is used as a stand-in for a replica, which does not see uncommitted changes
+    config = ApiConfig()
+    container = create_application_container(DATABASE_REPLICA_URL=config.DATABASE_URL)
+    app = container.application()
+    listing_id = GenericUUID.next_id()
+
+    async with app.transaction_context() as ctx:
+        await ctx.execute_async(create_listing_draft_command(listing_id))
+        with pytest.raises(NoResultFound):
+            await ctx.execute_async(GetListingDetails(listing_id=listing_id))
+
+        ctx.set_dependency("read_your_writes", True)
+        details = await ctx.execute_async(GetListingDetails(listing_id=listing_id))
+        assert ctx["read_db_session"] is not ctx["db_session"]
+
+    assert details["title"] == "Foo"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_queries_read_primary_while_replica_is_stale(
+    engine, create_application_container, create_listing_draft_command
+):
+    config = ApiConfig()
+    container = create_application_container(
+        DATABASE_REPLICA_URL=config.DATABASE_URL, DATABASE_REPLICA_MAX_LAG=1.0
+    )
+    app = container.application()
+    container.replica_lag_monitor().lag = 2.0
+    listing_id = GenericUUID.next_id()
+
+    async with app.transaction_context() as ctx:
+        await ctx.execute_async(create_listing_draft_command(listing_id))
+        details = await ctx.execute_async(GetListingDetails(listing_id=listing_id))
+        assert ctx["read_db_session"] is None
+
+    assert details["title"] == "Foo"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_query_cache_is_bypassed_by_queries_reading_own_writes(
+    engine, create_application_container, create_listing_draft_command
+):
+    config = ApiConfig()
+    container = create_application_container(
+        DATABASE_REPLICA_URL=config.DATABASE_URL,
+        DATABASE_REPLICA_MAX_LAG=1.0,
+        QUERY_CACHE_TTL=60.0,
+    )
+    app = container.application()
+    query_cache = container.query_cache()
+    listing_id = GenericUUID.next_id()
+    await app.execute_async(create_listing_draft_command(listing_id))
+
+    await app.execute_async(GetListingDetails(listing_id=listing_id))
+    async with app.transaction_context() as ctx:
+        ctx.set_dependency("read_your_writes", True)
+        await ctx.execute_async(GetListingDetails(listing_id=listing_id))
+
+    stats = query_cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (0, 1, 1)
+    # a result read from the replica expires within the maximum replica lag
+    ((expires_at, _, _),) = query_cache._entries.values()
+    assert expires_at <= time.monotonic() + 1.0
@@ -1,20 +1,27 @@
 import uuid
+from contextlib import contextmanager
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
 from api.main import app as fastapi_instance
 from config.api_config import ApiConfig
+from config.container import ApplicationContainer, create_async_db_engine
+from modules.catalog.application.command import CreateListingDraftCommand
 from modules.iam.application.services import IamService
+from seedwork.domain.value_objects import GenericUUID, Money
 from seedwork.infrastructure.database import Base
+from seedwork.infrastructure.sql_accounting import count_statements, instrument_engine
 
 
 @pytest.fixture
 def engine():
     config = ApiConfig()
     eng = create_engine(config.DATABASE_URL, echo=config.DATABASE_ECHO)
+    instrument_engine(eng)
 
     with eng.begin() as connection:
         Base.metadata.drop_all(connection)
@@ -22,12 +29,75 @@ def engine():
         return eng
 
 
+@pytest_asyncio.fixture
+async def async_engine(engine):
+    async_engine = create_async_db_engine(ApiConfig(DATABASE_ASYNC=True))
+    yield async_engine
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def assert_num_statements(engine):
+    """
+    Asserts the number of SQL statements executed in a block, i.e.
+    `with assert_num_statements(1): repo.get_by_ids(ids)`
+    """
+
+    @contextmanager
+    def assert_num_statements(expected: int):
+        with count_statements() as stats:
+            yield stats
+        assert (
+            stats.statements == expected
+        ), f"{stats.statements} SQL statements executed, expected {expected}"
+
+    return assert_num_statements
+
+
 @pytest.fixture
 def db_session(engine):
     with Session(engine) as session:
         yield session
 
 
+@pytest.fixture
+def create_application_container():
+    """Creates application containers, which resources (i.e. worker processes) are shut down after a test"""
+    application_containers = []
+
+    def create(**config):
+        container = ApplicationContainer(config=ApiConfig(**config))
+        application_containers.append(container)
+        return container
+
+    yield create
+    for container in application_containers:
+        container.shutdown_resources()
+
+
+@pytest.fixture
+def create_listing_draft_command():
+    """Creates commands of listing drafts, i.e. `create_listing_draft_command(listing_id, seller_id)`"""
+
+    def create(listing_id, seller_id=None):
+        return CreateListingDraftCommand(
+            listing_id=listing_id,
+            title="Foo",
+            description="Bar",
+            ask_price=Money(10),
+            seller_id=seller_id or GenericUUID.next_id(),
+        )
+
+    return create
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shutdown_api_container():
+    """Stops resources (i.e. worker processes) of the application container of the API after all tests"""
+    yield
+    fastapi_instance.container.shutdown_resources()
+
+
 @pytest.fixture
 def api():
     return fastapi_instance
@@ -60,4 +130,12 @@ def authenticated_api_client(api, app):
 @pytest.fixture
 def app(api, db_session):
     app = api.container.application()
+    access_token_cache = app["access_token_cache"]
+    if access_token_cache is not None:
+        # users are dropped with the tables, so they must be dropped from the cache as well
+        access_token_cache.clear()
+    query_cache = app["query_cache"]
+    if query_cache is not None:
+        # listings are dropped with the tables, without invalidating cached results
+        query_cache.clear()
     return app
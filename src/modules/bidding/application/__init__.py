@@ -3,6 +3,11 @@ import importlib
 
 
 bidding_module = ApplicationModule("bidding")
+# query handlers are registered in separate modules, one for each persistence mode
+bidding_queries = ApplicationModule("bidding_queries")
+bidding_async_queries = ApplicationModule("bidding_async_queries")
+# handlers of events published by other modules, called in the same transaction or delivered via the outbox
+bidding_subscriptions = ApplicationModule("bidding_subscriptions")
 importlib.import_module("modules.bidding.application.command")
 importlib.import_module("modules.bidding.application.query")
 importlib.import_module("modules.bidding.application.event")
@@ -1,2 +1,3 @@
 from .place_bid import PlaceBidCommand
+from .rebuild_bidding_projection import RebuildBiddingProjectionCommand
 from .retract_bid import RetractBidCommand
@@ -4,6 +4,8 @@ from modules.bidding.application import bidding_module
 from modules.bidding.domain.repositories import ListingRepository
 from modules.bidding.domain.value_objects import Bid, Bidder, Money
 from seedwork.application.commands import Command
+from seedwork.application.execution import RetryPolicy, retry_policy
+from seedwork.application.mailbox import aggregate_mailbox
 from seedwork.domain.value_objects import GenericUUID
 
 
@@ -15,6 +17,8 @@ class PlaceBidCommand(Command):
 
 
 @bidding_module.handler(PlaceBidCommand)
+@retry_policy(RetryPolicy())  # retries concurrent updates of a listing
+@aggregate_mailbox("listing_id")
 def place_bid(
     command: PlaceBidCommand, listing_repository: ListingRepository
 ):
@@ -23,3 +27,4 @@ def place_bid(
 
     listing = listing_repository.get_by_id(command.listing_id)
     listing.place_bid(bid)
+    listing_repository.persist(listing)
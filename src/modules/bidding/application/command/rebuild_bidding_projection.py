@@ -0,0 +1,34 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from modules.bidding.application import bidding_module
+from modules.bidding.infrastructure.bidding_projection import BiddingProjection
+from modules.bidding.infrastructure.listing_repository import (
+    ListingDataMapper,
+    ListingModel,
+)
+from seedwork.application.commands import Command
+
+
+class RebuildBiddingProjectionCommand(Command):
+    chunk_size: int = 1000  # number of listings loaded and projected at once
+
+
+@bidding_module.handler(RebuildBiddingProjectionCommand)
+def rebuild_bidding_projection(
+    command: RebuildBiddingProjectionCommand,
+    session: Session,
+    projection: BiddingProjection,
+) -> int:
+    """Regenerates read models of all listings from the write model, returns the number of listings"""
+    projection.clear()
+    mapper = ListingDataMapper()
+    result = session.execute(
+        select(ListingModel).execution_options(yield_per=command.chunk_size)
+    )
+    number_of_listings = 0
+    for instances in result.scalars().partitions():
+        number_of_listings += projection.project(
+            mapper.model_to_entity(instance) for instance in instances
+        )
+    return number_of_listings
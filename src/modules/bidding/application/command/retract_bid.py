@@ -3,6 +3,8 @@ from modules.bidding.domain.entities import Listing
 from modules.bidding.domain.repositories import ListingRepository
 from modules.bidding.domain.value_objects import Bidder
 from seedwork.application.commands import Command
+from seedwork.application.execution import RetryPolicy, retry_policy
+from seedwork.application.mailbox import aggregate_mailbox
 from seedwork.domain.value_objects import GenericUUID
 
 
@@ -12,10 +14,13 @@ class RetractBidCommand(Command):
 
 
 @bidding_module.handler(RetractBidCommand)
+@retry_policy(RetryPolicy())  # retries concurrent updates of a listing
+@aggregate_mailbox("listing_id")
 def retract_bid(
     command: RetractBidCommand, listing_repository: ListingRepository
 ):
     bidder = Bidder(id=command.bidder_id)
 
-    listing: Listing = listing_repository.get_by_id(id=command.listing_id)
+    listing: Listing = listing_repository.get_by_id(command.listing_id)
     listing.retract_bid_of(bidder)
+    listing_repository.persist(listing)
@@ -1,4 +1,10 @@
 from .notify_outbid_winner import notify_outbid_winner
+from .update_bidding_projection import (
+    when_bid_is_placed_project_it,
+    when_bid_is_retracted_project_it,
+    when_listing_is_cancelled_project_it,
+    when_listing_is_started_project_it,
+)
 from .when_listing_is_published_start_auction import (
     when_listing_is_published_start_auction,
 )
@@ -0,0 +1,34 @@
+from modules.bidding.application import bidding_module
+from modules.bidding.domain.events import (
+    BidWasPlaced,
+    BidWasRetracted,
+    ListingWasCancelled,
+    ListingWasStarted,
+)
+from modules.bidding.infrastructure.bidding_projection import BiddingProjection
+
+
+@bidding_module.handler(ListingWasStarted)
+def when_listing_is_started_project_it(
+    event: ListingWasStarted, projection: BiddingProjection
+):
+    projection.on_listing_started(event)
+
+
+@bidding_module.handler(BidWasPlaced)
+def when_bid_is_placed_project_it(event: BidWasPlaced, projection: BiddingProjection):
+    projection.on_bid_placed(event)
+
+
+@bidding_module.handler(BidWasRetracted)
+def when_bid_is_retracted_project_it(
+    event: BidWasRetracted, projection: BiddingProjection
+):
+    projection.on_bid_retracted(event)
+
+
+@bidding_module.handler(ListingWasCancelled)
+def when_listing_is_cancelled_project_it(
+    event: ListingWasCancelled, projection: BiddingProjection
+):
+    projection.on_listing_cancelled(event)
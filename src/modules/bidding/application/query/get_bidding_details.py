@@ -1,15 +1,14 @@
-from dataclasses import dataclass
-
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from modules.bidding.application import bidding_module
+from modules.bidding.application import bidding_async_queries, bidding_queries
 from modules.bidding.application.query.model_mappers import (
     ListingDAO,
-    map_listing_model_to_dao,
+    map_bidding_details_to_dao,
 )
-from modules.bidding.infrastructure.listing_repository import ListingModel
+from modules.bidding.infrastructure.bidding_projection import select_bidding_details
 from seedwork.application.queries import Query
-from seedwork.application.query_handlers import QueryResult
+from seedwork.domain.exceptions import EntityNotFoundException
 from seedwork.domain.value_objects import GenericUUID
 
 
@@ -17,13 +16,28 @@ class GetBiddingDetails(Query):
     listing_id: GenericUUID
 
 
-@bidding_module.handler(GetBiddingDetails)
+# details are read from the projection (see BiddingProjection) with a single lookup by the listing id,
+# instead of loading the listing aggregate
+
+
+@bidding_queries.handler(GetBiddingDetails)
 def get_bidding_details(
     query: GetBiddingDetails,
     session: Session,
 ) -> ListingDAO:
-    listing_model = (
-        session.query(ListingModel).filter_by(id=str(query.listing_id)).one()
-    )
-    dao = map_listing_model_to_dao(listing_model)
-    return dao
+    rows = session.execute(select_bidding_details(query.listing_id)).all()
+    if not rows:
+        raise EntityNotFoundException(repository=session, listing_id=query.listing_id)
+    return map_bidding_details_to_dao(rows)
+
+
+@bidding_async_queries.handler(GetBiddingDetails)
+async def get_bidding_details_async(
+    query: GetBiddingDetails,
+    session: AsyncSession,
+) -> ListingDAO:
+    result = await session.execute(select_bidding_details(query.listing_id))
+    rows = result.all()
+    if not rows:
+        raise EntityNotFoundException(repository=session, listing_id=query.listing_id)
+    return map_bidding_details_to_dao(rows)
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 
-from modules.bidding.application import bidding_module
+from modules.bidding.application import bidding_async_queries, bidding_queries
 from modules.bidding.domain.repositories import ListingRepository
 from seedwork.application.queries import Query
 from seedwork.application.query_handlers import QueryResult
@@ -11,7 +11,8 @@ class GetPastdueListings(Query):
     now: datetime = field(default_factory=datetime.utcnow)
 
 
-@bidding_module.handler(GetPastdueListings)
+@bidding_queries.handler(GetPastdueListings)
+@bidding_async_queries.handler(GetPastdueListings)
 def get_past_due_listings(
     query: GetPastdueListings, listing_repository: ListingRepository
 ):
@@ -1,22 +1,52 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
-from modules.bidding.infrastructure.listing_repository import ListingModel
+from modules.bidding.infrastructure.bidding_projection import (
+    BiddingBidModel,
+    BiddingDetailsModel,
+)
 from seedwork.domain.value_objects import GenericUUID
 
 
+class BidDAO(BaseModel):
+    bidder_id: GenericUUID
+    amount: int
+    currency: str
+    placed_at: datetime
+
+
 class ListingDAO(BaseModel):
     id: GenericUUID
     ends_at: datetime
-    bids: list
+    current_price: int
+    currency: str
+    highest_bidder_id: Optional[GenericUUID]
+    number_of_bids: int
+    bids: list[BidDAO]
 
 
-def map_listing_model_to_dao(instance: ListingModel):
-    """maps ListingModel to a data access object (a dictionary)"""
-    data = instance.data
+def map_bidding_details_to_dao(
+    rows: list[tuple[BiddingDetailsModel, Optional[BiddingBidModel]]]
+) -> ListingDAO:
+    """maps rows of a listing joined with its bids (see `select_bidding_details`) to a data access object"""
+    details = rows[0][0]
     return ListingDAO(
-        id=instance.id,
-        ends_at=data["ends_at"],
-        bids=[],
+        id=details.listing_id,
+        ends_at=details.ends_at,
+        current_price=details.current_price,
+        currency=details.currency,
+        highest_bidder_id=details.highest_bidder_id,
+        number_of_bids=details.number_of_bids,
+        bids=[
+            BidDAO(
+                bidder_id=bid.bidder_id,
+                amount=bid.amount,
+                currency=bid.currency,
+                placed_at=bid.placed_at,
+            )
+            for _, bid in rows
+            if bid is not None
+        ],
     )
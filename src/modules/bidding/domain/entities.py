@@ -1,3 +1,4 @@
+import heapq
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Optional
@@ -7,6 +8,7 @@ from modules.bidding.domain.events import (
     BidWasRetracted,
     HighestBidderWasOutbid,
     ListingWasCancelled,
+    ListingWasStarted,
 )
 from modules.bidding.domain.rules import (
     BidCanBeRetracted,
@@ -32,6 +34,62 @@ class ListingCannotBeCancelled(DomainException):
     ...
 
 
+class _BidIndex:
+    """
+    Bids of a listing indexed by bidder, with two highest bids maintained incrementally.
+    Bids with equal prices are ranked by their position in bids of a listing, i.e. by the order in which
+    bidders placed them (the earlier, the higher).
+    """
+
+    def __init__(self, bids: list[Bid]):
+        # indexed list, used to detect if bids of a listing were replaced
+        self.bids = bids
+        self.size = len(bids)
+        self.by_bidder: dict[Bidder, Bid] = {}
+        self.positions: dict[Bidder, int] = {}
+        for position, bid in enumerate(bids):
+            self.by_bidder.setdefault(bid.bidder, bid)
+            self.positions.setdefault(bid.bidder, position)
+        self.top_two = self._find_top_two(self.by_bidder.values())
+
+    def is_valid_for(self, bids: list[Bid]) -> bool:
+        return self.bids is bids and self.size == len(bids)
+
+    def add(self, bid: Bid):
+        self.bids.append(bid)
+        self.by_bidder[bid.bidder] = bid
+        self.positions[bid.bidder] = self.size
+        self.size += 1
+        self.top_two = self._find_top_two([*self.top_two, bid])
+
+    def update(self, bid: Bid):
+        old_bid = self.by_bidder[bid.bidder]
+        self.bids[self.positions[bid.bidder]] = bid
+        self.by_bidder[bid.bidder] = bid
+        others = [top for top in self.top_two if top.bidder != bid.bidder]
+        if not bid.max_price < old_bid.max_price:
+            self.top_two = self._find_top_two([*others, bid])
+        elif len(others) < len(self.top_two):
+            # one of the two highest bids was lowered, the rest of bids must be checked
+            self.top_two = self._find_top_two(self.by_bidder.values())
+
+    def remove(self, bidder: Bidder):
+        position = self.positions.pop(bidder)
+        del self.by_bidder[bidder]
+        del self.bids[position]
+        self.size -= 1
+        # bids placed later move up, so a bidder who bids again is ranked after all current bidders
+        for later_bid in self.bids[position:]:
+            self.positions[later_bid.bidder] -= 1
+        if any(top.bidder == bidder for top in self.top_two):
+            self.top_two = self._find_top_two(self.by_bidder.values())
+
+    def _find_top_two(self, bids) -> list[Bid]:
+        return heapq.nlargest(
+            2, bids, key=lambda bid: (bid.max_price, -self.positions[bid.bidder])
+        )
+
+
 @dataclass(kw_only=True)
 class Listing(AggregateRoot[GenericUUID]):
     seller: Seller
@@ -39,16 +97,41 @@ class Listing(AggregateRoot[GenericUUID]):
     starts_at: datetime
     ends_at: datetime
     bids: list[Bid] = field(default_factory=list)
+    _bids_index: Optional[_BidIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def start(
+        cls,
+        id: GenericUUID,
+        seller: Seller,
+        ask_price: Money,
+        starts_at: datetime,
+        ends_at: datetime,
+    ) -> "Listing":
+        """Starts an auction of a listing"""
+        listing = cls(
+            id=id,
+            seller=seller,
+            ask_price=ask_price,
+            starts_at=starts_at,
+            ends_at=ends_at,
+        )
+        listing.register_event(
+            ListingWasStarted(listing_id=id, ask_price=ask_price, ends_at=ends_at)
+        )
+        return listing
 
     # public queries
     @property
     def current_price(self) -> Money:
         """The current price is the price buyers are competing against"""
-        if len(self.bids) < 2:
+        top_two = self._bid_index.top_two
+        if len(top_two) < 2:
             return self.ask_price
 
-        sorted_prices = sorted([bid.max_price for bid in self.bids], reverse=True)
-        return sorted_prices[1]
+        return top_two[1].max_price
 
     @property
     def next_minimum_price(self) -> Money:
@@ -75,6 +158,11 @@ class Listing(AggregateRoot[GenericUUID]):
             BidWasPlaced(
                 listing_id=self.id,
                 bidder_id=bid.bidder.id,
+                max_price=bid.max_price,
+                placed_at=bid.placed_at,
+                current_price=self.current_price,
+                highest_bidder_id=self.highest_bid.bidder.id,
+                number_of_bids=len(self.bids),
             )
         )
 
@@ -102,6 +190,8 @@ class Listing(AggregateRoot[GenericUUID]):
                 winning_bidder_id=self.highest_bid.bidder.id
                 if self.highest_bid
                 else None,
+                current_price=self.current_price,
+                number_of_bids=len(self.bids),
             )
         )
 
@@ -117,7 +207,9 @@ class Listing(AggregateRoot[GenericUUID]):
             )
         )
         self.ends_at = datetime.utcnow()
-        self.register_event(ListingWasCancelled(listing_id=self.id))
+        self.register_event(
+            ListingWasCancelled(listing_id=self.id, ends_at=self.ends_at)
+        )
 
     def end(self) -> DomainEvent:
         """
@@ -128,27 +220,22 @@ class Listing(AggregateRoot[GenericUUID]):
     # public queries
     def get_bid_of(self, bidder: Bidder) -> Bid:
         try:
-            bid = next(filter(lambda bid: bid.bidder == bidder, self.bids))
-        except StopIteration as e:
+            bid = self._bid_index.by_bidder[bidder]
+        except KeyError as e:
             raise BidderIsNotBiddingListing() from e
         return bid
 
     def has_bid_placed_by(self, bidder: Bidder) -> bool:
         """Checks if listing has a bid placed by a bidder"""
-        try:
-            self.get_bid_of(bidder=bidder)
-        except BidderIsNotBiddingListing:
-            return False
-        return True
+        return bidder in self._bid_index.by_bidder
 
     @property
     def highest_bid(self) -> Optional[Bid]:
-        try:
-            highest_bid = max(self.bids, key=lambda bid: bid.max_price)
-        except ValueError:
+        top_two = self._bid_index.top_two
+        if not top_two:
             # nobody is bidding
             return None
-        return highest_bid
+        return top_two[0]
 
     @property
     def time_left_in_listing(self):
@@ -157,16 +244,21 @@ class Listing(AggregateRoot[GenericUUID]):
         return max(self.ends_at - now, zero_seconds)
 
     # private commands and queries
+    @property
+    def _bid_index(self) -> _BidIndex:
+        if self._bids_index is None or not self._bids_index.is_valid_for(self.bids):
+            # bids were set directly, i.e. by a data mapper
+            self._bids_index = _BidIndex(self.bids)
+        return self._bids_index
+
     def _add_bid(self, bid: Bid):
         assert not self.has_bid_placed_by(
             bidder=bid.bidder
         ), "Only one bid of a bidder is allowed"
-        self.bids.append(bid)
+        self._bid_index.add(bid)
 
     def _update_bid(self, bid: Bid):
-        self.bids = [
-            bid if bid.bidder == existing.bidder else existing for existing in self.bids
-        ]
+        self._bid_index.update(bid)
 
     def _remove_bid_of(self, bidder: Bidder):
-        self.bids = [bid for bid in self.bids if bid.bidder != bidder]
+        self._bid_index.remove(bidder)
@@ -1,10 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
 from seedwork.domain.events import DomainEvent
-from seedwork.domain.value_objects import GenericUUID
+from seedwork.domain.value_objects import GenericUUID, Money
+
+# events changing bids of a listing carry the resulting state of the listing (current price, highest bidder
+# and number of bids), so read models can be updated without loading the aggregate
+
+
+class ListingWasStarted(DomainEvent):
+    listing_id: GenericUUID
+    ask_price: Money
+    ends_at: datetime
 
 
 class BidWasPlaced(DomainEvent):
     listing_id: GenericUUID
     bidder_id: GenericUUID
+    max_price: Money
+    placed_at: datetime
+    current_price: Money
+    highest_bidder_id: GenericUUID
+    number_of_bids: int
 
 
 class HighestBidderWasOutbid(DomainEvent):
@@ -13,8 +30,13 @@ class HighestBidderWasOutbid(DomainEvent):
 
 
 class BidWasRetracted(DomainEvent):
-    ...
+    listing_id: GenericUUID
+    retracting_bidder_id: GenericUUID
+    winning_bidder_id: Optional[GenericUUID]
+    current_price: Money
+    number_of_bids: int
 
 
 class ListingWasCancelled(DomainEvent):
-    ...
+    listing_id: GenericUUID
+    ends_at: datetime
@@ -0,0 +1,221 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    bindparam,
+    delete,
+    insert,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy_utils import UUIDType
+
+from modules.bidding.domain.entities import Bid, Listing
+from modules.bidding.domain.events import (
+    BidWasPlaced,
+    BidWasRetracted,
+    ListingWasCancelled,
+    ListingWasStarted,
+)
+from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.database import Base
+
+
+class BiddingDetailsModel(Base):
+    """Read model of a listing in the bidding context, maintained by BiddingProjection"""
+
+    __tablename__ = "bidding_details"
+    listing_id = Column(UUIDType(binary=False), primary_key=True)
+    current_price = Column(Integer, nullable=False)
+    currency = Column(String(3), nullable=False)
+    highest_bidder_id = Column(UUIDType(binary=False))
+    number_of_bids = Column(Integer, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+
+
+class BiddingBidModel(Base):
+    """Read model of a bid, a listing has at most one bid of each bidder"""
+
+    __tablename__ = "bidding_bid"
+    listing_id = Column(UUIDType(binary=False), primary_key=True)
+    bidder_id = Column(UUIDType(binary=False), primary_key=True)
+    amount = Column(Integer, nullable=False)
+    currency = Column(String(3), nullable=False)
+    placed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_bidding_bid_listing_id_amount", listing_id, amount),)
+
+
+def select_bidding_details(listing_id: GenericUUID):
+    """Selects details of a listing with its bids (highest first), as (details, bid or None) rows"""
+    return (
+        select(BiddingDetailsModel, BiddingBidModel)
+        .outerjoin(
+            BiddingBidModel,
+            BiddingBidModel.listing_id == BiddingDetailsModel.listing_id,
+        )
+        .where(BiddingDetailsModel.listing_id == listing_id)
+        .order_by(BiddingBidModel.amount.desc(), BiddingBidModel.placed_at)
+    )
+
+
+def _bid_values(listing_id: GenericUUID, bid: Bid) -> dict:
+    return dict(
+        listing_id=listing_id,
+        bidder_id=bid.bidder.id,
+        amount=bid.max_price.amount,
+        currency=bid.max_price.currency,
+        placed_at=bid.placed_at,
+    )
+
+
+def _details_values(listing: Listing) -> dict:
+    highest_bid = listing.highest_bid
+    return dict(
+        listing_id=listing.id,
+        current_price=listing.current_price.amount,
+        currency=listing.current_price.currency,
+        highest_bidder_id=highest_bid.bidder.id if highest_bid else None,
+        number_of_bids=len(listing.bids),
+        ends_at=listing.ends_at,
+    )
+
+
+class BiddingProjection:
+    """
+    Projects events of bidding listings to denormalized read models (bidding_details and bidding_bid tables),
+    in the transaction of a command which published the events. Events are applied with upserts,
+    so applying an event again (i.e. after a rebuild) has no effect.
+
+    Changes of read models are written when an event is applied, or, if `write_behind` is set, coalesced and written
+    by `persist_all` (i.e. once per batch of commands, like changes of write-behind repositories).
+    """
+
+    def __init__(self, db_session: Session, write_behind=False):
+        self._session = db_session
+        self._write_behind = write_behind
+        self._started: dict[GenericUUID, dict] = {}
+        self._details: dict[GenericUUID, dict] = {}  # changed columns of listings
+        self._bids: dict[tuple, Optional[dict]] = {}  # None for retracted bids
+
+    def on_listing_started(self, event: ListingWasStarted):
+        self._started[event.listing_id] = dict(
+            listing_id=event.listing_id,
+            current_price=event.ask_price.amount,
+            currency=event.ask_price.currency,
+            highest_bidder_id=None,
+            number_of_bids=0,
+            ends_at=event.ends_at,
+        )
+        self._write_unless_deferred()
+
+    def on_bid_placed(self, event: BidWasPlaced):
+        self._bids[event.listing_id, event.bidder_id] = dict(
+            listing_id=event.listing_id,
+            bidder_id=event.bidder_id,
+            amount=event.max_price.amount,
+            currency=event.max_price.currency,
+            placed_at=event.placed_at,
+        )
+        self._change_details(
+            event.listing_id,
+            current_price=event.current_price.amount,
+            currency=event.current_price.currency,
+            highest_bidder_id=event.highest_bidder_id,
+            number_of_bids=event.number_of_bids,
+        )
+
+    def on_bid_retracted(self, event: BidWasRetracted):
+        self._bids[event.listing_id, event.retracting_bidder_id] = None
+        self._change_details(
+            event.listing_id,
+            current_price=event.current_price.amount,
+            currency=event.current_price.currency,
+            highest_bidder_id=event.winning_bidder_id,
+            number_of_bids=event.number_of_bids,
+        )
+
+    def on_listing_cancelled(self, event: ListingWasCancelled):
+        self._change_details(event.listing_id, ends_at=event.ends_at)
+
+    def persist_all(self):
+        """Writes pending changes of read models, with one statement per kind of change"""
+        if self._started:
+            self._session.execute(
+                pg_insert(BiddingDetailsModel.__table__).on_conflict_do_nothing(
+                    index_elements=["listing_id"]
+                ),
+                list(self._started.values()),
+            )
+
+        placed_bids = [bid for bid in self._bids.values() if bid is not None]
+        if placed_bids:
+            statement = pg_insert(BiddingBidModel.__table__)
+            self._session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["listing_id", "bidder_id"],
+                    set_={
+                        key: statement.excluded[key]
+                        for key in ("amount", "currency", "placed_at")
+                    },
+                ),
+                placed_bids,
+            )
+        retracted_bids = [key for key, bid in self._bids.items() if bid is None]
+        if retracted_bids:
+            self._session.execute(
+                delete(BiddingBidModel).where(
+                    tuple_(BiddingBidModel.listing_id, BiddingBidModel.bidder_id).in_(
+                        retracted_bids
+                    )
+                )
+            )
+
+        changes_by_columns: dict[tuple, list[dict]] = {}
+        for listing_id, columns in self._details.items():
+            changes_by_columns.setdefault(tuple(columns), []).append(
+                dict(columns, _listing_id=listing_id)
+            )
+        table = BiddingDetailsModel.__table__
+        for columns, changes in changes_by_columns.items():
+            self._session.execute(
+                table.update()
+                .where(table.c.listing_id == bindparam("_listing_id"))
+                .values({column: bindparam(column) for column in columns}),
+                changes,
+            )
+
+        self._started.clear()
+        self._bids.clear()
+        self._details.clear()
+
+    def _change_details(self, listing_id: GenericUUID, **columns):
+        self._details.setdefault(listing_id, {}).update(columns)
+        self._write_unless_deferred()
+
+    def _write_unless_deferred(self):
+        if not self._write_behind:
+            self.persist_all()
+
+    def clear(self):
+        self._session.execute(delete(BiddingBidModel))
+        self._session.execute(delete(BiddingDetailsModel))
+
+    def project(self, listings: Iterable[Listing]) -> int:
+        """Inserts read models of listings (with one batched INSERT per table), returns the number of listings"""
+        details = []
+        bids = []
+        for listing in listings:
+            details.append(_details_values(listing))
+            bids.extend(_bid_values(listing.id, bid) for bid in listing.bids)
+        if details:
+            self._session.execute(insert(BiddingDetailsModel), details)
+        if bids:
+            self._session.execute(insert(BiddingBidModel), bids)
+        return len(details)
@@ -0,0 +1,148 @@
+"""
+Codec of the bidding Listing aggregate, mapping it to a JSON document (`data` column of a listing).
+
+Layout 2 (current) stores bids as parallel arrays, which are several times smaller and faster to encode and decode
+than a list of nested objects (layout 1):
+    {
+        "layout": 2,
+        "seller_id": "...", "ask_price": {"amount": 100, "currency": "USD"}, "starts_at": "...", "ends_at": "...",
+        "bids": {
+            "bidder_ids": ["<uuid hex>", ...],
+            "amounts": [200, ...],
+            "currency": "USD",  # or a list of currencies, if bids are in different currencies
+            "placed_at": [<microseconds since the epoch>, ...]
+        }
+    }
+Documents in layout 1 (without "layout" key) are still decoded, and are written in layout 2 when changed.
+Datetimes are naive UTC datetimes, as used by the domain.
+"""
+
+import datetime
+import uuid
+from itertools import repeat
+
+from modules.bidding.domain.entities import Bid, Bidder, Listing, Money, Seller
+from seedwork.domain.value_objects import GenericUUID
+
+LAYOUT = 2
+
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def serialize_money(money: Money) -> dict:
+    return {
+        "amount": money.amount,
+        "currency": money.currency,
+    }
+
+
+def serialize_id(value: GenericUUID) -> str:
+    return str(value)
+
+
+def deserialize_id(value: str) -> GenericUUID:
+    if isinstance(value, uuid.UUID):
+        return GenericUUID(value.hex)
+    return GenericUUID(value)
+
+
+def deserialize_money(data: dict) -> Money:
+    return Money(data["amount"], currency=data["currency"])
+
+
+def serialize_datetime(value: datetime.datetime) -> str:
+    return value.isoformat()
+
+
+def deserialize_datetime(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value)
+
+
+def datetime_to_epoch_us(value: datetime.datetime) -> int:
+    if value.tzinfo is not None:
+        raise ValueError(f"Expected a naive UTC datetime, got {value!r}")
+    return (value - EPOCH) // MICROSECOND
+
+
+def epoch_us_to_datetime(value: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=value)
+
+
+def serialize_bid(bid: Bid) -> dict:
+    """Serializes a bid in layout 1"""
+    return {
+        "bidder_id": serialize_id(bid.bidder.id),
+        "max_price": serialize_money(bid.max_price),
+        "placed_at": serialize_datetime(bid.placed_at),
+    }
+
+
+def deserialize_bid(data: dict) -> Bid:
+    """Deserializes a bid in layout 1"""
+    return Bid(
+        bidder=Bidder(id=deserialize_id(data["bidder_id"])),
+        max_price=deserialize_money(data["max_price"]),
+        placed_at=deserialize_datetime(data["placed_at"]),
+    )
+
+
+def encode_bids(bids: list[Bid]) -> dict:
+    currencies = [bid.max_price.currency for bid in bids]
+    return {
+        "bidder_ids": [bid.bidder.id.hex for bid in bids],
+        "amounts": [bid.max_price.amount for bid in bids],
+        "currency": currencies[0] if len(set(currencies)) == 1 else currencies,
+        "placed_at": [datetime_to_epoch_us(bid.placed_at) for bid in bids],
+    }
+
+
+def decode_bids(data: dict) -> list[Bid]:
+    currency = data["currency"]
+    currencies = repeat(currency) if isinstance(currency, str) else currency
+    bidders: dict[str, Bidder] = {}  # a bidder placing many bids is decoded once
+    bids = []
+    for bidder_id, amount, bid_currency, placed_at in zip(
+        data["bidder_ids"], data["amounts"], currencies, data["placed_at"]
+    ):
+        bidder = bidders.get(bidder_id)
+        if bidder is None:
+            bidder = bidders[bidder_id] = Bidder(id=GenericUUID(hex=bidder_id))
+        bids.append(
+            Bid(
+                bidder=bidder,
+                max_price=Money(amount, bid_currency),
+                placed_at=epoch_us_to_datetime(placed_at),
+            )
+        )
+    return bids
+
+
+def encode_listing(listing: Listing) -> dict:
+    return {
+        "layout": LAYOUT,
+        "starts_at": serialize_datetime(listing.starts_at),
+        "ends_at": serialize_datetime(listing.ends_at),
+        "ask_price": serialize_money(listing.ask_price),
+        "seller_id": serialize_id(listing.seller.id),
+        "bids": encode_bids(listing.bids),
+    }
+
+
+def decode_listing(listing_id, data: dict) -> Listing:
+    layout = data.get("layout", 1)
+    if layout == 1:
+        bids = [deserialize_bid(b) for b in data.get("bids", [])]
+    elif layout == LAYOUT:
+        bids = decode_bids(data["bids"])
+    else:
+        raise ValueError(f"Unknown layout of listing {listing_id}: {layout}")
+
+    return Listing(
+        id=deserialize_id(listing_id),
+        seller=Seller(id=deserialize_id(data["seller_id"])),
+        ask_price=deserialize_money(data["ask_price"]),
+        starts_at=deserialize_datetime(data["starts_at"]),
+        ends_at=deserialize_datetime(data["ends_at"]),
+        bids=bids,
+    )
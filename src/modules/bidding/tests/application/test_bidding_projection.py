@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from modules.bidding.application.command import (
+    PlaceBidCommand,
+    RebuildBiddingProjectionCommand,
+    RetractBidCommand,
+)
+from modules.bidding.application.query import GetBiddingDetails
+from modules.bidding.domain.entities import Bid, Bidder, Listing
+from modules.bidding.domain.repositories import ListingRepository
+from modules.bidding.domain.value_objects import Seller
+from modules.bidding.infrastructure.bidding_projection import (
+    BiddingBidModel,
+    BiddingDetailsModel,
+)
+from seedwork.domain.value_objects import GenericUUID, Money
+
+LISTING_ID = GenericUUID(int=1)
+ENDS_AT = datetime(2030, 1, 1)
+
+
+async def start_listing(app, bids=()):
+    async with app.transaction_context() as ctx:
+        listing = Listing.start(
+            id=LISTING_ID,
+            seller=Seller(id=GenericUUID.next_id()),
+            ask_price=Money(10),
+            starts_at=datetime.utcnow(),
+            ends_at=ENDS_AT,
+        )
+        for bid in bids:
+            listing.place_bid(bid)
+        ctx[ListingRepository].add(listing)
+        for event in listing.collect_events():
+            await ctx.publish_async(event)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_started_listing_is_projected(app, engine):
+    await start_listing(app)
+
+    details = await app.execute_async(GetBiddingDetails(listing_id=LISTING_ID))
+
+    assert details.current_price == 10
+    assert details.highest_bidder_id is None
+    assert details.number_of_bids == 0
+    assert details.ends_at == ENDS_AT
+    assert details.bids == []
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_placed_bids_are_projected(app, engine):
+    await start_listing(app)
+    bidder_1, bidder_2 = GenericUUID(int=11), GenericUUID(int=12)
+
+    for bidder_id, amount in [(bidder_1, 20), (bidder_2, 30), (bidder_1, 40)]:
+        await app.execute_async(
+            PlaceBidCommand(listing_id=LISTING_ID, bidder_id=bidder_id, amount=amount)
+        )
+    details = await app.execute_async(GetBiddingDetails(listing_id=LISTING_ID))
+
+    assert details.current_price == 30
+    assert details.highest_bidder_id == bidder_1
+    assert details.number_of_bids == 2
+    assert [(bid.bidder_id, bid.amount) for bid in details.bids] == [
+        (bidder_1, 40),
+        (bidder_2, 30),
+    ]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_retracted_bid_is_projected(app, engine):
+    bidder_1, bidder_2 = GenericUUID(int=11), GenericUUID(int=12)
+    placed_at = datetime.utcnow() - timedelta(hours=2)
+    await start_listing(
+        app,
+        bids=[
+            Bid(bidder=Bidder(id=bidder_1), max_price=Money(20), placed_at=placed_at),
+            Bid(bidder=Bidder(id=bidder_2), max_price=Money(30), placed_at=placed_at),
+        ],
+    )
+
+    await app.execute_async(
+        RetractBidCommand(listing_id=LISTING_ID, bidder_id=bidder_2)
+    )
+    details = await app.execute_async(GetBiddingDetails(listing_id=LISTING_ID))
+
+    assert details.current_price == 10
+    assert details.highest_bidder_id == bidder_1
+    assert [bid.bidder_id for bid in details.bids] == [bidder_1]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_projection_is_rebuilt_from_listings(app, engine):
+    await start_listing(app)
+    await app.execute_async(
+        PlaceBidCommand(listing_id=LISTING_ID, bidder_id=GenericUUID(int=11), amount=20)
+    )
+    expected = await app.execute_async(GetBiddingDetails(listing_id=LISTING_ID))
+    with app.transaction_context() as ctx:
+        ctx["db_session"].execute(delete(BiddingBidModel))
+        ctx["db_session"].execute(delete(BiddingDetailsModel))
+
+    number_of_listings = await app.execute_async(
+        RebuildBiddingProjectionCommand(chunk_size=1)
+    )
+    details = await app.execute_async(GetBiddingDetails(listing_id=LISTING_ID))
+
+    assert number_of_listings == 1
+    assert details == expected
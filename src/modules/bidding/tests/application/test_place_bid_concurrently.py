@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from modules.bidding.application.command import PlaceBidCommand
+from modules.bidding.domain.entities import Listing
+from modules.bidding.domain.repositories import ListingRepository
+from modules.bidding.domain.value_objects import Seller
+from seedwork.application.execution import MessageExecutor
+from seedwork.application.mailbox import AggregateMailboxExecutor
+from seedwork.domain.exceptions import BusinessRuleValidationException
+from seedwork.domain.value_objects import GenericUUID, Money
+
+BIDS = 100
+
+
+def add_listing(app) -> GenericUUID:
+    listing_id = GenericUUID.next_id()
+    with app.transaction_context() as ctx:
+        ctx[ListingRepository].add(
+            Listing(
+                id=listing_id,
+                seller=Seller(id=GenericUUID.next_id()),
+                ask_price=Money(1),
+                starts_at=datetime.utcnow(),
+                ends_at=datetime.utcnow() + timedelta(days=1),
+            )
+        )
+    return listing_id
+
+
+async def place_bids(executor, listing_id) -> list:
+    try:
+        return await asyncio.gather(
+            *(
+                executor.execute(
+                    PlaceBidCommand(
+                        listing_id=listing_id,
+                        bidder_id=GenericUUID.next_id(),
+                        amount=10 + i,
+                    )
+                )
+                for i in range(BIDS)
+            ),
+            return_exceptions=True,
+        )
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_parallel_bids_on_one_listing_are_not_lost(app, engine):
+    listing_id = add_listing(app)
+
+    results = await place_bids(MessageExecutor(app, max_workers=10), listing_id)
+
+    # a bid lower than the current price of a listing is rejected, other bids must be saved
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert all(isinstance(error, BusinessRuleValidationException) for error in errors)
+    with app.transaction_context() as ctx:
+        listing = ctx[ListingRepository].get_by_id(listing_id)
+        assert len(listing.bids) == BIDS - len(errors) > 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_bids_on_one_listing_are_placed_in_batches(app, engine):
+    listing_id = add_listing(app)
+    executor = AggregateMailboxExecutor(app, max_workers=10, max_batch_size=10)
+
+    results = await place_bids(executor, listing_id)
+
+    # bids are placed in order of arrival, so each bid is higher than the previous one
+    assert not [result for result in results if isinstance(result, Exception)]
+    assert executor.stats.batches == BIDS // 10
+    with app.transaction_context() as ctx:
+        listing = ctx[ListingRepository].get_by_id(listing_id)
+        assert len(listing.bids) == BIDS
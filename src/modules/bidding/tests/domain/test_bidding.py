@@ -239,3 +239,88 @@ def test_cannot_cancel_listing_with_bids():
 
     with pytest.raises(BusinessRuleValidationException, match="ListingCanBeCancelled"):
         listing.cancel()
+
+
+@pytest.mark.unit
+def test_highest_bid_and_current_price_are_kept_up_to_date():
+    now = datetime.utcnow()
+    bidders = [Bidder(id=GenericUUID(int=i)) for i in range(1, 5)]
+    listing = Listing(
+        id=Listing.next_id(),
+        seller=Seller(id=GenericUUID.next_id()),
+        ask_price=Money(10),
+        starts_at=now,
+        ends_at=now + timedelta(days=1),
+    )
+
+    listing.place_bid(Bid(bidder=bidders[0], max_price=Money(20), placed_at=now))
+    listing.place_bid(Bid(bidder=bidders[1], max_price=Money(30), placed_at=now))
+    listing.place_bid(Bid(bidder=bidders[2], max_price=Money(25), placed_at=now))
+    assert listing.highest_bid.bidder == bidders[1]
+    assert listing.current_price == Money(25)
+
+    # bidder raises a bid, which is not one of two highest
+    listing.place_bid(
+        Bid(bidder=bidders[0], max_price=Money(40), placed_at=now - timedelta(hours=2))
+    )
+    assert listing.highest_bid.bidder == bidders[0]
+    assert listing.current_price == Money(30)
+
+    # the highest bidder retracts
+    listing.retract_bid_of(bidders[0])
+    assert listing.highest_bid.bidder == bidders[1]
+    assert listing.current_price == Money(25)
+    assert not listing.has_bid_placed_by(bidders[0])
+    assert [bid.bidder for bid in listing.bids] == [bidders[1], bidders[2]]
+
+
+@pytest.mark.unit
+def test_bidder_who_retracts_and_bids_again_is_ranked_after_current_bidders():
+    now = datetime.utcnow()
+    bidder1 = Bidder(id=GenericUUID(int=1))
+    bidder2 = Bidder(id=GenericUUID(int=2))
+    listing = Listing(
+        id=Listing.next_id(),
+        seller=Seller(id=GenericUUID.next_id()),
+        ask_price=Money(10),
+        starts_at=now,
+        ends_at=now + timedelta(days=1),
+    )
+
+    listing.place_bid(
+        Bid(bidder=bidder1, max_price=Money(30), placed_at=now - timedelta(hours=2))
+    )
+    listing.retract_bid_of(bidder1)
+    listing.place_bid(Bid(bidder=bidder2, max_price=Money(30), placed_at=now))
+    listing.place_bid(Bid(bidder=bidder1, max_price=Money(30), placed_at=now))
+
+    # with equal prices, the earlier bid wins
+    assert listing.highest_bid.bidder == bidder2
+    assert listing.current_price == Money(30)
+    assert [bid.bidder for bid in listing.bids] == [bidder2, bidder1]
+
+
+@pytest.mark.unit
+def test_bids_set_directly_are_indexed():
+    now = datetime.utcnow()
+    bidder1 = Bidder(id=GenericUUID(int=1))
+    bidder2 = Bidder(id=GenericUUID(int=2))
+    listing = Listing(
+        id=Listing.next_id(),
+        seller=Seller(id=GenericUUID.next_id()),
+        ask_price=Money(10),
+        starts_at=now,
+        ends_at=now,
+        bids=[Bid(bidder=bidder1, max_price=Money(20), placed_at=now)],
+    )
+    assert listing.highest_bid.bidder == bidder1
+
+    listing.bids = [
+        Bid(bidder=bidder1, max_price=Money(20), placed_at=now),
+        Bid(bidder=bidder2, max_price=Money(20), placed_at=now),
+    ]
+
+    # with equal prices, the earlier bid wins
+    assert listing.highest_bid.bidder == bidder1
+    assert listing.current_price == Money(20)
+    assert listing.get_bid_of(bidder2).max_price == Money(20)
@@ -0,0 +1,98 @@
+import datetime
+
+import pytest
+
+from modules.bidding.domain.entities import Bid, Bidder, Listing, Money, Seller
+from modules.bidding.infrastructure.listing_codec import decode_listing, encode_listing
+from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.database import dumps, loads
+
+
+def create_listing(bids) -> Listing:
+    return Listing(
+        id=GenericUUID(int=1),
+        seller=Seller(id=GenericUUID(int=2)),
+        ask_price=Money(100, "PLN"),
+        starts_at=datetime.datetime(2020, 12, 1),
+        ends_at=datetime.datetime(2020, 12, 31),
+        bids=bids,
+    )
+
+
+def create_bid(i, currency="PLN") -> Bid:
+    return Bid(
+        max_price=Money(100 + i, currency),
+        bidder=Bidder(id=GenericUUID(int=1000 + i % 7)),
+        placed_at=datetime.datetime(2020, 12, 1, 12, 30, 15, 123456)
+        + datetime.timedelta(minutes=i),
+    )
+
+
+def round_trip(listing: Listing) -> Listing:
+    return decode_listing(str(listing.id), loads(dumps(encode_listing(listing))))
+
+
+@pytest.mark.unit
+def test_listing_with_bids_survives_round_trip():
+    listing = create_listing([create_bid(i) for i in range(1000)])
+
+    actual = round_trip(listing)
+
+    assert actual == listing
+    assert [bid.max_price.currency for bid in actual.bids] == ["PLN"] * 1000
+    assert actual.bids[-1].placed_at == listing.bids[-1].placed_at
+
+
+@pytest.mark.unit
+def test_bids_in_different_currencies_survive_round_trip():
+    listing = create_listing([create_bid(1, "PLN"), create_bid(2, "USD")])
+
+    actual = round_trip(listing)
+
+    assert [bid.max_price.currency for bid in actual.bids] == ["PLN", "USD"]
+
+
+@pytest.mark.unit
+def test_listing_without_bids_survives_round_trip():
+    listing = create_listing([])
+
+    assert round_trip(listing) == listing
+
+
+@pytest.mark.unit
+def test_listing_in_layout_1_is_decoded():
+    data = {
+        "seller_id": "00000000-0000-0000-0000-000000000002",
+        "ask_price": {"amount": 100, "currency": "PLN"},
+        "starts_at": "2020-12-01T00:00:00",
+        "ends_at": "2020-12-31T00:00:00",
+        "bids": [
+            {
+                "max_price": {"amount": 200, "currency": "PLN"},
+                "bidder_id": "00000000-0000-0000-0000-000000000003",
+                "placed_at": "2020-12-30T00:00:00",
+            }
+        ],
+    }
+
+    listing = decode_listing("00000000-0000-0000-0000-000000000001", data)
+
+    assert listing.bids == [
+        Bid(
+            max_price=Money(200, "PLN"),
+            bidder=Bidder(id=GenericUUID(int=3)),
+            placed_at=datetime.datetime(2020, 12, 30),
+        )
+    ]
+
+
+@pytest.mark.unit
+def test_aware_datetime_of_bid_is_rejected():
+    bid = Bid(
+        max_price=Money(200, "PLN"),
+        bidder=Bidder(id=GenericUUID(int=3)),
+        placed_at=datetime.datetime(2020, 12, 30, tzinfo=datetime.timezone.utc),
+    )
+
+    with pytest.raises(ValueError):
+        encode_listing(create_listing([bid]))
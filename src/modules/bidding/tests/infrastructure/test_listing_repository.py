@@ -2,6 +2,7 @@ import datetime
 import uuid
 
 import pytest
+from sqlalchemy.orm import Session
 
 from modules.bidding.domain.entities import Bid, Bidder, Listing, Money, Seller
 from modules.bidding.infrastructure.listing_repository import (
@@ -9,13 +10,15 @@ from modules.bidding.infrastructure.listing_repository import (
     ListingModel,
     PostgresJsonListingRepository,
 )
+from seedwork.domain.exceptions import ConcurrencyException
 from seedwork.domain.value_objects import GenericUUID
 
 
 @pytest.mark.integration
-def test_listing_repo_is_empty(db_session):
+def test_listing_repo_is_empty(db_session, assert_num_statements):
     repo = PostgresJsonListingRepository(db_session=db_session)
-    assert repo.count() == 0
+    with assert_num_statements(1):
+        assert repo.count() == 0
 
 
 @pytest.mark.unit
@@ -41,6 +44,7 @@ def test_listing_data_mapper_maps_entity_to_model():
     expected = ListingModel(
         id=GenericUUID(int=1),
         data={
+            "layout": 2,
             "seller_id": "00000000-0000-0000-0000-000000000002",
             "ask_price": {
                 "amount": 100,
@@ -48,16 +52,12 @@ def test_listing_data_mapper_maps_entity_to_model():
             },
             "starts_at": "2020-12-01T00:00:00",
             "ends_at": "2020-12-31T00:00:00",
-            "bids": [
-                {
-                    "max_price": {
-                        "amount": 200,
-                        "currency": "PLN",
-                    },
-                    "bidder_id": "00000000-0000-0000-0000-000000000003",
-                    "placed_at": "2020-12-30T00:00:00",
-                }
-            ],
+            "bids": {
+                "bidder_ids": ["00000000000000000000000000000003"],
+                "amounts": [200],
+                "currency": "PLN",
+                "placed_at": [1609286400000000],
+            },
         },
     )
     assert actual.id == expected.id
@@ -110,3 +110,65 @@ def test_listing_persistence(db_session):
     persisted = repository.get_by_id(original.id)
 
     assert original == persisted
+
+
+@pytest.mark.integration
+def test_persisting_listing_changed_by_another_transaction_raises_exception(engine):
+    listing_id = GenericUUID.next_id()
+    with Session(engine) as session:
+        PostgresJsonListingRepository(db_session=session).add(
+            Listing(
+                id=listing_id,
+                seller=Seller(id=GenericUUID.next_id()),
+                ask_price=Money(10),
+                starts_at=datetime.datetime.utcnow(),
+                ends_at=datetime.datetime.utcnow() + datetime.timedelta(days=1),
+            )
+        )
+        session.commit()
+
+    with Session(engine) as session1, Session(engine) as session2:
+        repo1 = PostgresJsonListingRepository(db_session=session1)
+        repo2 = PostgresJsonListingRepository(db_session=session2)
+        listing1 = repo1.get_by_id(listing_id)
+        listing2 = repo2.get_by_id(listing_id)
+
+        listing1.place_bid(
+            Bid(bidder=Bidder(id=GenericUUID.next_id()), max_price=Money(20))
+        )
+        repo1.persist(listing1)
+        session1.commit()
+
+        listing2.place_bid(
+            Bid(bidder=Bidder(id=GenericUUID.next_id()), max_price=Money(30))
+        )
+        with pytest.raises(ConcurrencyException):
+            repo2.persist(listing2)
+
+    with Session(engine) as session:
+        repo = PostgresJsonListingRepository(db_session=session)
+        assert len(repo.get_by_id(listing_id).bids) == 1
+
+
+@pytest.mark.integration
+def test_listings_are_fetched_by_ids_with_one_statement(engine, assert_num_statements):
+    listing_ids = [GenericUUID.next_id() for _ in range(3)]
+    with Session(engine) as session:
+        repo = PostgresJsonListingRepository(db_session=session)
+        for listing_id in listing_ids:
+            repo.add(
+                Listing(
+                    id=listing_id,
+                    seller=Seller(id=GenericUUID.next_id()),
+                    ask_price=Money(10),
+                    starts_at=datetime.datetime.utcnow(),
+                    ends_at=datetime.datetime.utcnow() + datetime.timedelta(days=1),
+                )
+            )
+        session.commit()
+
+    with Session(engine) as session, assert_num_statements(1):
+        repo = PostgresJsonListingRepository(db_session=session)
+        listings = repo.get_by_ids(listing_ids)
+
+    assert [listing.id for listing in listings] == listing_ids
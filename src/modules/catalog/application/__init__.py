@@ -2,5 +2,8 @@ from lato import ApplicationModule
 import importlib
 
 catalog_module = ApplicationModule("catalog")
+# query handlers are registered in separate modules, one for each persistence mode
+catalog_queries = ApplicationModule("catalog_queries")
+catalog_async_queries = ApplicationModule("catalog_async_queries")
 importlib.import_module("modules.catalog.application.command")
 importlib.import_module("modules.catalog.application.query")
@@ -4,6 +4,7 @@ from modules.catalog.application import catalog_module
 from modules.catalog.domain.entities import Listing
 from modules.catalog.domain.events import ListingDraftCreatedEvent
 from modules.catalog.domain.repositories import ListingRepository
+from seedwork.application.execution import ExecutionPolicy, execution_policy
 from seedwork.domain.value_objects import GenericUUID, Money
 
 
@@ -18,6 +19,7 @@ class CreateListingDraftCommand(Command):
 
 
 @catalog_module.handler(CreateListingDraftCommand)
+@execution_policy(ExecutionPolicy.THREADPOOL)  # uses a synchronous session
 async def create_listing_draft(
     command: CreateListingDraftCommand, repository: ListingRepository, publish
 ):
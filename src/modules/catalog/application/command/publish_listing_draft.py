@@ -1,9 +1,11 @@
 from modules.catalog.application import catalog_module
 from modules.catalog.domain.entities import Listing
+from modules.catalog.domain.events import ListingPublishedEvent
 from modules.catalog.domain.repositories import ListingRepository
 from modules.catalog.domain.rules import OnlyListingOwnerCanPublishListing
 from modules.catalog.domain.value_objects import ListingId, SellerId
 from seedwork.application.commands import Command
+from seedwork.application.execution import ExecutionPolicy, execution_policy, publishes
 from seedwork.domain.mixins import check_rule
 
 
@@ -15,6 +17,8 @@ class PublishListingDraftCommand(Command):
 
 
 @catalog_module.handler(PublishListingDraftCommand)
+@execution_policy(ExecutionPolicy.THREADPOOL)  # uses a synchronous session
+@publishes(ListingPublishedEvent)  # handled by bidding subscriptions
 async def publish_listing_draft(
     command: PublishListingDraftCommand,
     listing_repository: ListingRepository,
@@ -27,3 +31,4 @@ async def publish_listing_draft(
         )
     )
     listing.publish()
+    listing_repository.persist(listing)
@@ -25,3 +25,4 @@ def update_listing_draft(
         description=command.description,
         ask_price=command.ask_price,
     )
+    repository.persist(listing)
@@ -0,0 +1,18 @@
+from modules.catalog.domain.events import (
+    ListingDraftCreatedEvent,
+    ListingDraftDeletedEvent,
+    ListingDraftUpdatedEvent,
+    ListingPublishedEvent,
+)
+
+# tags of cached results of catalog queries, see `cached_query`
+LISTING_TAG = "listing:{listing_id}"  # details of a listing
+CATALOG_TAG = "catalog:all"  # pages of listings
+
+# tags invalidated by events of the catalog, when a transaction publishing them is committed
+CATALOG_QUERY_CACHE_INVALIDATIONS = {
+    ListingDraftCreatedEvent: (CATALOG_TAG,),
+    ListingDraftUpdatedEvent: (LISTING_TAG, CATALOG_TAG),
+    ListingPublishedEvent: (LISTING_TAG, CATALOG_TAG),
+    ListingDraftDeletedEvent: (LISTING_TAG, CATALOG_TAG),
+}
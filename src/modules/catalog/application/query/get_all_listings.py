@@ -1,20 +1,41 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from modules.catalog.application import catalog_module
-from modules.catalog.application.query.model_mappers import map_listing_model_to_dao
-from modules.catalog.infrastructure.listing_repository import ListingModel
-from seedwork.application.queries import Query
+from modules.catalog.application import catalog_async_queries, catalog_queries
+from modules.catalog.application.query.cache_tags import CATALOG_TAG
+from modules.catalog.application.query.listing_pages import (
+    ListingPageQuery,
+    get_page_of_listings,
+    get_page_of_listings_async,
+)
+from seedwork.application.execution import ExecutionPolicy, execution_policy
+from seedwork.application.query_cache import cached_query
+from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.pagination import Page
+
 
+class GetAllListings(ListingPageQuery):
+    """Returns a page of listings, optionally filtered by a seller and status"""
 
-class GetAllListings(Query):
-    """This query does not need any parameters"""
+    seller_id: Optional[GenericUUID] = None
 
 
-@catalog_module.handler(GetAllListings)
+@catalog_queries.handler(GetAllListings)
+@cached_query(tags=[CATALOG_TAG])
+@execution_policy(ExecutionPolicy.THREADPOOL)  # uses a synchronous session
 async def get_all_listings(
     query: GetAllListings,
     session: Session,
-) -> list[ListingModel]:
-    queryset = session.query(ListingModel)
-    listings = [map_listing_model_to_dao(row) for row in queryset.all()]
-    return listings
+) -> Page[dict]:
+    return get_page_of_listings(session, query, seller_id=query.seller_id)
+
+
+@catalog_async_queries.handler(GetAllListings)
+@cached_query(tags=[CATALOG_TAG])
+async def get_all_listings_async(
+    query: GetAllListings,
+    session: AsyncSession,
+) -> Page[dict]:
+    return await get_page_of_listings_async(session, query, seller_id=query.seller_id)
@@ -1,11 +1,15 @@
 from dataclasses import dataclass
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from modules.catalog.application import catalog_module
+from modules.catalog.application import catalog_async_queries, catalog_queries
+from modules.catalog.application.query.cache_tags import LISTING_TAG
 from modules.catalog.application.query.model_mappers import map_listing_model_to_dao
 from modules.catalog.infrastructure.listing_repository import ListingModel
 from seedwork.application.queries import Query
+from seedwork.application.query_cache import cached_query
 from seedwork.application.query_handlers import QueryResult
 from seedwork.domain.value_objects import GenericUUID
 
@@ -14,8 +18,19 @@ class GetListingDetails(Query):
     listing_id: GenericUUID
 
 
-@catalog_module.handler(GetListingDetails)
+@catalog_queries.handler(GetListingDetails)
+@cached_query(key="{listing_id}", tags=[LISTING_TAG])
 def get_listing_details(query: GetListingDetails, session: Session) -> QueryResult:
     row = session.query(ListingModel).filter_by(id=query.listing_id).one()
     details = map_listing_model_to_dao(row)
     return details
+
+
+@catalog_async_queries.handler(GetListingDetails)
+@cached_query(key="{listing_id}", tags=[LISTING_TAG])
+async def get_listing_details_async(
+    query: GetListingDetails, session: AsyncSession
+) -> QueryResult:
+    result = await session.execute(select(ListingModel).filter_by(id=query.listing_id))
+    details = map_listing_model_to_dao(result.scalar_one())
+    return details
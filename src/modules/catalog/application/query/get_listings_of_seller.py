@@ -1,21 +1,27 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from modules.catalog.application import catalog_module
-from modules.catalog.infrastructure.listing_repository import ListingModel
-from seedwork.application.queries import Query
-from seedwork.application.query_handlers import QueryResult
+from modules.catalog.application import catalog_async_queries, catalog_queries
+from modules.catalog.application.query.listing_pages import (
+    ListingPageQuery,
+    get_page_of_listings,
+    get_page_of_listings_async,
+)
 from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.pagination import Page
 
 
-class GetListingsOfSeller(Query):
+class GetListingsOfSeller(ListingPageQuery):
     seller_id: GenericUUID
 
 
-@catalog_module.handler(GetListingsOfSeller)
-def get_listings_of_seller(query: GetListingsOfSeller, session: Session) -> list[dict]:
-    # FIXME: use seller_id to filter out listings
-    queryset = session.query(ListingModel)  # .filter(
-    #     listing_repository.model.data['seller'].astext.cast(UUID) == query.seller_id
-    # )
-    listings = [dict(id=row.id, **row.data) for row in queryset.all()]
-    return listings
+@catalog_queries.handler(GetListingsOfSeller)
+def get_listings_of_seller(query: GetListingsOfSeller, session: Session) -> Page[dict]:
+    return get_page_of_listings(session, query, seller_id=query.seller_id)
+
+
+@catalog_async_queries.handler(GetListingsOfSeller)
+async def get_listings_of_seller_async(
+    query: GetListingsOfSeller, session: AsyncSession
+) -> Page[dict]:
+    return await get_page_of_listings_async(session, query, seller_id=query.seller_id)
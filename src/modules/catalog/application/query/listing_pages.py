@@ -0,0 +1,133 @@
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import Field, ValidationInfo, field_validator
+from pydantic_core import PydanticCustomError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from modules.catalog.domain.value_objects import ListingStatus
+from modules.catalog.infrastructure.listing_repository import (
+    ListingModel,
+    listing_ask_price_amount,
+    listing_seller_id,
+    listing_status,
+    listing_title,
+)
+from seedwork.application.queries import Query
+from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.pagination import (
+    Page,
+    decode_cursor,
+    page_of_rows,
+    select_keyset_page,
+)
+
+
+class ListingSortOrder(str, Enum):
+    TITLE = "title"
+    TITLE_DESC = "-title"
+    PRICE = "price"
+    PRICE_DESC = "-price"
+
+
+class ListingPageQuery(Query):
+    """Base class for paginated queries of listings"""
+
+    status: Optional[ListingStatus] = None
+    sort: ListingSortOrder = ListingSortOrder.TITLE
+    limit: int = Field(default=50, ge=1, le=1000)
+    cursor: Optional[str] = None  # continuation token of a previous page
+
+    @field_validator("cursor")
+    @classmethod
+    def cursor_must_be_valid(cls, value, info: ValidationInfo):
+        """A cursor must come from a page of the same sort order, with a sort key and an id of a listing"""
+        if value is None or "sort" not in info.data:
+            return value
+        sort = info.data["sort"]
+        try:
+            sort_key, listing_id = decode_cursor(value, scope=sort.value)
+            UUID(listing_id)
+            if sort in (ListingSortOrder.TITLE, ListingSortOrder.TITLE_DESC):
+                is_valid = isinstance(sort_key, str)
+            else:
+                is_valid = isinstance(sort_key, str) and Decimal(sort_key).is_finite()
+        except (ValueError, TypeError, AttributeError, InvalidOperation):
+            is_valid = False
+        if not is_valid:
+            raise PydanticCustomError("invalid_cursor", "Invalid cursor")
+        return value
+
+
+def select_page_of_listings(
+    query: ListingPageQuery, seller_id: Optional[GenericUUID] = None
+):
+    """Selects only the parts of listing documents needed by the read model, using keyset pagination"""
+    statement = select(
+        ListingModel.id,
+        listing_title.label("title"),
+        ListingModel.data["description"].astext.label("description"),
+        listing_ask_price_amount.label("ask_price_amount"),
+        ListingModel.data[("ask_price", "currency")].astext.label("ask_price_currency"),
+        listing_seller_id.label("seller_id"),
+        listing_status.label("status"),
+    )
+    if seller_id is not None:
+        statement = statement.where(listing_seller_id == str(seller_id))
+    if query.status is not None:
+        statement = statement.where(listing_status == query.status.value)
+
+    sort_key = (
+        listing_title
+        if query.sort in (ListingSortOrder.TITLE, ListingSortOrder.TITLE_DESC)
+        else listing_ask_price_amount
+    )
+    return select_keyset_page(
+        statement,
+        keys=[sort_key, ListingModel.id],
+        limit=query.limit,
+        cursor=query.cursor,
+        descending=query.sort.value.startswith("-"),
+        scope=query.sort.value,
+    )
+
+
+def get_page_of_listings(
+    session: Session, query: ListingPageQuery, seller_id: Optional[GenericUUID] = None
+) -> Page[dict]:
+    rows = session.execute(select_page_of_listings(query, seller_id)).all()
+    return map_page_of_rows(rows, query)
+
+
+async def get_page_of_listings_async(
+    session: AsyncSession,
+    query: ListingPageQuery,
+    seller_id: Optional[GenericUUID] = None,
+) -> Page[dict]:
+    result = await session.execute(select_page_of_listings(query, seller_id))
+    return map_page_of_rows(result.all(), query)
+
+
+def map_page_of_rows(rows: list, query: ListingPageQuery) -> Page[dict]:
+    page = page_of_rows(rows, keys_count=2, limit=query.limit, scope=query.sort.value)
+    return Page(
+        items=[map_listing_row_to_dao(row) for row in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+def map_listing_row_to_dao(row) -> dict:
+    """maps a projected listing row to a data access object (a dictionary)"""
+    return dict(
+        id=row.id,
+        title=row.title,
+        description=row.description,
+        ask_price_amount=float(row.ask_price_amount),
+        ask_price_currency=row.ask_price_currency,
+        seller_id=row.seller_id,
+        status=row.status,
+    )
@@ -1,7 +1,8 @@
 import uuid
 
+from sqlalchemy import Integer, Numeric, cast
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.sql.schema import Column
+from sqlalchemy.sql.schema import Column, Index
 from sqlalchemy_json import mutable_json_type
 from sqlalchemy_utils import UUIDType
 
@@ -10,7 +11,10 @@ from modules.catalog.domain.repositories import ListingRepository
 from seedwork.domain.value_objects import GenericUUID, Money
 from seedwork.infrastructure.data_mapper import DataMapper
 from seedwork.infrastructure.database import Base
-from seedwork.infrastructure.repository import SqlAlchemyGenericRepository
+from seedwork.infrastructure.repository import (
+    AsyncSqlAlchemyGenericRepository,
+    SqlAlchemyGenericRepository,
+)
 
 """
 References:
@@ -25,6 +29,23 @@ class ListingModel(Base):
     __tablename__ = "catalog_listing"
     id = Column(UUIDType(binary=False), primary_key=True, default=uuid.uuid4)
     data = Column(mutable_json_type(dbtype=JSONB, nested=True))
+    version = Column(Integer, nullable=False)  # incremented on each update
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+# expressions used by listing queries, and indexed (see alembic revision 5b0fb6a2c7e4)
+listing_seller_id = ListingModel.data["seller_id"].astext
+listing_status = ListingModel.data["status"].astext
+listing_title = ListingModel.data["title"].astext
+listing_ask_price_amount = cast(
+    ListingModel.data[("ask_price", "amount")].astext, Numeric
+)
+
+Index("ix_catalog_listing_seller_id", listing_seller_id)
+Index("ix_catalog_listing_status", listing_status)
+Index("ix_catalog_listing_title", listing_title, ListingModel.id)
+Index("ix_catalog_listing_ask_price_amount", listing_ask_price_amount, ListingModel.id)
 
 
 class ListingDataMapper(DataMapper[Listing, ListingModel]):
@@ -59,3 +80,10 @@ class PostgresJsonListingRepository(ListingRepository, SqlAlchemyGenericReposito
 
     mapper_class = ListingDataMapper
     model_class = ListingModel
+
+
+class AsyncPostgresJsonListingRepository(AsyncSqlAlchemyGenericRepository):
+    """Listing repository implementation using an async session"""
+
+    mapper_class = ListingDataMapper
+    model_class = ListingModel
@@ -0,0 +1,119 @@
+import pytest
+
+from modules.catalog.application.query.get_all_listings import (
+    GetAllListings,
+    get_all_listings,
+)
+from modules.catalog.application.query.get_listings_of_seller import (
+    GetListingsOfSeller,
+    get_listings_of_seller,
+)
+from modules.catalog.application.query.listing_pages import ListingSortOrder
+from modules.catalog.domain.entities import Listing
+from modules.catalog.domain.value_objects import ListingStatus
+from modules.catalog.infrastructure.listing_repository import (
+    PostgresJsonListingRepository,
+)
+from seedwork.domain.value_objects import GenericUUID, Money
+from seedwork.infrastructure.pagination import encode_cursor
+
+SELLER_1 = GenericUUID(int=1)
+SELLER_2 = GenericUUID(int=2)
+
+
+@pytest.fixture
+def listings(db_session):
+    repository = PostgresJsonListingRepository(db_session=db_session)
+    for i, (title, price, seller_id) in enumerate(
+        [
+            ("Foo", 30, SELLER_1),
+            ("Bar", 10, SELLER_2),
+            ("Baz", 20, SELLER_1),
+            ("Qux", 40, SELLER_1),
+        ],
+        start=1,
+    ):
+        listing = Listing(
+            id=GenericUUID(int=i),
+            title=title,
+            description="",
+            ask_price=Money(price),
+            seller_id=seller_id,
+        )
+        if title != "Qux":
+            listing.status = ListingStatus.PUBLISHED
+        repository.add(listing)
+    db_session.flush()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_all_listings_is_paginated(db_session, listings):
+    titles = []
+    cursor = None
+    for _ in range(2):
+        page = await get_all_listings(
+            GetAllListings(limit=2, cursor=cursor), session=db_session
+        )
+        titles.extend(listing["title"] for listing in page.items)
+        cursor = page.next_cursor
+
+    assert titles == ["Bar", "Baz", "Foo", "Qux"]
+    assert cursor is None
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_all_listings_filtered_by_status_and_sorted_by_price(
+    db_session, listings
+):
+    query = GetAllListings(
+        status=ListingStatus.PUBLISHED, sort=ListingSortOrder.PRICE_DESC, limit=2
+    )
+    page = await get_all_listings(query, session=db_session)
+    next_page = await get_all_listings(
+        GetAllListings(**{**query.model_dump(), "cursor": page.next_cursor}),
+        session=db_session,
+    )
+
+    assert [listing["ask_price_amount"] for listing in page.items] == [30.0, 20.0]
+    assert [listing["ask_price_amount"] for listing in next_page.items] == [10.0]
+    assert next_page.next_cursor is None
+
+
+@pytest.mark.integration
+def test_get_listings_of_seller(db_session, listings):
+    page = get_listings_of_seller(
+        GetListingsOfSeller(seller_id=SELLER_1), session=db_session
+    )
+
+    assert [listing["title"] for listing in page.items] == ["Baz", "Foo", "Qux"]
+    assert {listing["seller_id"] for listing in page.items} == {str(SELLER_1)}
+
+
+@pytest.mark.unit
+def test_get_all_listings_rejects_invalid_cursor():
+    with pytest.raises(ValueError):
+        GetAllListings(cursor="not a cursor")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor([1]),
+        encode_cursor(["Foo", str(GenericUUID(int=1))]),
+        encode_cursor(["Foo", str(GenericUUID(int=1))], scope="price"),
+        encode_cursor(["10", 1], scope="title"),
+        encode_cursor([10, str(GenericUUID(int=1))], scope="title"),
+    ],
+)
+def test_get_all_listings_rejects_cursor_of_another_sort_or_with_invalid_keys(cursor):
+    with pytest.raises(ValueError):
+        GetAllListings(cursor=cursor)
+
+
+@pytest.mark.unit
+def test_get_all_listings_accepts_cursor_of_the_same_sort():
+    cursor = encode_cursor(["10.50", str(GenericUUID(int=1))], scope="-price")
+    assert GetAllListings(cursor=cursor, sort=ListingSortOrder.PRICE_DESC).cursor
@@ -0,0 +1,89 @@
+import pytest
+
+from modules.catalog.application.command import (
+    CreateListingDraftCommand,
+    UpdateListingDraftCommand,
+)
+from modules.catalog.application.query import GetAllListings, GetListingDetails
+from seedwork.domain.value_objects import GenericUUID, Money
+
+LISTING_ID = GenericUUID(int=1)
+SELLER_ID = GenericUUID(int=2)
+
+
+async def create_listing(app):
+    await app.execute_async(
+        CreateListingDraftCommand(
+            listing_id=LISTING_ID,
+            title="Foo",
+            description="",
+            ask_price=Money(10),
+            seller_id=SELLER_ID,
+        )
+    )
+
+
+async def update_listing(app, title):
+    await app.execute_async(
+        UpdateListingDraftCommand(
+            listing_id=LISTING_ID,
+            title=title,
+            description="",
+            ask_price=Money(10),
+            modify_user_id=SELLER_ID,
+        )
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_listing_details_are_cached_until_listing_is_updated(app):
+    query_cache = app["query_cache"]
+    await create_listing(app)
+    hits = query_cache.stats().hits
+
+    await app.execute_async(GetListingDetails(listing_id=LISTING_ID))
+    cached = await app.execute_async(GetListingDetails(listing_id=LISTING_ID))
+    await update_listing(app, "Bar")
+    updated = await app.execute_async(GetListingDetails(listing_id=LISTING_ID))
+
+    assert cached["title"] == "Foo"
+    assert updated["title"] == "Bar"
+    assert query_cache.stats().hits == hits + 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_catalog_is_invalidated_by_created_listing(app):
+    before = await app.execute_async(GetAllListings())
+    await create_listing(app)
+    after = await app.execute_async(GetAllListings())
+
+    assert before.items == []
+    assert [item["id"] for item in after.items] == [LISTING_ID]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_rolled_back_changes_do_not_invalidate_cache(app):
+    query_cache = app["query_cache"]
+    await create_listing(app)
+    await app.execute_async(GetListingDetails(listing_id=LISTING_ID))
+    invalidations = query_cache.stats().invalidations
+
+    with pytest.raises(ValueError):
+        async with app.transaction_context() as ctx:
+            await ctx.execute_async(
+                UpdateListingDraftCommand(
+                    listing_id=LISTING_ID,
+                    title="Bar",
+                    description="",
+                    ask_price=Money(10),
+                    modify_user_id=SELLER_ID,
+                )
+            )
+            raise ValueError()
+    details = await app.execute_async(GetListingDetails(listing_id=LISTING_ID))
+
+    assert details["title"] == "Foo"
+    assert query_cache.stats().invalidations == invalidations
@@ -1,8 +1,10 @@
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from modules.catalog.domain.entities import Listing, Money
 from modules.catalog.infrastructure.listing_repository import (
+    AsyncPostgresJsonListingRepository,
     ListingDataMapper,
     ListingModel,
     PostgresJsonListingRepository,
@@ -11,9 +13,10 @@ from seedwork.domain.value_objects import GenericUUID
 
 
 @pytest.mark.integration
-def test_listing_repo_is_empty(db_session):
+def test_listing_repo_is_empty(db_session, assert_num_statements):
     repo = PostgresJsonListingRepository(db_session=db_session)
-    assert repo.count() == 0
+    with assert_num_statements(1):
+        assert repo.count() == 0
 
 
 @pytest.mark.integration
@@ -37,7 +40,7 @@ def test_sqlalchemy_repo_is_adding(engine):
 
 
 @pytest.mark.integration
-def test_sqlalchemy_repo_is_persisting_chages(engine):
+def test_sqlalchemy_repo_is_persisting_chages(engine, assert_num_statements):
     with Session(engine) as session:
         repo = PostgresJsonListingRepository(db_session=session)
         listing = Listing(
@@ -50,7 +53,7 @@ def test_sqlalchemy_repo_is_persisting_chages(engine):
         repo.add(listing)
         session.commit()
 
-    with Session(engine) as session:
+    with Session(engine) as session, assert_num_statements(2):  # SELECT and UPDATE
         repo = PostgresJsonListingRepository(db_session=session)
         listing = repo.get_by_id(GenericUUID(int=1))
         listing.title = "Bar"
@@ -140,3 +143,35 @@ def test_listing_persistence(db_session):
     persisted = repository.get_by_id(original.id)
 
     assert original == persisted
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_async_repo_is_persisting_changes(async_engine):
+    listing_id = GenericUUID(int=1)
+    async with AsyncSession(async_engine) as session:
+        repo = AsyncPostgresJsonListingRepository(db_session=session)
+        repo.add(
+            Listing(
+                id=listing_id,
+                title="Foo",
+                description="...",
+                ask_price=Money(10),
+                seller_id=GenericUUID(int=1),
+            )
+        )
+        await session.commit()
+
+    async with AsyncSession(async_engine) as session:
+        repo = AsyncPostgresJsonListingRepository(db_session=session)
+        listing = await repo.get_by_id(listing_id)
+        assert await repo.get_by_ids([listing_id]) == [listing]
+        listing.title = "Bar"
+        await repo.persist_all()
+        await session.commit()
+
+    async with AsyncSession(async_engine) as session:
+        repo = AsyncPostgresJsonListingRepository(db_session=session)
+        listing = await repo.get_by_id(listing_id)
+        assert listing.title == "Bar"
+        assert await repo.count() == 1
@@ -0,0 +1,187 @@
+import dataclasses
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from modules.iam.domain.entities import User
+from seedwork.domain.value_objects import Email, GenericUUID
+
+
+class SharedCacheBackend(ABC):
+    """
+    Cache shared by all the workers (i.e. Redis or Memcached), used when a token is not found
+    in a process-local cache. Values are opaque strings.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+
+@dataclasses.dataclass(frozen=True)
+class AccessTokenCacheStats:
+    hits: int
+    misses: int
+    negative_hits: int  # hits of tokens cached as not belonging to any user
+    shared_hits: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def user_to_json(user: Optional[User]) -> str:
+    if user is None:
+        return "null"
+    return json.dumps(
+        dict(
+            id=str(user.id),
+            email=user.email,
+            access_token=user.access_token,
+            is_superuser=user.is_superuser,
+        )
+    )
+
+
+def user_from_json(value: str) -> Optional[User]:
+    data = json.loads(value)
+    if data is None:
+        return None
+    return User(
+        id=GenericUUID(data["id"]),
+        email=Email(data["email"]),
+        password_hash=None,
+        access_token=data["access_token"],
+        is_superuser=data["is_superuser"],
+    )
+
+
+class AccessTokenCache:
+    """
+    Process-local LRU cache of users by access token. Tokens not belonging to any user are cached as well,
+    but for a shorter time (`negative_ttl`).
+
+    Entries are invalidated explicitly by IamService when a user is created or changed. Entries of a shared
+    backend are invalidated in the same way, but other workers may still use their local entries until they expire,
+    so `ttl` bounds the staleness of a user.
+
+    Password hashes are never cached (cached users have no `password_hash`), users authenticated with a password
+    are loaded from a repository.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+        max_size: int = 10_000,
+        shared_backend: Optional[SharedCacheBackend] = None,
+        key_prefix: str = "iam:access_token:",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.shared_backend = shared_backend
+        self.key_prefix = key_prefix
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, Optional[User]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._negative_hits = 0
+        self._shared_hits = 0
+        self._evictions = 0
+
+    def get(self, access_token: str) -> tuple[bool, Optional[User]]:
+        """Returns a (found, user) pair, user is None if the token is cached as not belonging to any user"""
+        with self._lock:
+            entry = self._entries.get(access_token)
+            if entry is not None:
+                expires_at, user = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(access_token)
+                    self._hits += 1
+                    if user is None:
+                        self._negative_hits += 1
+                    return True, _copy(user)
+                del self._entries[access_token]
+
+        if self.shared_backend is not None:
+            value = self.shared_backend.get(self.key_prefix + access_token)
+            if value is not None:
+                user = user_from_json(value)
+                with self._lock:
+                    self._hits += 1
+                    self._shared_hits += 1
+                    if user is None:
+                        self._negative_hits += 1
+                    self._store(access_token, user)
+                return True, _copy(user)
+
+        with self._lock:
+            self._misses += 1
+        return False, None
+
+    def set(self, access_token: str, user: Optional[User]) -> None:
+        """Caches a user found by a token, or the fact that the token does not belong to any user"""
+        if user is not None:
+            user = dataclasses.replace(user, events=[], password_hash=None)
+        with self._lock:
+            self._store(access_token, user)
+        if self.shared_backend is not None:
+            self.shared_backend.set(
+                self.key_prefix + access_token, user_to_json(user), self._ttl_of(user)
+            )
+
+    def invalidate(self, access_token: str) -> None:
+        with self._lock:
+            self._entries.pop(access_token, None)
+        if self.shared_backend is not None:
+            self.shared_backend.delete(self.key_prefix + access_token)
+
+    def clear(self) -> None:
+        """Clears local entries (entries of a shared backend are left to expire)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> AccessTokenCacheStats:
+        with self._lock:
+            return AccessTokenCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                negative_hits=self._negative_hits,
+                shared_hits=self._shared_hits,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
+
+    def _store(self, access_token: str, user: Optional[User]) -> None:
+        self._entries[access_token] = (self._clock() + self._ttl_of(user), user)
+        self._entries.move_to_end(access_token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _ttl_of(self, user: Optional[User]) -> float:
+        return self.ttl if user is not None else self.negative_ttl
+
+
+def _copy(user: Optional[User]) -> Optional[User]:
+    """Cached users are shared by requests, so each request gets its own copy"""
+    if user is None:
+        return None
+    return dataclasses.replace(user, events=[])
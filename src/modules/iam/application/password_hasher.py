@@ -0,0 +1,115 @@
+import asyncio
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+
+class PasswordHasher(ABC):
+    """Hashes and verifies passwords, both synchronously and without blocking the event loop"""
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, password_hash: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def hash_async(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    async def verify_async(self, password: str, password_hash: str) -> bool:
+        ...
+
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Checks if a hash was created with other parameters (i.e. cost) than the current ones"""
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("UTF-8"), bcrypt.gensalt(rounds)).decode(
+        "UTF-8"
+    )
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode("UTF-8"), password_hash.encode("UTF-8"))
+
+
+class BcryptPasswordHasher(PasswordHasher):
+    """
+    Bcrypt password hasher with a configurable cost factor (log2 of the number of rounds).
+
+    If `max_workers` is given, hashing runs in a pool of worker processes, so it does not block
+    the event loop (async API) nor contend for the GIL with request handling. Workers are forked by a fork server
+    (with this module preloaded), not by the calling process, so it is safe to start the pool when other threads
+    (i.e. a log listener) are running. Otherwise, passwords are hashed in the calling thread (or in the default
+    thread pool of the event loop). Worker processes are stopped by `shutdown`.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: Optional[int] = None):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    def hash(self, password: str) -> str:
+        if self.max_workers is None:
+            return hash_password(password, self.rounds)
+        return (
+            self._get_executor().submit(hash_password, password, self.rounds).result()
+        )
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        if self.max_workers is None:
+            return check_password(password, password_hash)
+        return (
+            self._get_executor()
+            .submit(check_password, password, password_hash)
+            .result()
+        )
+
+    async def hash_async(self, password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), hash_password, password, self.rounds
+        )
+
+    async def verify_async(self, password: str, password_hash: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), check_password, password, password_hash
+        )
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # bcrypt hashes look like $2b$<cost>$<salt and hash>
+        try:
+            cost = int(password_hash.split("$")[2])
+        except (IndexError, ValueError):
+            return True
+        return cost != self.rounds
+
+    def start(self) -> None:
+        """Starts worker processes, so the first passwords are not hashed while workers are starting"""
+        if self.max_workers is not None:
+            self._get_executor().submit(int).result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.max_workers is None:
+            return None  # the default executor of the event loop
+        if self._executor is None:
+            mp_context = multiprocessing.get_context("forkserver")
+            mp_context.set_forkserver_preload([__name__])
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=mp_context
+            )
+        return self._executor
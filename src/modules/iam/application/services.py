@@ -1,13 +1,26 @@
-import bcrypt
+from typing import Optional
 
+from modules.iam.application.auth_cache import AccessTokenCache
 from modules.iam.application.exceptions import InvalidCredentialsException
+from modules.iam.application.password_hasher import BcryptPasswordHasher, PasswordHasher
 from modules.iam.domain.entities import User
 from seedwork.domain.value_objects import Email
 
 
 class IamService:
-    def __init__(self, user_repository):
+    def __init__(
+        self,
+        user_repository,
+        access_token_cache: Optional[AccessTokenCache] = None,
+        password_hasher: Optional[PasswordHasher] = None,
+        invalidated_access_tokens: Optional[set[str]] = None,
+    ):
         self.user_repository = user_repository
+        self.access_token_cache = access_token_cache
+        self.password_hasher = password_hasher or BcryptPasswordHasher()
+        # access tokens of users changed in the transaction, invalidated in the cache when it is committed
+        # (without the set, they are invalidated immediately)
+        self.invalidated_access_tokens = invalidated_access_tokens
 
     def create_user(
         self, user_id, email, password, access_token, is_superuser=False
@@ -20,15 +33,28 @@ class IamService:
         if user:
             raise ValueError(f"User with access_token {access_token} already exists")
 
-        password_hash = bcrypt.hashpw(password.encode("UTF-8"), bcrypt.gensalt())
         user = User(
             id=user_id,
             email=Email(email),
-            password_hash=password_hash.decode("UTF-8"),
+            password_hash=self.password_hasher.hash(password),
             access_token=access_token,
             is_superuser=is_superuser,
         )
         self.user_repository.add(user)
+        self._invalidate_access_token(access_token)
+        return user
+
+    def change_access_token(self, user_id, access_token) -> User:
+        user = self.user_repository.get_by_access_token(access_token)
+        if user:
+            raise ValueError(f"User with access_token {access_token} already exists")
+
+        user = self.user_repository.get_by_id(user_id)
+        previous_access_token = user.access_token
+        user.access_token = access_token
+        self.user_repository.persist(user)
+        self._invalidate_access_token(previous_access_token)
+        self._invalidate_access_token(access_token)
         return user
 
     def authenticate_with_name_and_password(self, name, password) -> User:
@@ -36,14 +62,46 @@ class IamService:
         if not user:
             raise InvalidCredentialsException()
 
-        password_match = bcrypt.checkpw(
-            password.encode("UTF-8"), user.password_hash.encode("UTF-8")
-        )
-        if not password_match:
+        if not self.password_hasher.verify(password, user.password_hash):
             raise InvalidCredentialsException()
 
+        if self.password_hasher.needs_rehash(user.password_hash):
+            self._update_password_hash(user, self.password_hasher.hash(password))
         return user
 
     def find_user_by_access_token(self, access_token: str) -> User:
-        user = self.user_repository.get_by_access_token(access_token)
+        found, user = self.find_cached_user_by_access_token(access_token)
+        if not found:
+            user = self.user_repository.get_by_access_token(access_token)
+            if self._is_cacheable(access_token):
+                self.access_token_cache.set(access_token, user)
         return user
+
+    def find_cached_user_by_access_token(
+        self, access_token: str
+    ) -> tuple[bool, Optional[User]]:
+        """Looks up a user in the cache only, without reading the database (so it does not block)"""
+        if not self._is_cacheable(access_token):
+            return False, None
+        return self.access_token_cache.get(access_token)
+
+    def _is_cacheable(self, access_token: str) -> bool:
+        # a user changed in this transaction is read from the database until it is committed
+        return self.access_token_cache is not None and not (
+            self.invalidated_access_tokens
+            and access_token in self.invalidated_access_tokens
+        )
+
+    def _update_password_hash(self, user: User, password_hash: str) -> None:
+        """Replaces a hash created with outdated parameters, i.e. after the cost factor was changed"""
+        user.password_hash = password_hash
+        self.user_repository.persist(user)
+        self._invalidate_access_token(user.access_token)
+
+    def _invalidate_access_token(self, access_token: str) -> None:
+        if self.access_token_cache is None:
+            return
+        if self.invalidated_access_tokens is None:
+            self.access_token_cache.invalidate(access_token)
+        else:
+            self.invalidated_access_tokens.add(access_token)
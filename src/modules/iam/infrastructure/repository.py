@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, String
+from sqlalchemy import Boolean, String, select
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.sql.schema import Column
@@ -10,7 +10,10 @@ from modules.iam.application.services import User
 from seedwork.domain.value_objects import Email
 from seedwork.infrastructure.database import Base
 from seedwork.infrastructure.json_data_mapper import JSONDataMapper
-from seedwork.infrastructure.repository import SqlAlchemyGenericRepository
+from seedwork.infrastructure.repository import (
+    AsyncSqlAlchemyGenericRepository,
+    SqlAlchemyGenericRepository,
+)
 
 
 class UserModel(Base):
@@ -65,3 +68,20 @@ class PostgresJsonUserRepository(SqlAlchemyGenericRepository, UserRepository):
             return self._get_entity(instance)
         except NoResultFound:
             return None
+
+
+class AsyncPostgresJsonUserRepository(AsyncSqlAlchemyGenericRepository):
+    """User repository implementation using an async session"""
+
+    mapper_class = UserDataMapper
+    model_class = UserModel
+
+    async def get_by_access_token(self, access_token: str) -> User | None:
+        result = await self._session.execute(
+            select(UserModel).filter_by(access_token=access_token)
+        )
+        return self._get_entity(result.scalar_one_or_none())
+
+    async def get_by_email(self, email: Email) -> User | None:
+        result = await self._session.execute(select(UserModel).filter_by(email=email))
+        return self._get_entity(result.scalar_one_or_none())
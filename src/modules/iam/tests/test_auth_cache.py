@@ -0,0 +1,112 @@
+import dataclasses
+from typing import Optional
+
+import pytest
+
+from modules.iam.application.auth_cache import AccessTokenCache, SharedCacheBackend
+from modules.iam.domain.entities import User
+from seedwork.domain.value_objects import Email, GenericUUID
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class DictCacheBackend(SharedCacheBackend):
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.values[key] = value
+
+    def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+
+def create_user(access_token="token"):
+    return User(
+        id=GenericUUID(int=1),
+        email=Email("user1@example.com"),
+        password_hash="hash",
+        access_token=access_token,
+    )
+
+
+def create_cached_user(access_token="token"):
+    return dataclasses.replace(create_user(access_token), password_hash=None)
+
+
+@pytest.mark.unit
+def test_cached_user_expires_after_ttl():
+    clock = FakeClock()
+    cache = AccessTokenCache(ttl=60, clock=clock)
+    cache.set("token", create_user())
+
+    clock.now = 59
+    found, user = cache.get("token")
+    assert found and user == create_cached_user()
+
+    clock.now = 61
+    assert cache.get("token") == (False, None)
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+
+
+@pytest.mark.unit
+def test_unknown_token_is_cached_with_negative_ttl():
+    clock = FakeClock()
+    cache = AccessTokenCache(ttl=60, negative_ttl=5, clock=clock)
+    cache.set("token", None)
+
+    clock.now = 4
+    assert cache.get("token") == (True, None)
+    clock.now = 6
+    assert cache.get("token") == (False, None)
+    assert cache.stats().negative_hits == 1
+
+
+@pytest.mark.unit
+def test_least_recently_used_token_is_evicted():
+    cache = AccessTokenCache(max_size=2)
+    cache.set("token1", create_user("token1"))
+    cache.set("token2", create_user("token2"))
+    cache.get("token1")
+    cache.set("token3", create_user("token3"))
+
+    assert cache.get("token1")[0]
+    assert not cache.get("token2")[0]
+    assert cache.stats().evictions == 1
+    assert cache.stats().size == 2
+
+
+@pytest.mark.unit
+def test_each_hit_returns_a_copy_of_user():
+    cache = AccessTokenCache()
+    cache.set("token", create_user())
+
+    _, user = cache.get("token")
+    user.is_superuser = True
+
+    assert cache.get("token")[1].is_superuser is False
+
+
+@pytest.mark.unit
+def test_shared_backend_is_used_on_local_miss_and_invalidated():
+    backend = DictCacheBackend()
+    AccessTokenCache(shared_backend=backend).set("token", create_user())
+    cache = AccessTokenCache(shared_backend=backend)
+
+    assert cache.get("token") == (True, create_cached_user())
+    assert "hash" not in backend.values["iam:access_token:token"]
+    assert cache.stats().shared_hits == 1
+
+    cache.invalidate("token")
+    assert backend.values == {}
+    assert cache.get("token") == (False, None)
@@ -1,5 +1,6 @@
 import pytest
 
+from modules.iam.application.password_hasher import BcryptPasswordHasher
 from modules.iam.application.services import IamService
 from seedwork.domain.value_objects import GenericUUID
 
@@ -50,3 +51,94 @@ def test_create_user_with_duplicated_access_token_raises_exception(app):
                 password="password",
                 access_token="token",
             )
+
+
+@pytest.mark.integration
+def test_find_user_by_access_token_is_cached_until_user_is_created(app):
+    access_token_cache = app["access_token_cache"]
+    initial_stats = access_token_cache.stats()
+    with app.transaction_context() as ctx:
+        assert ctx[IamService].find_user_by_access_token("token") is None
+
+    with app.transaction_context() as ctx:
+        ctx[IamService].create_user(
+            user_id=GenericUUID(int=1),
+            email="user1@example.com",
+            password="password",
+            access_token="token",
+        )
+
+    for _ in range(2):
+        with app.transaction_context() as ctx:
+            user = ctx[IamService].find_user_by_access_token("token")
+            assert user.id == GenericUUID(int=1)
+
+    stats = access_token_cache.stats()
+    assert stats.hits - initial_stats.hits == 1
+    assert stats.misses - initial_stats.misses == 2
+
+
+@pytest.mark.integration
+def test_change_access_token_invalidates_cached_user(app):
+    with app.transaction_context() as ctx:
+        ctx[IamService].create_user(
+            user_id=GenericUUID(int=1),
+            email="user1@example.com",
+            password="password",
+            access_token="token",
+        )
+    with app.transaction_context() as ctx:
+        assert ctx[IamService].find_user_by_access_token("token") is not None
+
+    with app.transaction_context() as ctx:
+        ctx[IamService].change_access_token(GenericUUID(int=1), "new_token")
+
+    with app.transaction_context() as ctx:
+        iam_service = ctx[IamService]
+        assert iam_service.find_user_by_access_token("token") is None
+        assert iam_service.find_user_by_access_token("new_token") is not None
+
+
+@pytest.mark.integration
+def test_password_is_rehashed_on_login_when_cost_changed(app):
+    with app.transaction_context() as ctx:
+        iam_service = ctx[IamService]
+        iam_service.password_hasher = BcryptPasswordHasher(rounds=4)
+        iam_service.create_user(
+            user_id=GenericUUID(int=1),
+            email="user1@example.com",
+            password="password",
+            access_token="token",
+        )
+
+    with app.transaction_context() as ctx:
+        iam_service = ctx[IamService]
+        iam_service.password_hasher = BcryptPasswordHasher(rounds=5)
+        iam_service.authenticate_with_name_and_password("user1@example.com", "password")
+
+    with app.transaction_context() as ctx:
+        user = ctx["user_repository"].get_by_email("user1@example.com")
+        assert user.password_hash.startswith("$2b$05$")
+
+
+@pytest.mark.integration
+def test_access_token_is_invalidated_when_transaction_is_committed(app):
+    access_token_cache = app["access_token_cache"]
+    with app.transaction_context() as ctx:
+        ctx[IamService].create_user(
+            user_id=GenericUUID(int=1),
+            email="user1@example.com",
+            password="password",
+            access_token="token",
+        )
+    with app.transaction_context() as ctx:
+        assert ctx[IamService].find_user_by_access_token("token") is not None
+
+    with app.transaction_context() as ctx:
+        iam_service = ctx[IamService]
+        iam_service.change_access_token(GenericUUID(int=1), "new_token")
+        # other transactions may read the cached user until the change is committed
+        assert access_token_cache.get("token")[0]
+        assert iam_service.find_user_by_access_token("token") is None
+
+    assert not access_token_cache.get("token")[0]
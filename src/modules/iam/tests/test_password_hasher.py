@@ -0,0 +1,35 @@
+import pytest
+
+from modules.iam.application.password_hasher import BcryptPasswordHasher
+
+
+@pytest.mark.unit
+def test_hash_is_verified():
+    hasher = BcryptPasswordHasher(rounds=4)
+    password_hash = hasher.hash("password")
+
+    assert hasher.verify("password", password_hash)
+    assert not hasher.verify("other password", password_hash)
+
+
+@pytest.mark.unit
+def test_hash_created_with_other_cost_needs_rehash():
+    password_hash = BcryptPasswordHasher(rounds=4).hash("password")
+
+    assert not BcryptPasswordHasher(rounds=4).needs_rehash(password_hash)
+    assert BcryptPasswordHasher(rounds=5).needs_rehash(password_hash)
+    assert BcryptPasswordHasher(rounds=4).needs_rehash("not a bcrypt hash")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_passwords_are_hashed_in_worker_processes():
+    hasher = BcryptPasswordHasher(rounds=4, max_workers=1)
+    try:
+        password_hash = await hasher.hash_async("password")
+
+        assert await hasher.verify_async("password", password_hash)
+        assert hasher.verify("password", password_hash)
+        assert not await hasher.verify_async("other password", password_hash)
+    finally:
+        hasher.shutdown()
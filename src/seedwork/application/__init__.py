@@ -1,31 +1,36 @@
 import importlib
-import inspect
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
 from functools import partial
-from typing import Any, Type, TypeVar
+from typing import Any, Type, TypeVar, get_args, get_origin
 
 from seedwork.application.command_handlers import CommandResult
 from seedwork.application.commands import Command
-from seedwork.application.events import EventResult, EventResultSet, IntegrationEvent
-from seedwork.application.exceptions import ApplicationException
+from seedwork.application.events import (
+    EventFanout,
+    EventResult,
+    EventResultSet,
+    IntegrationEvent,
+)
+from seedwork.application.exceptions import (
+    ApplicationException,
+    EventCascadeLimitExceeded,
+)
+from seedwork.application.handler_plans import get_handler_plan, resolve_parameters
 from seedwork.application.inbox_outbox import InMemoryInbox
 from seedwork.application.queries import Query
 from seedwork.application.query_handlers import QueryResult
+from seedwork.application.routing import RoutingTable
 from seedwork.domain.events import DomainEvent
 from seedwork.domain.repositories import GenericRepository
 from seedwork.utils.data_structures import OrderedSet
 
 
 def get_function_arguments(func):
-    handler_signature = inspect.signature(func)
-    kwargs_iterator = iter(handler_signature.parameters.items())
-    _, first_param = next(kwargs_iterator)
-    first_parameter = first_param.annotation
-    remaining_parameters = {}
-    for name, param in kwargs_iterator:
-        remaining_parameters[name] = param.annotation
-
-    return first_parameter, remaining_parameters
+    plan = get_handler_plan(func)
+    remaining_parameters = {
+        parameter.name: parameter.annotation for parameter in plan.dependencies
+    }
+    return plan.message_type, remaining_parameters
 
 
 T = TypeVar("T", CommandResult, EventResult)
@@ -54,32 +59,16 @@ class DependencyProvider:
     def get_dependency(self, identifier):
         return self.dependencies[identifier]
 
-    def _get_arguments(self, func):
-        return get_function_arguments(func)
-
-    def _resolve_arguments(self, handler_parameters) -> dict:
-        """Match handler_parameters with dependencies"""
-        kwargs = {}
-        for param_name, param_type in handler_parameters.items():
-            try:
-                if param_type is inspect._empty:
-                    raise ValueError("No type annotation")
-                kwargs[param_name] = self.get_dependency(param_type)
-                continue
-            except (ValueError, KeyError):
-                pass
-
-            try:
-                kwargs[param_name] = self.get_dependency(param_name)
-                continue
-            except (ValueError, KeyError):
-                pass
-
-        return kwargs
+    def has_dependency(self, identifier):
+        try:
+            return identifier in self.dependencies
+        except TypeError:
+            # unhashable annotation, i.e. list[int]
+            return False
 
     def get_handler_kwargs(self, func, **overrides):
-        _, handler_parameters = self._get_arguments(func)
-        kwargs = self._resolve_arguments(handler_parameters)
+        plan = get_handler_plan(func)
+        kwargs = resolve_parameters(plan.dependencies, self)
         kwargs.update(**overrides)
         return kwargs
 
@@ -109,6 +98,7 @@ class TransactionContext:
         self.task = None
         self.next_commands = []
         self.integration_events = []
+        self.fanout = EventFanout()
 
     def __enter__(self):
         """Should be used to start a transaction"""
@@ -167,33 +157,82 @@ class TransactionContext:
 
         self.next_commands = []
         self.integration_events = []
-        event_queue = command_result.events.copy()
-        while len(event_queue) > 0:
-            event = event_queue.pop(0)
-            if isinstance(event, IntegrationEvent):
-                self.collect_integration_event(event)
-
-            elif isinstance(event, DomainEvent):
-                event_results = self.handle_domain_event(event)
-                self.next_commands.extend(event_results.commands)
-                event_queue.extend(event_results.events)
+        self.propagate_events(command_result.events)
+        self.app.fanout_counters[type(command)].update(self.fanout.events)
 
         return CommandResult.success(payload=command_result.payload)
 
-    def handle_domain_event(self, event) -> EventResultSet:
-        event_results = []
-        for handler_func in self.app.get_event_handlers(event):
-            handler_kwargs = self.dependency_provider.get_handler_kwargs(
-                handler_func, **self.overrides
+    def propagate_events(self, events):
+        """
+        Propagates events breadth-first until there are no more events to handle.
+        Domain events are passed to event handlers one by one, and to batch event handlers once the queue
+        is drained, so a batch handler receives all pending events it is subscribed to at once.
+        Events returned by handlers are queued with a cascade depth one greater than the depth of the source event.
+        """
+        self.fanout = EventFanout()
+        event_queue = deque((event, 1) for event in events)
+        pending_batches: dict[Any, list] = {}
+        while event_queue or pending_batches:
+            while event_queue:
+                event, depth = event_queue.popleft()
+                self._count_event(event, depth)
+                if isinstance(event, IntegrationEvent):
+                    self.collect_integration_event(event)
+
+                elif isinstance(event, DomainEvent):
+                    batch_handlers = self.app.routing_table.get_event_batch_handlers(
+                        type(event)
+                    )
+                    for handler_func in batch_handlers:
+                        pending_batches.setdefault(handler_func, []).append(
+                            (event, depth)
+                        )
+
+                    for handler_func in self.app.get_event_handlers(event):
+                        event_result = self._call_event_handler(handler_func, event)
+                        self._enqueue_result(event_queue, event_result, depth)
+
+            batches, pending_batches = pending_batches, {}
+            for handler_func, batch in batches.items():
+                events = [event for event, _ in batch]
+                depth = max(depth for _, depth in batch)
+                event_result = self._call_event_handler(handler_func, events)
+                self._enqueue_result(event_queue, event_result, depth)
+
+    def _enqueue_result(self, event_queue, event_result: EventResult, depth: int):
+        if event_result.command:
+            self.next_commands.append(event_result.command)
+        event_queue.extend((event, depth + 1) for event in event_result.events)
+
+    def _count_event(self, event, depth):
+        self.fanout.events[type(event)] += 1
+        self.fanout.max_depth = max(self.fanout.max_depth, depth)
+        if depth > self.app.max_event_cascade_depth:
+            raise EventCascadeLimitExceeded(
+                f"Event cascade deeper than {self.app.max_event_cascade_depth} (at {event})"
             )
-            p = partial(handler_func, event, **handler_kwargs)
-            wrapped_handler = self._wrap_with_middlewares(p, event=event)
-            event_result = wrapped_handler() or EventResult.success()
-            assert isinstance(
-                event_result, EventResult
-            ), f"Got {event_result} instead of EventResult from {handler_func}"
-            event_result = collect_domain_events(event_result, handler_kwargs)
-            event_results.append(event_result)
+        if self.fanout.total > self.app.max_events_per_command:
+            raise EventCascadeLimitExceeded(
+                f"More than {self.app.max_events_per_command} events propagated (at {event})"
+            )
+
+    def _call_event_handler(self, handler_func, event) -> EventResult:
+        handler_kwargs = self.dependency_provider.get_handler_kwargs(
+            handler_func, **self.overrides
+        )
+        p = partial(handler_func, event, **handler_kwargs)
+        wrapped_handler = self._wrap_with_middlewares(p, event=event)
+        event_result = wrapped_handler() or EventResult.success()
+        assert isinstance(
+            event_result, EventResult
+        ), f"Got {event_result} instead of EventResult from {handler_func}"
+        return collect_domain_events(event_result, handler_kwargs)
+
+    def handle_domain_event(self, event) -> EventResultSet:
+        event_results = [
+            self._call_event_handler(handler_func, event)
+            for handler_func in self.app.get_event_handlers(event)
+        ]
         return EventResultSet(event_results)
 
     def collect_integration_event(self, event):
@@ -218,23 +257,48 @@ class ApplicationModule:
         self.command_handlers = {}
         self.query_handlers = {}
         self.event_handlers = defaultdict(OrderedSet)
+        self.event_batch_handlers = defaultdict(OrderedSet)
+        self._applications = []  # applications including this module
+
+    def _handlers_changed(self):
+        for application in self._applications:
+            application._routing_table = None
 
     def query_handler(self, handler_func):
         """Query handler decorator"""
-        query_cls, _ = get_function_arguments(handler_func)
+        query_cls = get_handler_plan(handler_func).message_type
         self.query_handlers[query_cls] = handler_func
+        self._handlers_changed()
         return handler_func
 
     def command_handler(self, handler_func):
         """Command handler decorator"""
-        command_cls, _ = get_function_arguments(handler_func)
+        command_cls = get_handler_plan(handler_func).message_type
         self.command_handlers[command_cls] = handler_func
+        self._handlers_changed()
         return handler_func
 
     def domain_event_handler(self, handler_func):
         """Event handler decorator"""
-        event_cls, _ = get_function_arguments(handler_func)
+        event_cls = get_handler_plan(handler_func).message_type
         self.event_handlers[event_cls].add(handler_func)
+        self._handlers_changed()
+        return handler_func
+
+    def domain_event_batch_handler(self, handler_func):
+        """
+        Batch event handler decorator. A handler receives a list of all pending events of a type at once,
+        i.e. `def handler(events: list[BidWasPlaced])`.
+        """
+        annotation = get_handler_plan(handler_func).message_type
+        event_args = get_args(annotation)
+        if get_origin(annotation) is not list or len(event_args) != 1:
+            raise TypeError(
+                f"Batch event handler {handler_func.__qualname__} must be annotated with list[Event], got {annotation}"
+            )
+        (event_cls,) = event_args
+        self.event_batch_handlers[event_cls].add(handler_func)
+        self._handlers_changed()
         return handler_func
 
     def import_from(self, module_name):
@@ -245,19 +309,36 @@ class ApplicationModule:
 
 
 class Application(ApplicationModule):
+    # limits of domain events propagated by a single command, guarding against runaway event loops
+    max_event_cascade_depth = 100
+    max_events_per_command = 100_000
+
     def __init__(self, name=__name__, version=1.0, dependency_provider=None, **kwargs):
         super().__init__(name, version)
         self.dependency_provider = dependency_provider or DependencyProvider(**kwargs)
         self._transaction_middlewares = []
         self._on_enter_transaction_context = lambda ctx: None
         self._on_exit_transaction_context = lambda ctx, exc_type, exc_val, exc_tb: None
-        self._modules = set([self])
+        self._modules = OrderedSet([self])
+        self._applications.append(self)
+        self._routing_table = None
+        self.fanout_counters: defaultdict[type, Counter] = defaultdict(Counter)
 
     def include_module(self, a_module):
         assert isinstance(
             a_module, ApplicationModule
         ), "Can only include ApplicationModule instances"
         self._modules.add(a_module)
+        if self not in a_module._applications:
+            a_module._applications.append(self)
+        self._routing_table = None
+
+    @property
+    def routing_table(self) -> RoutingTable:
+        """Handlers of all included modules, rebuilt after a module is included or a handler is registered"""
+        if self._routing_table is None:
+            self._routing_table = RoutingTable(self._modules)
+        return self._routing_table
 
     def on_enter_transaction_context(self, func):
         self._on_enter_transaction_context = func
@@ -274,26 +355,20 @@ class Application(ApplicationModule):
 
     def get_query_handler(self, query):
         query_cls = type(query)
-        for app_module in self._modules:
-            handler_func = app_module.query_handlers.get(query_cls)
-            if handler_func:
-                return handler_func
+        handler_func = self.routing_table.query_handlers.get(query_cls)
+        if handler_func:
+            return handler_func
         raise Exception(f"No query handler found for command {query_cls}")
 
     def get_command_handler(self, command):
         command_cls = type(command)
-        for app_module in self._modules:
-            handler_func = app_module.command_handlers.get(command_cls)
-            if handler_func:
-                return handler_func
+        handler_func = self.routing_table.command_handlers.get(command_cls)
+        if handler_func:
+            return handler_func
         raise Exception(f"No command handler found for command {command_cls}")
 
     def get_event_handlers(self, event):
-        event_cls = type(event)
-        event_handlers = []
-        for app_module in self._modules:
-            event_handlers.extend(app_module.event_handlers.get(event_cls, []))
-        return event_handlers
+        return list(self.routing_table.get_event_handlers(type(event)))
 
     def transaction_context(self, **dependencies):
         return TransactionContext(self, **dependencies)
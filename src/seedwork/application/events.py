@@ -1,4 +1,5 @@
 import sys
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -82,3 +83,15 @@ class EventResultSet(set):
     def commands(self):
         all_commands = [event.command for event in self if event.command]
         return all_commands
+
+
+@dataclass
+class EventFanout:
+    """Counters of domain events propagated as a result of a single command"""
+
+    events: Counter = field(default_factory=Counter)  # number of events by event class
+    max_depth: int = 0  # length of the longest event cascade
+
+    @property
+    def total(self) -> int:
+        return sum(self.events.values())
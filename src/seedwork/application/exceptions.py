@@ -4,3 +4,7 @@ class ApplicationException(Exception):
 
 class UnitOfWorkNotSetException(ApplicationException):
     pass
+
+
+class EventCascadeLimitExceeded(ApplicationException):
+    """Raised when domain events propagated by a single command exceed configured limits"""
@@ -0,0 +1,198 @@
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional
+
+from lato import Application
+from lato.message import Message
+
+from seedwork.application.handler_plans import get_handler_plan
+from seedwork.domain.exceptions import ConcurrencyException
+
+
+class ExecutionPolicy(str, Enum):
+    NATIVE = "native"  # run on the event loop, for handlers that never block
+    THREADPOOL = "threadpool"  # run in a worker thread, for handlers doing blocking I/O
+
+
+def execution_policy(policy: ExecutionPolicy) -> Callable:
+    """
+    Decorator for setting an explicit execution policy of a handler, i.e. for an async handler
+    using a synchronous SQLAlchemy session
+    """
+
+    def decorator(func):
+        func.execution_policy = policy
+        return func
+
+    return decorator
+
+
+def publishes(*event_types: type) -> Callable:
+    """
+    Decorator for declaring events published by a handler, so a message runs in a worker thread
+    if any handler of the event cascade must not run on the event loop
+    """
+
+    def decorator(func):
+        func.published_events = event_types
+        return func
+
+    return decorator
+
+
+def get_execution_policy(handler: Callable) -> ExecutionPolicy:
+    """Returns an explicit policy of a handler, otherwise async handlers run natively and sync handlers in threads"""
+    policy = getattr(handler, "execution_policy", None)
+    if policy is not None:
+        return policy
+    if get_handler_plan(handler).is_async:
+        return ExecutionPolicy.NATIVE
+    return ExecutionPolicy.THREADPOOL
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Re-executes a message in a new transaction context, if it failed with one of `retry_on` exceptions"""
+
+    max_attempts: int = 5
+    retry_on: tuple[type[Exception], ...] = (ConcurrencyException,)
+    backoff: float = 0.005  # max delay (in seconds) before the second attempt, doubled for each next one
+
+    def get_delay(self, attempt: int) -> float:
+        """Randomized delay after a failed attempt, so conflicting transactions do not collide again"""
+        return random.uniform(0, self.backoff * 2 ** (attempt - 1))
+
+
+def retry_policy(policy: RetryPolicy) -> Callable:
+    """Decorator for setting a retry policy of a command handler, i.e. for retrying optimistic concurrency conflicts"""
+
+    def decorator(func):
+        func.retry_policy = policy
+        return func
+
+    return decorator
+
+
+def get_retry_policy(handler: Callable) -> Optional[RetryPolicy]:
+    return getattr(handler, "retry_policy", None)
+
+
+class MessageExecutor:
+    """
+    Executes messages without blocking the event loop. A message runs natively only if all its handlers
+    (and handlers of events they publish) run natively, otherwise the whole transaction (with its session)
+    runs in a bounded pool of worker threads, each of them running its own event loop.
+
+    Only events declared with `publishes` are known in advance. A native handler publishing other events
+    runs their handlers on the event loop as well, so it must declare events handled by blocking handlers.
+    """
+
+    def __init__(self, application: Application, max_workers: int):
+        self.application = application
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="message-executor"
+        )
+        self._thread_local = threading.local()
+        # event loops of worker threads, closed on shutdown
+        self._loops: list[asyncio.AbstractEventLoop] = []
+        self._policies: dict[type, ExecutionPolicy] = {}
+        self._retry_policies: dict[type, Optional[RetryPolicy]] = {}
+
+    def get_policy(self, message_cls: type) -> ExecutionPolicy:
+        policy = self._policies.get(message_cls)
+        if policy is None:
+            handlers = self._get_cascade_handlers(message_cls)
+            policy = self._policies[message_cls] = (
+                ExecutionPolicy.NATIVE
+                if handlers
+                and all(
+                    get_execution_policy(handler) is ExecutionPolicy.NATIVE
+                    for handler in handlers
+                )
+                else ExecutionPolicy.THREADPOOL
+            )
+        return policy
+
+    def _get_cascade_handlers(self, message_cls: type) -> list[Callable]:
+        """Handlers of a message, and handlers of events published by them (see `publishes`)"""
+        handlers = []
+        seen, pending = {message_cls}, [message_cls]
+        while pending:
+            for message_handler in self.application.get_handlers_for(pending.pop()):
+                handlers.append(message_handler.fn)
+                for event_cls in getattr(message_handler.fn, "published_events", ()):
+                    if event_cls not in seen:
+                        seen.add(event_cls)
+                        pending.append(event_cls)
+        return handlers
+
+    def get_retry_policy(self, message_cls: type) -> Optional[RetryPolicy]:
+        try:
+            return self._retry_policies[message_cls]
+        except KeyError:
+            pass
+
+        retry = None
+        for message_handler in self.application.get_handlers_for(message_cls):
+            retry = retry or get_retry_policy(message_handler.fn)
+        self._retry_policies[message_cls] = retry
+        return retry
+
+    async def execute(
+        self, message: Message, policy: Optional[ExecutionPolicy] = None
+    ) -> Any:
+        """
+        Executes a message, using a policy of a route (if given) or policies of message handlers.
+        If a handler has a retry policy, a failed message is executed again in a new transaction context.
+        """
+        retry = self.get_retry_policy(type(message))
+        attempt = 1
+        while True:
+            try:
+                return await self._execute(message, policy)
+            except Exception as e:
+                if (
+                    retry is None
+                    or attempt >= retry.max_attempts
+                    or not isinstance(e, retry.retry_on)
+                ):
+                    raise
+            await asyncio.sleep(retry.get_delay(attempt))
+            attempt += 1
+
+    async def _execute(self, message: Message, policy: Optional[ExecutionPolicy]):
+        return await self.run(
+            policy or self.get_policy(type(message)),
+            self.application.execute_async,
+            message,
+        )
+
+    async def run(
+        self, policy: ExecutionPolicy, func: Callable[..., Awaitable], *args
+    ) -> Any:
+        """Runs a coroutine function on the event loop, or in a worker thread (with THREADPOOL policy)"""
+        if policy is ExecutionPolicy.NATIVE:
+            return await func(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._run_blocking, func, *args
+        )
+
+    def _run_blocking(self, func: Callable[..., Awaitable], *args) -> Any:
+        """Runs a coroutine function in the event loop of a worker thread"""
+        loop = getattr(self._thread_local, "loop", None)
+        if loop is None:
+            loop = self._thread_local.loop = asyncio.new_event_loop()
+            self._loops.append(loop)
+        return loop.run_until_complete(func(*args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        while self._loops:
+            self._loops.pop().close()
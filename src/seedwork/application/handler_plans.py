@@ -0,0 +1,125 @@
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+
+@dataclass(frozen=True)
+class HandlerParameter:
+    name: str
+    annotation: Any
+    lookup_keys: tuple[Any, ...]  # dependency identifiers to try, in order
+
+
+@dataclass(frozen=True)
+class HandlerPlan:
+    """
+    Handler invocation plan, compiled once from a handler signature.
+    Executing a plan only matches parameters against dependencies, so no signature inspection
+    is done when a message is dispatched.
+    """
+
+    func: Callable
+    parameters: tuple[HandlerParameter, ...]
+    is_async: bool
+
+    @classmethod
+    def compile(cls, func: Callable) -> "HandlerPlan":
+        parameters = []
+        for name, param in inspect.signature(func).parameters.items():
+            if param.annotation is inspect.Parameter.empty:
+                lookup_keys: tuple[Any, ...] = (name,)
+            else:
+                lookup_keys = (param.annotation, name)
+            parameters.append(
+                HandlerParameter(
+                    name=name, annotation=param.annotation, lookup_keys=lookup_keys
+                )
+            )
+        return cls(
+            func=func,
+            parameters=tuple(parameters),
+            is_async=asyncio.iscoroutinefunction(func),
+        )
+
+    @property
+    def message_type(self) -> Any:
+        """Annotation of the first parameter, which is a message handled by the handler"""
+        return self.parameters[0].annotation
+
+    @property
+    def dependencies(self) -> tuple[HandlerParameter, ...]:
+        """All the parameters except the message"""
+        return self.parameters[1:]
+
+    def resolve_kwargs(self, dependency_provider, args=(), kwargs=None) -> dict:
+        """Matches handler parameters with positional arguments, keyword arguments and dependencies"""
+        resolved_kwargs = {
+            parameter.name: arg for parameter, arg in zip(self.parameters, args)
+        }
+        resolved_kwargs.update(
+            resolve_parameters(
+                self.parameters[len(args) :], dependency_provider, kwargs or {}
+            )
+        )
+        return resolved_kwargs
+
+
+def resolve_parameters(parameters, dependency_provider, kwargs=None) -> dict:
+    """Resolves parameters using explicit kwargs first, and then dependencies by type and name"""
+    resolved_kwargs = {}
+    for parameter in parameters:
+        if kwargs and parameter.name in kwargs:
+            resolved_kwargs[parameter.name] = kwargs[parameter.name]
+            continue
+        for key in parameter.lookup_keys:
+            if dependency_provider.has_dependency(key):
+                resolved_kwargs[parameter.name] = dependency_provider.get_dependency(
+                    key
+                )
+                break
+    return resolved_kwargs
+
+
+_handler_plans: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def get_handler_plan(func: Callable) -> HandlerPlan:
+    """Returns a cached plan of a handler, compiling it on first use"""
+    try:
+        return _handler_plans[func]
+    except KeyError:
+        pass
+    except TypeError:
+        # func cannot be weakly referenced, i.e. a builtin
+        return HandlerPlan.compile(func)
+
+    plan = _handler_plans[func] = HandlerPlan.compile(func)
+    return plan
+
+
+def compile_handler_plans(module) -> None:
+    """Compiles plans for all the handlers registered in a lato module and its submodules"""
+    for handlers in module._handlers.values():
+        for handler in handlers:
+            get_handler_plan(handler)
+    for submodule in module._submodules:
+        compile_handler_plans(submodule)
+
+
+def get_dependency_types(module) -> frozenset[type]:
+    """Types of dependencies of all the handlers registered in a lato module and its submodules"""
+    dependency_types = set()
+    for handlers in module._handlers.values():
+        for handler in handlers:
+            for parameter in get_handler_plan(handler).dependencies:
+                annotation = parameter.annotation
+                if (
+                    isinstance(annotation, type)
+                    and annotation is not inspect.Parameter.empty
+                ):
+                    dependency_types.add(annotation)
+    for submodule in module._submodules:
+        dependency_types |= get_dependency_types(submodule)
+    return frozenset(dependency_types)
@@ -0,0 +1,220 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from lato import Application
+from lato.message import Message
+from lato.utils import maybe_await
+
+from seedwork.application.execution import ExecutionPolicy, MessageExecutor, RetryPolicy
+
+
+def aggregate_mailbox(aggregate_id: str) -> Callable:
+    """
+    Decorator for routing commands of a handler to a mailbox of the aggregate they target,
+    `aggregate_id` is the name of a command attribute holding the id of the aggregate.
+
+    Changes made to the aggregate by a command which fails are undone in repositories supporting checkpoints
+    (see `SqlAlchemyRepositoryBase.checkpoint`), so they are not written with other commands of its batch.
+    """
+
+    def decorator(func):
+        func.aggregate_mailbox = aggregate_id
+        return func
+
+    return decorator
+
+
+def get_aggregate_mailbox(handler: Callable) -> Optional[str]:
+    return getattr(handler, "aggregate_mailbox", None)
+
+
+@dataclass
+class MailboxStats:
+    batches: int = 0
+    messages: int = 0
+    retries: int = 0  # batches executed again after a concurrency conflict
+    largest_batch: int = 0
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.messages / self.batches if self.batches else 0.0
+
+
+class ResolvedDependencies(dict):
+    """
+    Dependencies resolved for handlers of a transaction context (`resolved_kwargs`, by parameter name), which keeps
+    all resolved instances, even if handlers resolved different ones with the same parameter name
+    (i.e. `listing_repository` of the catalog and of the bidding module)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._instances: dict[int, Any] = {}
+
+    def update(self, *args, **kwargs) -> None:
+        resolved = dict(*args, **kwargs)
+        super().update(resolved)
+        for dependency in resolved.values():
+            self._instances.setdefault(id(dependency), dependency)
+
+    def having(self, attribute: str) -> list:
+        """Resolved instances with an attribute (i.e. repositories with `persist_all`)"""
+        return [
+            dependency
+            for dependency in self._instances.values()
+            if hasattr(dependency, attribute)
+        ]
+
+
+class AggregateMailboxExecutor(MessageExecutor):
+    """
+    Message executor which serializes commands targeting the same aggregate (see `aggregate_mailbox`).
+
+    Commands are queued in a mailbox of the aggregate and a single worker (coroutine) per mailbox executes them in order,
+    in batches. A batch runs in one transaction with write-behind repositories, so the aggregate is loaded once
+    and written once per batch, instead of once per command. The first batch is collected for `batch_window` seconds,
+    next batches consist of commands queued while the previous batch was running. Mailboxes of different aggregates
+    are drained concurrently, other messages are executed as by MessageExecutor.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        max_workers: int,
+        batch_window: float = 0.002,
+        max_batch_size: int = 100,
+    ):
+        super().__init__(application, max_workers)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.stats = MailboxStats()
+        self._mailboxes: dict[Any, deque[tuple[Message, asyncio.Future]]] = {}
+        self._workers: set[asyncio.Task] = set()
+        self._aggregate_ids: dict[type, Optional[str]] = {}
+
+    def get_aggregate_id_attribute(self, message_cls: type) -> Optional[str]:
+        try:
+            return self._aggregate_ids[message_cls]
+        except KeyError:
+            pass
+
+        attribute = None
+        for message_handler in self.application.get_handlers_for(message_cls):
+            attribute = attribute or get_aggregate_mailbox(message_handler.fn)
+        self._aggregate_ids[message_cls] = attribute
+        return attribute
+
+    async def execute(
+        self, message: Message, policy: Optional[ExecutionPolicy] = None
+    ) -> Any:
+        attribute = self.get_aggregate_id_attribute(type(message))
+        if attribute is None:
+            return await super().execute(message, policy)
+
+        aggregate_id = getattr(message, attribute)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        mailbox = self._mailboxes.get(aggregate_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[aggregate_id] = deque()
+            worker = loop.create_task(self._drain(aggregate_id, mailbox))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+        mailbox.append((message, future))
+        return await future
+
+    async def _drain(self, aggregate_id, mailbox: deque):
+        try:
+            await asyncio.sleep(self.batch_window)
+            while mailbox:
+                batch = [
+                    mailbox.popleft()
+                    for _ in range(min(len(mailbox), self.max_batch_size))
+                ]
+                await self._execute_batch(batch)
+        finally:
+            # the mailbox is empty, so the next command of the aggregate starts a new worker
+            del self._mailboxes[aggregate_id]
+
+    async def _execute_batch(self, batch: list[tuple[Message, asyncio.Future]]):
+        messages = [message for message, _ in batch]
+        retry = self._get_batch_retry_policy(messages)
+        attempt = 1
+        while True:
+            try:
+                outcomes = await self._run_batch(messages)
+                break
+            except Exception as e:
+                if (
+                    retry is None
+                    or attempt >= retry.max_attempts
+                    or not isinstance(e, retry.retry_on)
+                ):
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    return
+            self.stats.retries += 1
+            await asyncio.sleep(retry.get_delay(attempt))
+            attempt += 1
+
+        self.stats.batches += 1
+        self.stats.messages += len(batch)
+        self.stats.largest_batch = max(self.stats.largest_batch, len(batch))
+        for (_, future), (succeeded, outcome) in zip(batch, outcomes):
+            if future.done():
+                continue  # i.e. the caller was cancelled
+            if succeeded:
+                future.set_result(outcome)
+            else:
+                future.set_exception(outcome)
+
+    def _get_batch_retry_policy(self, messages: list[Message]) -> Optional[RetryPolicy]:
+        for message_cls in dict.fromkeys(map(type, messages)):
+            retry = self.get_retry_policy(message_cls)
+            if retry is not None:
+                return retry
+        return None
+
+    async def _run_batch(self, messages: list[Message]) -> list[tuple[bool, Any]]:
+        policy = (
+            ExecutionPolicy.NATIVE
+            if all(
+                self.get_policy(type(message)) is ExecutionPolicy.NATIVE
+                for message in messages
+            )
+            else ExecutionPolicy.THREADPOOL
+        )
+        return await self.run(policy, self._execute_in_transaction, messages)
+
+    async def _execute_in_transaction(
+        self, messages: list[Message]
+    ) -> list[tuple[bool, Any]]:
+        """
+        Executes messages one by one in a single transaction, and writes all changes at the end of it.
+        Changes made to the aggregate by a failed message are undone in repositories supporting checkpoints.
+        Returns (succeeded, result or exception) outcomes of messages.
+        """
+        outcomes: list[tuple[bool, Any]] = []
+        async with self.application.transaction_context(write_behind=True) as ctx:
+            dependencies = ctx.resolved_kwargs = ResolvedDependencies()
+            for message in messages:
+                attribute = self.get_aggregate_id_attribute(type(message))
+                aggregate_ids = [getattr(message, attribute)]
+                checkpoints = {
+                    id(repository): repository.checkpoint(aggregate_ids)
+                    for repository in dependencies.having("checkpoint")
+                }
+                try:
+                    outcomes.append((True, await ctx.execute_async(message)))
+                except Exception as e:
+                    # repositories first resolved by the failed message hold only its changes
+                    for repository in dependencies.having("checkpoint"):
+                        repository.restore(checkpoints.get(id(repository), {}))
+                    outcomes.append((False, e))
+
+            for repository in dependencies.having("persist_all"):
+                await maybe_await(repository.persist_all)
+        return outcomes
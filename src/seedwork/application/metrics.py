@@ -0,0 +1,238 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar, Token
+from itertools import accumulate
+from typing import Iterable, Optional
+
+# upper bounds of latency buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+
+class Histogram:
+    """A histogram with fixed buckets, an observation is a binary search and an increment of a counter"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # the last bucket is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def cumulative_counts(self) -> list[int]:
+        """Numbers of observations less than or equal to each bound (and +Inf)"""
+        return list(accumulate(self.counts))
+
+
+class MessageMetrics:
+    """Metrics of handlers of one message type"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.count = 0
+        self.errors = 0
+        self.sql_statements = 0
+        self.sql_rows = 0
+        self.sql_seconds = 0.0
+        self.handler = Histogram(buckets)
+        self.dependencies = Histogram(buckets)
+        self.events = Histogram(buckets)
+        self.commit = Histogram(buckets)
+        self._lock = threading.Lock()
+
+    def observe_dispatch(
+        self, handler: float, dependencies: float, events: float, error: bool
+    ) -> None:
+        with self._lock:
+            self.count += 1
+            self.errors += error
+            self.handler.observe(handler)
+            # phases which did not run (no dependencies resolved, no events published) are not observed
+            if dependencies:
+                self.dependencies.observe(dependencies)
+            if events:
+                self.events.observe(events)
+
+    def observe_commit(self, seconds: float) -> None:
+        with self._lock:
+            self.commit.observe(seconds)
+
+    def observe_statements(self, stats) -> None:
+        """Adds SQL statements of a message (see StatementAccounting)"""
+        with self._lock:
+            self.sql_statements += stats.statements
+            self.sql_rows += stats.rows
+            self.sql_seconds += stats.seconds
+
+
+class Dispatch:
+    """A message being dispatched, dispatches nested in it (i.e. of published events) add their time to `events`"""
+
+    __slots__ = ("message_type", "metrics", "dependencies", "parent", "token", "events")
+
+    def __init__(
+        self,
+        message_type: type,
+        metrics: MessageMetrics,
+        dependencies: float,
+        parent: Optional["Dispatch"],
+    ):
+        self.message_type = message_type
+        self.metrics = metrics
+        self.dependencies = dependencies
+        self.parent = parent
+        self.token: Optional[Token] = None
+        self.events = 0.0
+
+
+_current_dispatch: ContextVar[Optional[Dispatch]] = ContextVar(
+    "current_dispatch", default=None
+)
+
+
+class HandlerMetrics:
+    """
+    Metrics of message handlers, by message type: numbers of dispatches and errors, and latency histograms
+    of handlers, dependency resolution, event cascades (handling of events published during a dispatch)
+    and commits of transactions the messages were dispatched in.
+
+    Handler time excludes the event cascade, which is measured as time of nested dispatches
+    (and observed only for dispatches which published events).
+    SQL statements of messages are counted as well, if observed (see StatementAccounting).
+    Metrics are rendered in Prometheus text format (see `render`).
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._messages: dict[type, MessageMetrics] = {}
+        self._lock = threading.Lock()
+
+    def get(self, message_type: type) -> MessageMetrics:
+        metrics = self._messages.get(message_type)
+        if metrics is None:
+            with self._lock:
+                metrics = self._messages.setdefault(
+                    message_type, MessageMetrics(self.buckets)
+                )
+        return metrics
+
+    def begin_dispatch(self, message_type: type, dependencies: float) -> Dispatch:
+        """Starts measuring a dispatch, `dependencies` is time of resolving dependencies of its handler"""
+        dispatch = Dispatch(
+            message_type, self.get(message_type), dependencies, _current_dispatch.get()
+        )
+        dispatch.token = _current_dispatch.set(dispatch)
+        return dispatch
+
+    def end_dispatch(self, dispatch: Dispatch, elapsed: float, error: bool) -> None:
+        """Records a dispatch, `elapsed` is time of its middlewares and handler (including the event cascade)"""
+        _current_dispatch.reset(dispatch.token)
+        dispatch.metrics.observe_dispatch(
+            handler=elapsed - dispatch.events,
+            dependencies=dispatch.dependencies,
+            events=dispatch.events,
+            error=error,
+        )
+        if dispatch.parent is not None:
+            dispatch.parent.events += elapsed + dispatch.dependencies
+
+    def observe_commit(self, message_types: Iterable[type], seconds: float) -> None:
+        for message_type in message_types:
+            self.get(message_type).observe_commit(seconds)
+
+    def observe_statements(self, message_type: type, stats) -> None:
+        self.get(message_type).observe_statements(stats)
+
+    def render(self, prefix: str = "lato") -> str:
+        """Renders metrics in Prometheus text format"""
+        with self._lock:
+            messages = sorted(
+                self._messages.items(), key=lambda item: item[0].__qualname__
+            )
+        lines = []
+        for name, help_text, attribute in [
+            ("messages_total", "Messages dispatched to handlers", "count"),
+            ("message_errors_total", "Dispatches which raised an exception", "errors"),
+            (
+                "sql_statements_total",
+                "SQL statements executed for messages",
+                "sql_statements",
+            ),
+            (
+                "sql_rows_total",
+                "Rows returned or affected by SQL statements",
+                "sql_rows",
+            ),
+            (
+                "sql_seconds_total",
+                "Time of SQL statements executed for messages",
+                "sql_seconds",
+            ),
+        ]:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for message_type, metrics in messages:
+                label = _label(message_type)
+                lines.append(
+                    f"{prefix}_{name}{{{label}}} {getattr(metrics, attribute)}"
+                )
+
+        for name, help_text, attribute in [
+            ("handler_seconds", "Time of handlers, without event cascades", "handler"),
+            (
+                "dependency_resolution_seconds",
+                "Time of resolving dependencies of handlers",
+                "dependencies",
+            ),
+            (
+                "event_cascade_seconds",
+                "Time of handling events published during a dispatch",
+                "events",
+            ),
+            (
+                "commit_seconds",
+                "Time of commits of transactions the messages were dispatched in",
+                "commit",
+            ),
+        ]:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for message_type, metrics in messages:
+                label = _label(message_type)
+                with metrics._lock:
+                    histogram = getattr(metrics, attribute)
+                    counts = histogram.cumulative_counts()
+                    total = histogram.sum
+                bounds = [repr(bound) for bound in histogram.bounds] + ["+Inf"]
+                for bound, count in zip(bounds, counts):
+                    lines.append(
+                        f'{prefix}_{name}_bucket{{{label},le="{bound}"}} {count}'
+                    )
+                lines.append(f"{prefix}_{name}_sum{{{label}}} {total!r}")
+                lines.append(f"{prefix}_{name}_count{{{label}}} {counts[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _label(message_type: type) -> str:
+    name = message_type.__qualname__.replace("\\", "\\\\").replace('"', '\\"')
+    return f'message_type="{name}"'
@@ -0,0 +1,230 @@
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Optional
+
+from lato.message import Message
+
+
+def format_tags(templates: Iterable[str], message: Message) -> tuple[str, ...]:
+    """Formats templates of tags (i.e. "listing:{listing_id}") with fields of a message"""
+    fields = vars(message)
+    return tuple(template.format_map(fields) for template in templates)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    key: Optional[
+        str
+    ] = None  # a template formatted with fields of a query, all fields (except id) by default
+    tags: tuple[
+        str, ...
+    ] = ()  # templates of tags, an entry is invalidated when any of its tags is
+    ttl: Optional[float] = None  # seconds, defaults to the ttl of the cache
+
+    def get_key(self, query: Message) -> str:
+        """Returns a key of a query result, prefixed with the name of the query class"""
+        name = type(query).__qualname__
+        if self.key is None:
+            return f"{name}:{query.model_dump_json(exclude={'id'})}"
+        return f"{name}:{self.key.format_map(vars(query))}"
+
+    def get_tags(self, query: Message) -> tuple[str, ...]:
+        return format_tags(self.tags, query)
+
+
+def cached_query(
+    key: Optional[str] = None, tags: Iterable[str] = (), ttl: Optional[float] = None
+) -> Callable:
+    """
+    Decorator for caching results of a query handler in QueryCache, i.e.
+    `@cached_query(key="{listing_id}", tags=["listing:{listing_id}"])`.
+    Results are invalidated by events mapped to their tags (see `QueryCache.tags_invalidated_by`).
+    """
+
+    def decorator(func):
+        func.cache_policy = CachePolicy(key=key, tags=tuple(tags), ttl=ttl)
+        return func
+
+    return decorator
+
+
+def get_cache_policy(handler: Callable) -> Optional[CachePolicy]:
+    return getattr(handler, "cache_policy", None)
+
+
+@dataclass(frozen=True)
+class QueryCacheStats:
+    hits: int
+    misses: int
+    coalesced: int  # misses served by a concurrent load of the same key
+    evictions: int
+    invalidations: int  # entries dropped because of their invalidated tags
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass(eq=False)
+class _Load:
+    """A query result being loaded, shared by all concurrent lookups of its key"""
+
+    tags: tuple[str, ...]
+    future: Future = field(default_factory=Future)
+    invalidated: bool = False  # set if any tag was invalidated during the load
+
+
+class QueryCache:
+    """
+    Process-local LRU cache of query results, with results tagged and invalidated by tags.
+
+    Concurrent lookups of a missing key are coalesced, so only one of them executes the query (single-flight),
+    also when they run in different threads. A result loaded while any of its tags was invalidated is returned,
+    but not stored, as it may have been read before the changes were committed.
+
+    `invalidations` maps types of events to templates of tags they invalidate. Other workers are not notified
+    about invalidations, so `ttl` bounds the staleness of their results.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 10.0,
+        max_size: int = 10_000,
+        invalidations: Optional[Mapping[type, Iterable[str]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._invalidations = {
+            event_cls: tuple(templates)
+            for event_cls, templates in (invalidations or {}).items()
+        }
+        self._clock = clock
+        self._entries: OrderedDict[
+            str, tuple[float, tuple[str, ...], Any]
+        ] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+        self._loads: dict[str, _Load] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._invalidated = 0
+
+    def tags_invalidated_by(self, event: Message) -> tuple[str, ...]:
+        templates = self._invalidations.get(type(event))
+        return format_tags(templates, event) if templates else ()
+
+    async def get_or_load(
+        self,
+        key: str,
+        tags: tuple[str, ...],
+        load: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Returns a copy of a cached result, otherwise loads it with `load` (once for concurrent lookups)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                hit, value = True, entry[2]
+            else:
+                hit = False
+                if entry is not None:
+                    self._remove(key)
+                self._misses += 1
+                pending = self._loads.get(key)
+                if pending is None:
+                    pending = self._loads[key] = _Load(tags)
+                    leader = True
+                else:
+                    self._coalesced += 1
+                    leader = False
+
+        if hit:
+            return copy.deepcopy(value)
+        if not leader:
+            return copy.deepcopy(await asyncio.wrap_future(pending.future))
+
+        try:
+            result = await load()
+        except BaseException as e:
+            with self._lock:
+                self._finish_load(key, pending)
+            pending.future.set_exception(e)
+            raise
+
+        stored = copy.deepcopy(result)
+        with self._lock:
+            self._finish_load(key, pending)
+            if not pending.invalidated:
+                self._store(key, tags, stored, self.ttl if ttl is None else ttl)
+        pending.future.set_result(stored)
+        return result
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        if not tags:
+            return
+        with self._lock:
+            for tag in tags:
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self._invalidated += 1
+            for key, pending in list(self._loads.items()):
+                if not tags.isdisjoint(pending.tags):
+                    # next lookups load the result again, instead of waiting for a stale one
+                    pending.invalidated = True
+                    del self._loads[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            for pending in self._loads.values():
+                pending.invalidated = True
+            self._loads.clear()
+
+    def stats(self) -> QueryCacheStats:
+        with self._lock:
+            return QueryCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                coalesced=self._coalesced,
+                evictions=self._evictions,
+                invalidations=self._invalidated,
+                size=len(self._entries),
+            )
+
+    def _finish_load(self, key: str, pending: _Load) -> None:
+        if self._loads.get(key) is pending:
+            del self._loads[key]
+
+    def _store(self, key: str, tags: tuple[str, ...], value: Any, ttl: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + ttl, tags, value)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
@@ -0,0 +1,71 @@
+from types import MappingProxyType
+from typing import Callable, Iterable
+
+
+class RoutingTable:
+    """
+    Merged, read-only view of handlers registered in application modules.
+    Modules are visited in the given order, so for commands and queries the first registered handler wins,
+    and event handlers are ordered by module, then by registration order.
+
+    Events are dispatched along the MRO of an event class, so a handler of a base event class
+    is called for its subclasses as well (handlers of more specific classes go first).
+    """
+
+    def __init__(self, modules: Iterable):
+        command_handlers: dict[type, Callable] = {}
+        query_handlers: dict[type, Callable] = {}
+        event_handlers: dict[type, list[Callable]] = {}
+        event_batch_handlers: dict[type, list[Callable]] = {}
+        for module in modules:
+            for command_cls, handler in module.command_handlers.items():
+                command_handlers.setdefault(command_cls, handler)
+            for query_cls, handler in module.query_handlers.items():
+                query_handlers.setdefault(query_cls, handler)
+            for event_cls, handlers in module.event_handlers.items():
+                event_handlers.setdefault(event_cls, []).extend(handlers)
+            for event_cls, handlers in module.event_batch_handlers.items():
+                event_batch_handlers.setdefault(event_cls, []).extend(handlers)
+
+        self.command_handlers = MappingProxyType(command_handlers)
+        self.query_handlers = MappingProxyType(query_handlers)
+        self.event_handlers = MappingProxyType(
+            {
+                event_cls: tuple(handlers)
+                for event_cls, handlers in event_handlers.items()
+            }
+        )
+        self.event_batch_handlers = MappingProxyType(
+            {
+                event_cls: tuple(handlers)
+                for event_cls, handlers in event_batch_handlers.items()
+            }
+        )
+        self._event_routes: dict[type, tuple[Callable, ...]] = {}
+        self._event_batch_routes: dict[type, tuple[Callable, ...]] = {}
+
+    def get_event_handlers(self, event_cls: type) -> tuple[Callable, ...]:
+        try:
+            return self._event_routes[event_cls]
+        except KeyError:
+            route = self._event_routes[event_cls] = _route_along_mro(
+                self.event_handlers, event_cls
+            )
+            return route
+
+    def get_event_batch_handlers(self, event_cls: type) -> tuple[Callable, ...]:
+        try:
+            return self._event_batch_routes[event_cls]
+        except KeyError:
+            route = self._event_batch_routes[event_cls] = _route_along_mro(
+                self.event_batch_handlers, event_cls
+            )
+            return route
+
+
+def _route_along_mro(handlers_by_type, event_cls: type) -> tuple[Callable, ...]:
+    handlers: dict[Callable, None] = {}  # used as an ordered set
+    for cls in event_cls.__mro__:
+        for handler in handlers_by_type.get(cls, ()):
+            handlers[handler] = None
+    return tuple(handlers)
@@ -0,0 +1,85 @@
+import inspect
+from typing import Any, Callable, Optional
+
+from lato import TransactionContext
+from lato.message import Message
+from lato.utils import maybe_await
+
+from seedwork.application.execution import ExecutionPolicy, MessageExecutor
+
+
+class UnitOfWork:
+    """
+    A unit of work spanning several messages (i.e. an authentication lookup, a command and a read-back query
+    of one HTTP request), executed in a single transaction context, so they share a session and its repositories.
+
+    Changes are committed at explicit commit points (`commit`) and when the unit of work is exited without an error,
+    otherwise changes made after the last commit point are rolled back. Messages run natively or in a worker thread
+    of the executor (according to their execution policy), but unlike `MessageExecutor.execute` they are not retried,
+    as a retry needs a new transaction. Dependencies are passed to the transaction context factory of the application.
+
+    A synchronous commit hook (the `commit` dependency) blocks on the database, so commits and the exit
+    of the transaction context (which commits or rolls back) run in a worker thread of the executor.
+    """
+
+    def __init__(self, executor: MessageExecutor, **dependencies):
+        self.executor = executor
+        self._dependencies = dependencies
+        self._ctx: Optional[TransactionContext] = None
+
+    @property
+    def ctx(self) -> TransactionContext:
+        if self._ctx is None:
+            raise RuntimeError("Unit of work is not active, use `async with`")
+        return self._ctx
+
+    async def __aenter__(self) -> "UnitOfWork":
+        ctx = self.executor.application.transaction_context(**self._dependencies)
+        await ctx.__aenter__()
+        self._ctx = ctx
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        ctx, self._ctx = self._ctx, None
+        await self.executor.run(
+            self._get_commit_policy(ctx), ctx.__aexit__, exc_type, exc_val, exc_tb
+        )
+
+    async def execute(self, message: Message, read_your_writes: bool = False) -> Any:
+        """
+        Executes a message. A query executed with `read_your_writes` reads the primary database instead of
+        a read replica, so it sees changes committed by the unit of work (i.e. a listing created by a command).
+        """
+        policy = self.executor.get_policy(type(message))
+        if not read_your_writes:
+            return await self.executor.run(policy, self.ctx.execute_async, message)
+
+        self.ctx.set_dependency("read_your_writes", True)
+        try:
+            return await self.executor.run(policy, self.ctx.execute_async, message)
+        finally:
+            self.ctx.set_dependency("read_your_writes", False)
+
+    async def run_blocking(self, func: Callable, *args) -> Any:
+        """
+        Runs a synchronous function using dependencies of the unit of work (i.e. a service reading
+        the database with its session) in a worker thread of the executor
+        """
+        return await self.executor.run(
+            ExecutionPolicy.THREADPOOL, maybe_await, func, *args
+        )
+
+    async def commit(self):
+        """Commits changes made so far, next messages are executed in a new transaction of the same session"""
+        await self.executor.run(
+            self._get_commit_policy(self.ctx), maybe_await, self.ctx["commit"]
+        )
+
+    @staticmethod
+    def _get_commit_policy(ctx: TransactionContext) -> ExecutionPolicy:
+        dependency_provider = ctx.dependency_provider
+        if dependency_provider.has_dependency("commit") and not (
+            inspect.iscoroutinefunction(dependency_provider["commit"])
+        ):
+            return ExecutionPolicy.THREADPOOL
+        return ExecutionPolicy.NATIVE
@@ -17,3 +17,13 @@ class EntityNotFoundException(Exception):
         super().__init__(message)
         self.repository = repository
         self.kwargs = kwargs
+
+
+class ConcurrencyException(Exception):
+    """Raised when an entity was changed by another transaction since it was loaded"""
+
+    def __init__(self, repository, **kwargs):
+        message = f"Entity with {kwargs} was changed by another transaction"
+        super().__init__(message)
+        self.repository = repository
+        self.kwargs = kwargs
@@ -1,5 +1,5 @@
 import abc
-from typing import Generic, TypeVar
+from typing import Generic, Iterable, TypeVar
 
 from seedwork.domain.entities import Entity as DomainEntity
 from seedwork.domain.value_objects import GenericUUID
@@ -23,6 +23,10 @@ class GenericRepository(Generic[EntityId, Entity], metaclass=abc.ABCMeta):
     def get_by_id(self, id: EntityId) -> Entity:
         raise NotImplementedError()
 
+    def get_by_ids(self, ids: Iterable[EntityId]) -> list[Entity]:
+        """Returns entities in the order of requested ids"""
+        return [self.get_by_id(id) for id in ids]
+
     @abc.abstractmethod
     def persist(self, entity: Entity):
         raise NotImplementedError()
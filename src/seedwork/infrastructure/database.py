@@ -1,10 +1,23 @@
 import json
 import logging
+import threading
+import time
 import uuid
+from typing import Optional
 
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import exc, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import QueuePool
 from sqlalchemy_utils import force_auto_coercion
 
+from seedwork.application.metrics import Histogram
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib json module is used instead
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,5 +31,223 @@ def _default(val):
     raise TypeError()
 
 
-def dumps(d):
+def dumps(d) -> str:
+    """Serializes values of JSON columns, using orjson (if installed) which is several times faster than json"""
+    if orjson is not None:
+        return orjson.dumps(
+            d, default=_default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
     return json.dumps(d, default=_default)
+
+
+def loads(s):
+    """Deserializes values of JSON columns, see `dumps`"""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+class PinnedSession(Session):
+    """
+    A session which checks out a connection on first use and keeps it until the session is closed,
+    so transactions committed by the session (i.e. at commit points of a unit of work) share one connection,
+    instead of returning it to the pool and checking out a new one after each commit.
+    """
+
+    def __init__(self, engine: Engine, **kwargs):
+        super().__init__(engine, **kwargs)
+        self._engine = engine
+        self._pinned_connection: Optional[Connection] = None
+
+    def get_bind(self, *args, **kwargs):
+        if self._pinned_connection is None:
+            self._pinned_connection = self._engine.connect()
+        return self._pinned_connection
+
+    def close(self):
+        super().close()
+        if self._pinned_connection is not None:
+            self._pinned_connection.close()
+            self._pinned_connection = None
+
+
+class ReadOnlySession(Session):
+    """
+    A session of query handlers, bound to a read replica in AUTOCOMMIT mode (see ContainerProvider), so each
+    statement reads the latest state of the replica without keeping a transaction open. It never flushes,
+    changes made with the session raise an error instead of being written.
+    """
+
+    def __init__(self, bind, **kwargs):
+        super().__init__(bind, autoflush=False, **kwargs)
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Changes cannot be flushed by a read-only session")
+
+
+# time since the last transaction replayed by a replica, 0 if it replayed all received changes (or is a primary)
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaLagMonitor:
+    """
+    Measures staleness of a read replica every `interval` seconds, in a background thread.
+    The replica is stale if it lags behind the primary more than `max_lag` seconds, or if the lag cannot be measured
+    (i.e. the replica is down), in which case queries should read the primary instead.
+    """
+
+    def __init__(self, engine: Engine, max_lag: float = 5.0, interval: float = 1.0):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: Optional[float] = None  # seconds, None until measured
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def measure(self) -> float:
+        try:
+            with self.engine.connect() as connection:
+                self.lag = float(connection.execute(REPLICA_LAG_QUERY).scalar_one())
+        except Exception:
+            logger.exception("measuring replica lag failed")
+            self.lag = float("inf")
+        return self.lag
+
+    def is_stale(self) -> bool:
+        return self.lag is not None and self.lag > self.max_lag
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            self.measure()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="replica-lag-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def render(self, prefix: str = "db_replica") -> str:
+        """Renders the lag in Prometheus text format"""
+        if self.lag is None:
+            lag = "NaN"
+        elif self.lag == float("inf"):
+            lag = "+Inf"
+        else:
+            lag = repr(self.lag)
+        return (
+            f"# TYPE {prefix}_lag_seconds gauge\n"
+            f"{prefix}_lag_seconds {lag}\n"
+            f"# TYPE {prefix}_stale gauge\n"
+            f"{prefix}_stale {int(self.is_stale())}\n"
+        )
+
+
+# upper bounds of buckets of time waited for a connection, in seconds
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    """Saturation of a connection pool: connections checked out, and time waited for a connection"""
+
+    def __init__(self):
+        self.checkouts = 0
+        # checkouts failed, as no connection was returned within the pool timeout
+        self.timeouts = 0
+        self.max_checked_out = 0
+        self.wait = Histogram(POOL_WAIT_BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, wait: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.max_checked_out = max(self.max_checked_out, checked_out)
+            self.wait.observe(wait)
+
+    def observe_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait.observe(wait)
+
+    def snapshot(self) -> dict:
+        """Returns a consistent copy of the stats, with cumulative counts of wait time buckets"""
+        with self._lock:
+            return dict(
+                max_checked_out=self.max_checked_out,
+                checkouts=self.checkouts,
+                timeouts=self.timeouts,
+                wait_seconds=self.wait.sum,
+                wait_counts=self.wait.cumulative_counts(),
+            )
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A QueuePool measuring time spent waiting for a connection (see PoolStats)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.observe_timeout(time.perf_counter() - start)
+            raise
+        self.stats.observe_checkout(time.perf_counter() - start, self.checkedout())
+        return record
+
+    def recreate(self):
+        # a pool is recreated i.e. by `engine.dispose()`, stats are kept
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def status_dict(self) -> dict:
+        stats = self.stats.snapshot()
+        del stats["wait_counts"]
+        return dict(
+            size=self.size(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            **stats,
+        )
+
+    def render(self, engine: str, prefix: str = "db_pool") -> str:
+        """Renders stats of the pool in Prometheus text format, labelled with a name of its engine"""
+        stats = self.stats.snapshot()
+        label = f'engine="{engine}"'
+        lines = [
+            f"# TYPE {prefix}_size gauge",
+            f"{prefix}_size{{{label}}} {self.size()}",
+            f"# TYPE {prefix}_checked_out gauge",
+            f"{prefix}_checked_out{{{label}}} {self.checkedout()}",
+            f"# TYPE {prefix}_max_checked_out gauge",
+            f"{prefix}_max_checked_out{{{label}}} {stats['max_checked_out']}",
+            f"# TYPE {prefix}_timeouts_total counter",
+            f"{prefix}_timeouts_total{{{label}}} {stats['timeouts']}",
+            f"# TYPE {prefix}_wait_seconds histogram",
+        ]
+        name = f"{prefix}_wait_seconds"
+        bounds = [repr(bound) for bound in self.stats.wait.bounds] + ["+Inf"]
+        for bound, count in zip(bounds, stats["wait_counts"]):
+            lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+        lines.append(f"{name}_sum{{{label}}} {stats['wait_seconds']!r}")
+        lines.append(f"{name}_count{{{label}}} {stats['wait_counts'][-1]}")
+        return "\n".join(lines) + "\n"
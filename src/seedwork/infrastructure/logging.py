@@ -1,9 +1,16 @@
+import atexit
 import logging
+import queue
+import random
+import threading
 import uuid
 from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
 from logging import Logger
 from logging.config import dictConfig
+from logging.handlers import BaseRotatingHandler, QueueHandler
+from typing import Any, Callable, Optional
 
 from pythonjsonlogger import jsonlogger
 
@@ -33,13 +40,149 @@ class ElkJsonFormatter(jsonlogger.JsonFormatter):
 
     def add_fields(self, log_record, record, message_dict):
         super(ElkJsonFormatter, self).add_fields(log_record, record, message_dict)
-        log_record["@timestamp"] = datetime.now().isoformat()
+        # the time of the record, which may be formatted later (i.e. in a background thread)
+        log_record["@timestamp"] = datetime.fromtimestamp(record.created).isoformat()
         log_record["level"] = record.levelname
         log_record["logger"] = record.name
 
 
+@dataclass
+class LogQueueStats:
+    enqueued: int = 0
+    dropped: int = 0  # records dropped, as the queue was full
+    sampled_out: int = 0  # records skipped by sampling
+    batches: int = 0  # batches of records handled by the listener
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Enqueues records without blocking, to be handled in a background thread (see LogBatchListener).
+    If the queue is full, a record is dropped and counted. Records of levels in `sample_rates` are enqueued
+    with the given probability, i.e. with {logging.DEBUG: 0.1} about every 10th DEBUG record is kept.
+    """
+
+    def __init__(
+        self,
+        queue: queue.Queue,
+        sample_rates: Optional[dict[int, float]] = None,
+        random: Callable[[], float] = random.random,
+    ):
+        super().__init__(queue)
+        self.sample_rates = dict(sample_rates or {})
+        self.stats = LogQueueStats()
+        self._random = random
+
+    def prepare(self, record):
+        """
+        Records of a queue of this process are enqueued as they are, so the message (with `lazy` arguments)
+        is formatted by the listener thread, and `exc_info` is kept for formatters rendering it as a field
+        (i.e. ElkJsonFormatter). Records of other queues (i.e. of other processes) are made picklable by
+        QueueHandler.prepare, which formats them in the calling thread.
+        """
+        if isinstance(self.queue, queue.Queue):
+            return record
+        return super().prepare(record)
+
+    def emit(self, record):
+        # called with the lock of the handler held, so counters are not updated concurrently
+        rate = self.sample_rates.get(record.levelno)
+        if rate is not None and self._random() >= rate:
+            self.stats.sampled_out += 1
+            return
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.stats.dropped += 1
+        except Exception:
+            self.handleError(record)
+        else:
+            self.stats.enqueued += 1
+
+
+class LogBatchListener:
+    """
+    Handles records of a queue in a background thread, in batches of up to `batch_size` records.
+    Stream handlers (i.e. a file handler) write all records of a batch and are flushed once per batch.
+    """
+
+    _sentinel = None
+
+    def __init__(
+        self,
+        queue: queue.Queue,
+        *handlers: logging.Handler,
+        batch_size: int = 100,
+        stats: Optional[LogQueueStats] = None,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.stats = stats or LogQueueStats()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.run, name="log-batch-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Handles records enqueued before stopping, and stops the background thread"""
+        if self._thread is None:
+            return
+        # waits for a free slot of a bounded queue, so records enqueued before stopping are handled
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+    def run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not self._sentinel]
+            if records:
+                self.handle_batch(records)
+            for _ in batch:
+                self.queue.task_done()
+            if len(records) < len(batch):
+                return
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            handler.acquire()
+            try:
+                for record in records:
+                    if record.levelno >= handler.level and handler.filter(record):
+                        self._emit(handler, record)
+                if isinstance(handler, logging.StreamHandler):
+                    handler.flush()
+            finally:
+                handler.release()
+        self.stats.batches += 1
+
+    @staticmethod
+    def _emit(handler: logging.Handler, record: logging.LogRecord) -> None:
+        """Emits a record, a stream is written without flushing it (as StreamHandler.emit does)"""
+        if not isinstance(handler, logging.StreamHandler) or handler.stream is None:
+            handler.emit(record)
+            return
+        rotating = isinstance(handler, BaseRotatingHandler)
+        try:
+            if rotating and handler.shouldRollover(record):
+                handler.doRollover()
+            handler.stream.write(handler.format(record) + handler.terminator)
+        except Exception:
+            handler.handleError(record)
+
+
 class LoggerFactory:
     _configured = False
+    _listener: Optional[LogBatchListener] = None
+    queue_handler: Optional[BoundedQueueHandler] = None
 
     @classmethod
     def configure(
@@ -47,10 +190,21 @@ class LoggerFactory:
         logger_name="app",
         log_filename="./logs.json",
         correlation_id=correlation_id,
+        queue_size=0,
+        debug_sample_rate=1.0,
+        batch_size=100,
     ):
+        """
+        With `queue_size` > 0, records are handled in a background thread (see BoundedQueueHandler),
+        so logging does not block on formatting and writing records. `debug_sample_rate` is a fraction
+        of DEBUG records kept in this mode.
+        """
         cls.logger_name = logger_name
         cls.log_filename = log_filename
         cls.correlation_id = correlation_id
+        cls.queue_size = queue_size
+        cls.debug_sample_rate = debug_sample_rate
+        cls.batch_size = batch_size
         cls._configured = True
 
     @classmethod
@@ -60,6 +214,7 @@ class LoggerFactory:
         """
         if not cls._configured:
             cls.configure()
+        cls.shutdown()
         logging_config = {
             "version": 1,
             "disable_existing_loggers": False,
@@ -143,11 +298,106 @@ class LoggerFactory:
                 name=cls.logger_name, correlation_id=cls.correlation_id
             )
         )
+        if cls.queue_size > 0:
+            cls._start_queue(logger)
         return logger
 
+    @classmethod
+    def _start_queue(cls, logger: Logger):
+        """Moves handlers of a logger behind a queue"""
+        handlers = list(logger.handlers)
+        for handler in handlers:
+            logger.removeHandler(handler)
+        sample_rates = (
+            {logging.DEBUG: cls.debug_sample_rate}
+            if cls.debug_sample_rate < 1
+            else None
+        )
+        cls.queue_handler = BoundedQueueHandler(
+            queue.Queue(cls.queue_size), sample_rates=sample_rates
+        )
+        cls._listener = LogBatchListener(
+            cls.queue_handler.queue,
+            *handlers,
+            batch_size=cls.batch_size,
+            stats=cls.queue_handler.stats,
+        )
+        logger.addHandler(cls.queue_handler)
+        cls._listener.start()
+
+    @classmethod
+    def shutdown(cls):
+        """Handles all queued records and stops the background thread (if logging through a queue)"""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+
+atexit.register(LoggerFactory.shutdown)
+
+
+class lazy:
+    """
+    A log message argument computed only when a record is formatted, i.e.
+    `lazy_logger.debug("Executing %s", lazy(repr, command))` does not repr a command if DEBUG is disabled.
+    """
+
+    __slots__ = ("func", "args", "_value")
+
+    def __init__(self, func: Callable[..., Any], *args):
+        self.func = func
+        self.args = args
+        self._value: Optional[str] = None
+
+    def __str__(self):
+        # a record may be formatted by several handlers
+        if self._value is None:
+            self._value = str(self.func(*self.args))
+        return self._value
+
+    __repr__ = __str__
+
+
+class LazyLogger:
+    """
+    Logs %-style messages (with `lazy` arguments) of hot paths, checking if a level is enabled
+    before a record is created. The wrapped logger (i.e. the lazy `logger`) is resolved on first use,
+    so the check is a lookup in the per-logger cache of `Logger.isEnabledFor`, which is cleared
+    by `setLevel` and `dictConfig`.
+    """
+
+    def __init__(self, logger: Logger):
+        self._wrapped = logger
+        self._logger: Optional[Logger] = None
+
+    @property
+    def logger(self) -> Logger:
+        if self._logger is None:
+            self._logger = logging.getLogger(self._wrapped.name)
+        return self._logger
+
+    def is_enabled_for(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, msg: str, *args, extra: Optional[dict] = None):
+        self._log(logging.DEBUG, msg, args, extra)
+
+    def info(self, msg: str, *args, extra: Optional[dict] = None):
+        self._log(logging.INFO, msg, args, extra)
+
+    def warning(self, msg: str, *args, extra: Optional[dict] = None):
+        self._log(logging.WARNING, msg, args, extra)
+
+    def _log(self, level: int, msg: str, args: tuple, extra: Optional[dict] = None):
+        logger = self.logger
+        if logger.isEnabledFor(level):
+            # a caller of debug/info/warning is the location of a record
+            logger._log(level, msg, args, extra=extra, stacklevel=3)
+
 
 """
 We are making logger globally available, but to make it configurable logger lazy-evaluated.
 Use `LoggerFactory.configure()` to configure the logger prior to its usage
 """
 logger: Logger = SimpleLazyObject(LoggerFactory.create_logger)  # type: ignore
+lazy_logger = LazyLogger(logger)
@@ -0,0 +1,280 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from lato import Application, ApplicationModule
+from lato.message import Event
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Text,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy_utils import UUIDType
+
+from seedwork.infrastructure.database import Base
+from seedwork.infrastructure.logging import logger
+
+
+class OutboxMessageModel(Base):
+    """Event saved in the same transaction as the aggregate that published it"""
+
+    __tablename__ = "outbox"
+    id = Column(UUIDType(binary=False), primary_key=True)  # id of the event
+    event_type = Column(String(255), nullable=False)
+    payload = Column(JSON, nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+    processed_at = Column(DateTime)
+    claimed_until = Column(
+        DateTime
+    )  # a relay delivering the event holds a lease until then
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_pending",
+            occurred_at,
+            postgresql_where=processed_at.is_(None),
+        ),
+    )
+
+
+class InboxMessageModel(Base):
+    """Event handled by a consumer (a subscribed module), used to skip redelivered events"""
+
+    __tablename__ = "inbox"
+    event_id = Column(UUIDType(binary=False), primary_key=True)
+    consumer = Column(String(255), primary_key=True)
+    processed_at = Column(DateTime, nullable=False)
+
+
+def get_event_type_name(event_cls: type) -> str:
+    return f"{event_cls.__module__}.{event_cls.__qualname__}"
+
+
+def get_subscribed_event_types(
+    modules: Iterable[ApplicationModule],
+) -> tuple[type, ...]:
+    """Returns event classes handled by the modules (and their submodules)"""
+    event_types: dict[type, None] = {}  # used as an ordered set
+    for module in modules:
+        for alias in module._handlers:
+            if isinstance(alias, type) and issubclass(alias, Event):
+                event_types[alias] = None
+        event_types.update(
+            dict.fromkeys(get_subscribed_event_types(module._submodules))
+        )
+    return tuple(event_types)
+
+
+class SqlAlchemyOutbox:
+    """Outbox stored in the database session of a transaction, so events are committed together with aggregates"""
+
+    def __init__(self, db_session: Session):
+        self._session = db_session
+
+    def save(self, event: Event):
+        self._session.add(
+            OutboxMessageModel(
+                id=event.id,
+                event_type=get_event_type_name(type(event)),
+                payload=event.model_dump(mode="json"),
+                occurred_at=datetime.utcnow(),
+                attempts=0,
+            )
+        )
+
+
+@dataclass
+class OutboxRelayStats:
+    relayed: int = 0
+    duplicates: int = (
+        0  # events already handled by a consumer, i.e. redelivered after a crash
+    )
+    failed: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0  # time spent relaying events
+    lag_seconds: float = 0.0  # time between saving and relaying the last event
+    max_lag_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Events relayed per second of relaying"""
+        return self.relayed / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class OutboxRelay:
+    """
+    Delivers events from the outbox to the modules subscribed to them.
+
+    Pending events are claimed in batches with `SELECT ... FOR UPDATE SKIP LOCKED`, so multiple relays can run
+    concurrently. A claim is committed right away, as a lease (`claimed_until`) of `claim_timeout` seconds, so row locks
+    are not held while events are delivered. Events claimed by a relay which crashed are claimed again when the lease
+    expires. Each subscribed module handles an event in its own transaction of the application, which also records
+    the event in the inbox of the module. As a result, an event redelivered after a failure is not handled twice.
+    A failed event is retried in subsequent batches, up to `max_attempts` times.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        db_engine,
+        subscribers: Iterable[ApplicationModule],
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        claim_timeout: float = 60.0,
+    ):
+        self.application = application
+        self.db_engine = db_engine
+        self.subscribers = tuple(subscribers)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self.stats = OutboxRelayStats()
+        self._event_types = {
+            get_event_type_name(event_cls): event_cls
+            for event_cls in get_subscribed_event_types(self.subscribers)
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def relay_batch(self) -> int:
+        """Relays a batch of pending events, returns the number of claimed events"""
+        start = time.perf_counter()
+        messages = self._claim_batch()
+        errors = [await self._relay(message) for message in messages]
+        if messages:
+            self._save_results(messages, errors)
+            self.stats.batches += 1
+            self.stats.busy_seconds += time.perf_counter() - start
+        return len(messages)
+
+    async def dispatch(self, event: Event) -> None:
+        """Calls handlers of all subscribed modules, skipping modules which already handled the event"""
+        for module in self.subscribers:
+            handlers = module.get_handlers_for(type(event))
+            if not handlers:
+                continue
+
+            async with self.application.transaction_context() as ctx:
+                session = ctx["db_session"]
+                if session.get(InboxMessageModel, (event.id, module.identifier)):
+                    self.stats.duplicates += 1
+                    continue
+
+                session.add(
+                    InboxMessageModel(
+                        event_id=event.id,
+                        consumer=module.identifier,
+                        processed_at=datetime.utcnow(),
+                    )
+                )
+                ctx.set_dependency("message", event)
+                for handler in handlers:
+                    await ctx.call_async(handler.fn, event)
+
+    async def run(self) -> None:
+        """Relays events until stopped, waiting `poll_interval` seconds when the outbox is drained"""
+        while not self._stop.is_set():
+            try:
+                claimed = await self.relay_batch()
+            except Exception:
+                logger.exception("outbox relay failed")
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Runs the relay in a background thread, with its own event loop"""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self.run(),), name="outbox-relay", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _claim_batch(self) -> list[OutboxMessageModel]:
+        now = datetime.utcnow()
+        with Session(self.db_engine, expire_on_commit=False) as session:
+            messages = (
+                session.execute(
+                    select(OutboxMessageModel)
+                    .where(
+                        OutboxMessageModel.processed_at.is_(None),
+                        OutboxMessageModel.attempts < self.max_attempts,
+                        or_(
+                            OutboxMessageModel.claimed_until.is_(None),
+                            OutboxMessageModel.claimed_until < now,
+                        ),
+                    )
+                    .order_by(OutboxMessageModel.occurred_at)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                .scalars()
+                .all()
+            )
+            for message in messages:
+                message.attempts += 1
+                message.claimed_until = now + timedelta(seconds=self.claim_timeout)
+            session.commit()
+        return list(messages)
+
+    async def _relay(self, message: OutboxMessageModel) -> Optional[str]:
+        """Delivers a claimed event, returns an error if it failed"""
+        try:
+            event = self._event_types[message.event_type].model_validate(
+                message.payload
+            )
+            await self.dispatch(event)
+        except Exception as e:
+            self.stats.failed += 1
+            logger.exception("relaying event %s failed", message.id)
+            return repr(e)
+
+        lag = (datetime.utcnow() - message.occurred_at).total_seconds()
+        self.stats.relayed += 1
+        self.stats.lag_seconds = lag
+        self.stats.max_lag_seconds = max(self.stats.max_lag_seconds, lag)
+        return None
+
+    def _save_results(
+        self, messages: list[OutboxMessageModel], errors: list[Optional[str]]
+    ) -> None:
+        """Marks relayed events as processed, and releases claims of failed events, so they are retried"""
+        relayed_ids = [
+            message.id for message, error in zip(messages, errors) if error is None
+        ]
+        with Session(self.db_engine) as session:
+            if relayed_ids:
+                session.execute(
+                    update(OutboxMessageModel)
+                    .where(OutboxMessageModel.id.in_(relayed_ids))
+                    .values(processed_at=datetime.utcnow(), claimed_until=None)
+                )
+            for message, error in zip(messages, errors):
+                if error is not None:
+                    session.execute(
+                        update(OutboxMessageModel)
+                        .where(OutboxMessageModel.id == message.id)
+                        .values(last_error=error, claimed_until=None)
+                    )
+            session.commit()
@@ -0,0 +1,94 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Generic, Optional, Sequence, TypeVar, Union
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import Select
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None  # continuation token, None for the last page
+
+
+def encode_cursor(values: Sequence, scope: Optional[str] = None) -> str:
+    """
+    Encodes sort key values of the last item of a page into an opaque continuation token.
+    A cursor with a `scope` (i.e. a sort order of a query) is only valid for the same scope.
+    """
+    payload = list(values) if scope is None else {"scope": scope, "after": list(values)}
+    return base64.urlsafe_b64encode(json.dumps(payload, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, scope: Optional[str] = None) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if scope is not None:
+        if not isinstance(values, dict) or values.get("scope") != scope:
+            raise ValueError("Invalid cursor")
+        values = values.get("after")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def select_keyset_page(
+    statement: Union[Query, Select],
+    keys: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    scope: Optional[str] = None,
+):
+    """
+    Limits a query (or a select statement) to a page of rows ordered by `keys`, which must uniquely identify a row
+    (i.e. end with a primary key). Values of keys are added to selected columns.
+
+    Next pages are selected with a row comparison against the keys of the last row, not with an OFFSET,
+    so each page costs the same and can be served from an index on the keys.
+    """
+    if cursor is not None:
+        after = decode_cursor(cursor, scope)
+        if len(after) != len(keys):
+            raise ValueError("Invalid cursor")
+        row_keys, cursor_keys = tuple_(*keys), tuple_(*after)
+        statement = statement.filter(
+            row_keys < cursor_keys if descending else row_keys > cursor_keys
+        )
+
+    return (
+        statement.add_columns(
+            *(key.label(label) for key, label in zip(keys, _key_labels(len(keys))))
+        )
+        .order_by(*(key.desc() if descending else key.asc() for key in keys))
+        .limit(limit + 1)
+    )
+
+
+def page_of_rows(
+    rows: list, keys_count: int, limit: int, scope: Optional[str] = None
+) -> Page:
+    """Returns a page of rows selected with `select_keyset_page`"""
+    if len(rows) <= limit:
+        return Page(items=rows)
+
+    rows = rows[:limit]
+    last_row = rows[-1]
+    return Page(
+        items=rows,
+        next_cursor=encode_cursor(
+            [getattr(last_row, label) for label in _key_labels(keys_count)], scope
+        ),
+    )
+
+
+def _key_labels(keys_count: int) -> list[str]:
+    return [f"_key_{i}" for i in range(keys_count)]
@@ -1,10 +1,16 @@
-from typing import Any
-
+import copy
+import functools
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import column, func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from seedwork.domain.entities import Entity
 from seedwork.domain.events import DomainEvent
-from seedwork.domain.exceptions import EntityNotFoundException
+from seedwork.domain.exceptions import ConcurrencyException, EntityNotFoundException
 from seedwork.domain.repositories import GenericRepository
 from seedwork.domain.value_objects import GenericUUID
 from seedwork.infrastructure.data_mapper import DataMapper
@@ -21,6 +27,9 @@ class InMemoryRepository(GenericRepository[GenericUUID, Entity]):
         except KeyError:
             raise EntityNotFoundException(repository=self, entity_id=entity_id)
 
+    def get_by_ids(self, ids: Iterable[GenericUUID]) -> list[Entity]:
+        return [self.get_by_id(entity_id) for entity_id in ids]
+
     def remove_by_id(self, entity_id: GenericUUID):
         try:
             del self.objects[entity_id]
@@ -62,57 +71,68 @@ class Removed:
 REMOVED = Removed()
 
 
-class SqlAlchemyGenericRepository(GenericRepository[GenericUUID, Entity]):
+@functools.cache
+def mapped_column_keys(model_class) -> tuple[str, ...]:
+    """Keys of columns of a model mapped from entities (a version column is maintained by the repository)"""
+    version_key = mapped_version_key(model_class)
+    return tuple(
+        attr.key
+        for attr in sa_inspect(model_class).column_attrs
+        if attr.key != version_key
+    )
+
+
+@functools.cache
+def mapped_version_key(model_class) -> Optional[str]:
+    mapper = sa_inspect(model_class)
+    if mapper.version_id_col is None:
+        return None
+    return mapper.get_property_by_column(mapper.version_id_col).key
+
+
+@functools.cache
+def mapped_primary_key(model_class) -> str:
+    mapper = sa_inspect(model_class)
+    (column,) = mapper.primary_key
+    return mapper.get_property_by_column(column).key
+
+
+def fingerprint(instance, column_keys: Iterable[str]) -> int:
+    """A cheap fingerprint of the serialized state of a model instance, used to detect changes"""
+    return hash(repr([getattr(instance, key) for key in column_keys]))
+
+
+class SqlAlchemyRepositoryBase:
+    """
+    Identity map, data mapping and change tracking shared by sync and async SQLAlchemy repositories.
+    Subclasses are only responsible for talking to the database.
+
+    If a model has a version column (`version_id_col` in mapper args), updates are conditional
+    (`UPDATE ... WHERE id = ? AND version = ?`), and ConcurrencyException is raised if an entity
+    was updated by another transaction since it was loaded.
+
+    If `write_behind` is set, `persist` only checks that an entity is known, and all changes are written
+    by `persist_all` (i.e. once per batch of commands targeting the same aggregate).
+    """
+
     mapper_class: type[DataMapper[Entity, Base]]
     model_class: type[Entity]
+    get_by_ids_chunk_size = 1000  # max number of ids in a single IN (...) clause
 
-    def __init__(self, db_session: Session, identity_map=None):
+    def __init__(self, db_session, identity_map=None, write_behind=False):
         self._session = db_session
         self._identity_map = identity_map or dict()
+        self._write_behind = write_behind
+        self._instances: dict[Any, Any] = {}  # model instances known to the session
+        # fingerprints and versions of entities as last seen in the database
+        self._snapshots: dict[Any, int] = {}
+        self._versions: dict[Any, int] = {}
 
     def add(self, entity: Entity):
         self._identity_map[entity.id] = entity
         instance = self.map_entity_to_model(entity)
         self._session.add(instance)
-
-    def remove(self, entity: Entity):
-        self._check_not_removed(entity.id)
-        self._identity_map[entity.id] = REMOVED
-        instance = self._session.query(self.get_model_class()).get(entity.id)
-        self._session.delete(instance)
-
-    def remove_by_id(self, entity_id: GenericUUID):
-        self._check_not_removed(entity_id)
-        self._identity_map[entity_id] = REMOVED
-        instance = self._session.query(self.get_model_class()).get(entity_id)
-        if instance is None:
-            raise EntityNotFoundException(repository=self, entity_id=entity_id)
-        self._session.delete(instance)
-
-    def get_by_id(self, entity_id: GenericUUID):
-        instance = self._session.query(self.get_model_class()).get(entity_id)
-        if instance is None:
-            raise EntityNotFoundException(repository=self, entity_id=entity_id)
-        return self._get_entity(instance)
-
-    def persist(self, entity: Entity):
-        """
-        Persists all the changes made to the entity.
-        Basically, entity is mapped to a model instance using a data_mapper, and then added to sqlalchemy session.
-        """
-        self._check_not_removed(entity.id)
-        assert (
-            entity.id in self._identity_map
-        ), "Cannon persist entity which is unknown to the repo. Did you forget to call repo.add() for this entity?"
-        instance = self.map_entity_to_model(entity)
-        merged = self._session.merge(instance)
-        self._session.add(merged)
-
-    def persist_all(self):
-        """Persists all changes made to entities known to the repository (present in the identity map)."""
-        for entity in self._identity_map.values():
-            if entity is not REMOVED:
-                self.persist(entity)
+        self._track(entity.id, instance, self._fingerprint(instance))
 
     def collect_events(self):
         """Collects all events from entities known to the repository (present in the identity map)."""
@@ -126,9 +146,6 @@ class SqlAlchemyGenericRepository(GenericRepository[GenericUUID, Entity]):
     def data_mapper(self):
         return self.mapper_class()
 
-    def count(self) -> int:
-        return self._session.query(self.model_class).count()
-
     def map_entity_to_model(self, entity: Entity):
         assert self.mapper_class, (
             f"No data_mapper attribute in {self.__class__.__name__}. "
@@ -158,9 +175,345 @@ class SqlAlchemyGenericRepository(GenericRepository[GenericUUID, Entity]):
             return self._identity_map[entity.id]
 
         self._identity_map[entity.id] = entity
+        self._track(
+            entity.id, instance, self._fingerprint(self.map_entity_to_model(entity))
+        )
+        if self._version_key:
+            self._versions[entity.id] = getattr(instance, self._version_key)
         return entity
 
+    def checkpoint(self, entity_ids: Iterable) -> dict:
+        """
+        Copies entities with `entity_ids` (i.e. the aggregate targeted by a command), so changes made to them later
+        can be undone (see `restore`). Other entities known to the repository are kept by reference, changes made
+        to them are not undone.
+        """
+        checkpoint = dict(self._identity_map)
+        memo = {id(REMOVED): REMOVED}
+        for entity_id in entity_ids:
+            if entity_id in checkpoint:
+                checkpoint[entity_id] = copy.deepcopy(checkpoint[entity_id], memo)
+        return checkpoint
+
+    def restore(self, checkpoint: dict) -> None:
+        """
+        Undoes changes made to entities since a checkpoint (i.e. by a command which failed in a batch of commands),
+        entities loaded since then are reloaded on next access. Entities added or removed since then are no longer
+        added or removed, unless the session was already flushed.
+        """
+        removed_ids = {
+            entity_id
+            for entity_id, entity in self._identity_map.items()
+            if entity is REMOVED and checkpoint.get(entity_id) is not REMOVED
+        }
+        model_class = self.get_model_class()
+        for instance in list(self._session.deleted):
+            if (
+                isinstance(instance, model_class)
+                and getattr(instance, self._primary_key) in removed_ids
+            ):
+                self._session.expunge(instance)
+                self._session.add(instance)
+
+        for entity_id in self._identity_map:
+            instance = self._instances.get(entity_id)
+            if entity_id in checkpoint:
+                continue
+            if instance is not None and sa_inspect(instance).pending:
+                self._session.expunge(instance)
+            self._instances.pop(entity_id, None)
+            self._snapshots.pop(entity_id, None)
+            self._versions.pop(entity_id, None)
+        self._identity_map.clear()
+        self._identity_map.update(checkpoint)
+
     def _check_not_removed(self, entity_id):
         assert (
             self._identity_map.get(entity_id, None) is not REMOVED
         ), f"Entity {entity_id} already removed"
+
+    def _get_known(self, entity_id) -> Optional[Entity]:
+        """Returns an entity already present in the identity map, without querying the database"""
+        self._check_not_removed(entity_id)
+        return self._identity_map.get(entity_id)
+
+    def _check_known(self, entity: Entity):
+        self._check_not_removed(entity.id)
+        assert (
+            entity.id in self._identity_map
+        ), "Cannon persist entity which is unknown to the repo. Did you forget to call repo.add() for this entity?"
+
+    def _known_entities(self) -> list[Entity]:
+        return [
+            entity for entity in self._identity_map.values() if entity is not REMOVED
+        ]
+
+    def _ids_to_fetch(self, ids: list) -> list[list]:
+        """Returns chunks of requested ids which are not present in the identity map"""
+        for entity_id in ids:
+            self._check_not_removed(entity_id)
+
+        missing_ids = list(
+            dict.fromkeys(
+                entity_id for entity_id in ids if entity_id not in self._identity_map
+            )
+        )
+        return [
+            missing_ids[start : start + self.get_by_ids_chunk_size]
+            for start in range(0, len(missing_ids), self.get_by_ids_chunk_size)
+        ]
+
+    def _select_by_ids(self, ids: list):
+        model_class = self.get_model_class()
+        return select(model_class).where(
+            getattr(model_class, self._primary_key).in_(ids)
+        )
+
+    def _entities_in_order(self, ids: list) -> list[Entity]:
+        for entity_id in ids:
+            if entity_id not in self._identity_map:
+                raise EntityNotFoundException(repository=self, entity_id=entity_id)
+        return [self._identity_map[entity_id] for entity_id in ids]
+
+    def _collect_changes(self, entities: Iterable[Entity]) -> list[dict]:
+        """
+        Returns column values of changed entities, which were already inserted. Unchanged entities
+        are skipped, and new entities (not yet flushed) are refreshed in the session, as they will be inserted
+        by the session in bulk.
+        """
+        model_class = self.get_model_class()
+        column_keys = mapped_column_keys(model_class)
+        version_key = mapped_version_key(model_class)
+        changed_mappings = []
+        for entity in entities:
+            model = self.map_entity_to_model(entity)
+            model_fingerprint = fingerprint(model, column_keys)
+            if self._snapshots.get(entity.id) == model_fingerprint:
+                continue
+
+            instance = self._instances.get(entity.id)
+            values = {key: getattr(model, key) for key in column_keys}
+            if instance is not None and sa_inspect(instance).pending:
+                # not yet inserted, so it's enough to refresh the state of a pending instance
+                for key, value in values.items():
+                    setattr(instance, key, value)
+            elif instance is None:
+                self._session.add(model)
+                instance = model
+            else:
+                if version_key:
+                    values[version_key] = self._get_version(entity.id)
+                changed_mappings.append(values)
+            self._track(entity.id, instance, model_fingerprint)
+        return changed_mappings
+
+    def _mark_updated(self, changed_mappings: list[dict]):
+        for values in changed_mappings:
+            entity_id = values[self._primary_key]
+            if self._version_key:
+                self._versions[entity_id] = values[self._version_key] + 1
+            # loaded instances are now stale, they will be reloaded on next access
+            instance = self._instances[entity_id]
+            if instance in self._session:
+                self._session.expire(instance)
+
+    def _get_version(self, entity_id) -> int:
+        if entity_id not in self._versions:
+            # an entity added in this transaction, which was already inserted
+            version_key = mapped_version_key(self.get_model_class())
+            self._versions[entity_id] = getattr(self._instances[entity_id], version_key)
+        return self._versions[entity_id]
+
+    def _update_statement(self, changed_mappings: list[dict]):
+        """
+        A single UPDATE of changed entities, joined with their column values (`UPDATE ... FROM (VALUES ...)`),
+        conditional on versions (if a model has them). It returns ids of updated rows.
+        """
+        mapper = sa_inspect(self.get_model_class())
+        keys = list(changed_mappings[0])
+        changes = values(
+            *[
+                column(mapper.columns[key].name, mapper.columns[key].type)
+                for key in keys
+            ],
+            name="changes",
+        ).data([tuple(mapping[key] for key in keys) for mapping in changed_mappings])
+
+        primary_key = mapper.columns[self._primary_key]
+        statement = update(mapper.local_table).where(
+            primary_key == changes.c[primary_key.name]
+        )
+        new_values = {
+            mapper.columns[key]: changes.c[mapper.columns[key].name]
+            for key in keys
+            if key not in (self._primary_key, self._version_key)
+        }
+        if self._version_key:
+            version = mapper.columns[self._version_key]
+            statement = statement.where(version == changes.c[version.name])
+            new_values[version] = version + 1
+        return statement.values(new_values).returning(primary_key)
+
+    def _check_updated(self, changed_mappings: list[dict], updated_ids: list):
+        """Raises ConcurrencyException if entities were updated by another transaction since they were loaded"""
+        if len(updated_ids) == len(changed_mappings):
+            return
+        updated_ids = set(updated_ids)
+        raise ConcurrencyException(
+            repository=self,
+            entity_ids=[
+                values[self._primary_key]
+                for values in changed_mappings
+                if values[self._primary_key] not in updated_ids
+            ],
+        )
+
+    def _track(self, entity_id, instance, instance_fingerprint: int):
+        self._instances[entity_id] = instance
+        self._snapshots[entity_id] = instance_fingerprint
+
+    def _fingerprint(self, instance) -> int:
+        return fingerprint(instance, self._column_keys)
+
+    @property
+    def _column_keys(self) -> tuple[str, ...]:
+        return mapped_column_keys(self.get_model_class())
+
+    @property
+    def _version_key(self) -> Optional[str]:
+        return mapped_version_key(self.get_model_class())
+
+    @property
+    def _primary_key(self) -> str:
+        return mapped_primary_key(self.get_model_class())
+
+
+class SqlAlchemyGenericRepository(
+    SqlAlchemyRepositoryBase, GenericRepository[GenericUUID, Entity]
+):
+    def __init__(self, db_session: Session, identity_map=None, write_behind=False):
+        super().__init__(db_session, identity_map, write_behind)
+
+    def remove(self, entity: Entity):
+        self._check_not_removed(entity.id)
+        self._identity_map[entity.id] = REMOVED
+        instance = self._session.query(self.get_model_class()).get(entity.id)
+        self._session.delete(instance)
+
+    def remove_by_id(self, entity_id: GenericUUID):
+        self._check_not_removed(entity_id)
+        self._identity_map[entity_id] = REMOVED
+        instance = self._session.query(self.get_model_class()).get(entity_id)
+        if instance is None:
+            raise EntityNotFoundException(repository=self, entity_id=entity_id)
+        self._session.delete(instance)
+
+    def get_by_id(self, entity_id: GenericUUID):
+        entity = self._get_known(entity_id)
+        if entity is not None:
+            return entity
+        instance = self._session.query(self.get_model_class()).get(entity_id)
+        if instance is None:
+            raise EntityNotFoundException(repository=self, entity_id=entity_id)
+        return self._get_entity(instance)
+
+    def get_by_ids(self, ids: Iterable[GenericUUID]) -> list[Entity]:
+        """
+        Returns entities in the order of requested ids. Entities present in the identity map are returned
+        as they are, the rest is fetched using a single `WHERE id IN (...)` query per chunk of ids.
+        """
+        ids = list(ids)
+        for chunk in self._ids_to_fetch(ids):
+            for instance in self._session.execute(self._select_by_ids(chunk)).scalars():
+                self._get_entity(instance)
+        return self._entities_in_order(ids)
+
+    def persist(self, entity: Entity):
+        """
+        Persists all the changes made to the entity.
+        Basically, entity is mapped to a model instance using a data_mapper, and then
+        the model is written to the database, but only if it has changed since it was loaded or last persisted.
+        """
+        self._check_known(entity)
+        if not self._write_behind:
+            self._flush_changes([entity])
+
+    def persist_all(self):
+        """Persists all changes made to entities known to the repository (present in the identity map)."""
+        self._flush_changes(self._known_entities())
+
+    def _flush_changes(self, entities: Iterable[Entity]):
+        """Writes changed entities with a single UPDATE statement (see `_update_statement`)"""
+        changed_mappings = self._collect_changes(entities)
+        if changed_mappings:
+            result = self._session.execute(self._update_statement(changed_mappings))
+            self._check_updated(changed_mappings, result.scalars().all())
+            self._mark_updated(changed_mappings)
+
+    def count(self) -> int:
+        return self._session.query(self.model_class).count()
+
+
+class AsyncSqlAlchemyGenericRepository(SqlAlchemyRepositoryBase):
+    """
+    Repository using an AsyncSession, with the same identity map and event collection semantics
+    as SqlAlchemyGenericRepository. Methods talking to the database are coroutines.
+    """
+
+    def __init__(self, db_session: AsyncSession, identity_map=None, write_behind=False):
+        super().__init__(db_session, identity_map, write_behind)
+
+    async def remove(self, entity: Entity):
+        self._check_not_removed(entity.id)
+        self._identity_map[entity.id] = REMOVED
+        instance = await self._session.get(self.get_model_class(), entity.id)
+        await self._session.delete(instance)
+
+    async def remove_by_id(self, entity_id: GenericUUID):
+        self._check_not_removed(entity_id)
+        self._identity_map[entity_id] = REMOVED
+        instance = await self._session.get(self.get_model_class(), entity_id)
+        if instance is None:
+            raise EntityNotFoundException(repository=self, entity_id=entity_id)
+        await self._session.delete(instance)
+
+    async def get_by_id(self, entity_id: GenericUUID):
+        entity = self._get_known(entity_id)
+        if entity is not None:
+            return entity
+        instance = await self._session.get(self.get_model_class(), entity_id)
+        if instance is None:
+            raise EntityNotFoundException(repository=self, entity_id=entity_id)
+        return self._get_entity(instance)
+
+    async def get_by_ids(self, ids: Iterable[GenericUUID]) -> list[Entity]:
+        """Returns entities in the order of requested ids, see SqlAlchemyGenericRepository.get_by_ids"""
+        ids = list(ids)
+        for chunk in self._ids_to_fetch(ids):
+            result = await self._session.execute(self._select_by_ids(chunk))
+            for instance in result.scalars():
+                self._get_entity(instance)
+        return self._entities_in_order(ids)
+
+    async def persist(self, entity: Entity):
+        self._check_known(entity)
+        if not self._write_behind:
+            await self._flush_changes([entity])
+
+    async def persist_all(self):
+        await self._flush_changes(self._known_entities())
+
+    async def _flush_changes(self, entities: Iterable[Entity]):
+        changed_mappings = self._collect_changes(entities)
+        if changed_mappings:
+            result = await self._session.execute(
+                self._update_statement(changed_mappings)
+            )
+            self._check_updated(changed_mappings, result.scalars().all())
+            self._mark_updated(changed_mappings)
+
+    async def count(self) -> int:
+        result = await self._session.execute(
+            select(func.count()).select_from(self.get_model_class())
+        )
+        return result.scalar_one()
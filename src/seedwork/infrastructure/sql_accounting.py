@@ -0,0 +1,153 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from seedwork.infrastructure.logging import lazy_logger
+
+
+class StatementStats:
+    """SQL statements executed in a scope (see `count_statements`), rows they returned or affected, and their time"""
+
+    __slots__ = ("statements", "rows", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+    def add(self, other: "StatementStats") -> None:
+        self.statements += other.statements
+        self.rows += other.rows
+        self.seconds += other.seconds
+
+    def __repr__(self):
+        return f"<StatementStats statements={self.statements} rows={self.rows} seconds={self.seconds:.6f}>"
+
+
+class StatementBudgetExceeded(Exception):
+    def __init__(self, message_type: type, stats: StatementStats, budget: int):
+        super().__init__(
+            f"{message_type.__name__} executed {stats.statements} SQL statements, the budget is {budget}"
+        )
+        self.message_type = message_type
+        self.stats = stats
+        self.budget = budget
+
+
+_current_stats: ContextVar[Optional[StatementStats]] = ContextVar(
+    "current_statement_stats", default=None
+)
+_dispatch_stats: ContextVar[Optional[StatementStats]] = ContextVar(
+    "dispatch_statement_stats", default=None
+)
+
+
+@contextmanager
+def count_statements() -> Iterator[StatementStats]:
+    """
+    Counts statements executed by instrumented engines (see `instrument_engine`) in the current context.
+    Scopes can be nested, statements of a nested scope are counted by the enclosing scope as well.
+    """
+    parent = _current_stats.get()
+    stats = StatementStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if parent is not None:
+            parent.add(stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info["statement_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started_at = conn.info.pop("statement_started_at", None)
+    stats.statements += 1
+    stats.rows += max(cursor.rowcount, 0)  # -1 if not known by the driver
+    if started_at is not None:
+        stats.seconds += time.perf_counter() - started_at
+
+
+def instrument_engine(engine: Engine | AsyncEngine) -> None:
+    """Counts statements executed by an engine, instrumenting it more than once has no effect"""
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class StatementAccounting:
+    """
+    Accounts SQL statements of messages dispatched in a transaction context, by message type.
+
+    A message is accounted for statements of its handler, of the event cascade, and of commits
+    of the transaction. If a message executes more statements than its budget (`budgets`, by message class name),
+    a warning is logged, or StatementBudgetExceeded is raised if `strict` is set (i.e. in tests).
+    Statements are added to `handler_metrics`, if given.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[dict[str, int]] = None,
+        strict: bool = False,
+        handler_metrics=None,
+    ):
+        self.budgets = dict(budgets or {})
+        self.strict = strict
+        self.handler_metrics = handler_metrics
+
+    @contextmanager
+    def dispatch(self) -> Iterator[Optional[StatementStats]]:
+        """Counts statements of a dispatch, yields None for dispatches nested in it (counted by the dispatch)"""
+        if _dispatch_stats.get() is not None:
+            yield None
+            return
+
+        with count_statements() as stats:
+            token = _dispatch_stats.set(stats)
+            try:
+                yield stats
+            finally:
+                _dispatch_stats.reset(token)
+
+    def observe(self, message_type: type, stats: StatementStats) -> None:
+        lazy_logger.debug(
+            "%s executed %d SQL statements (%d rows) in %.6fs",
+            message_type.__name__,
+            stats.statements,
+            stats.rows,
+            stats.seconds,
+            extra=dict(
+                message_type=message_type.__name__,
+                sql_statements=stats.statements,
+                sql_rows=stats.rows,
+                sql_seconds=stats.seconds,
+            ),
+        )
+        if self.handler_metrics is not None:
+            self.handler_metrics.observe_statements(message_type, stats)
+
+        budget = self.budgets.get(message_type.__name__)
+        if budget is None or stats.statements <= budget:
+            return
+        if self.strict:
+            raise StatementBudgetExceeded(message_type, stats, budget)
+        lazy_logger.warning(
+            "%s executed %d SQL statements, the budget is %d",
+            message_type.__name__,
+            stats.statements,
+            budget,
+        )
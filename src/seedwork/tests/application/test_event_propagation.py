@@ -0,0 +1,124 @@
+import pytest
+
+from seedwork.application import Application
+from seedwork.application.command_handlers import CommandResult
+from seedwork.application.commands import Command
+from seedwork.application.events import EventResult
+from seedwork.application.exceptions import EventCascadeLimitExceeded
+from seedwork.domain.events import DomainEvent
+
+
+class ImportBids(Command):
+    count: int
+
+
+class BidImported(DomainEvent):
+    number: int
+
+
+class BidsIndexed(DomainEvent):
+    count: int
+
+
+class Ping(DomainEvent):
+    depth: int
+
+
+class StartPinging(Command):
+    pass
+
+
+def create_app(history):
+    app = Application()
+
+    @app.command_handler
+    def import_bids(command: ImportBids):
+        events = [BidImported(number=i) for i in range(command.count)]
+        return CommandResult.success(events=events)
+
+    @app.domain_event_handler
+    def when_bid_is_imported(event: BidImported):
+        history.append(f"imported {event.number}")
+
+    @app.domain_event_batch_handler
+    def when_bids_are_imported_index_them(events: list[BidImported]):
+        history.append(f"indexing {len(events)} bids")
+        return EventResult.success(event=BidsIndexed(count=len(events)))
+
+    @app.domain_event_handler
+    def when_bids_are_indexed(event: BidsIndexed):
+        history.append(f"indexed {event.count} bids")
+
+    @app.command_handler
+    def start_pinging(command: StartPinging):
+        return CommandResult.success(event=Ping(depth=1))
+
+    @app.domain_event_handler
+    def when_pinged_ping_again(event: Ping):
+        return EventResult.success(event=Ping(depth=event.depth + 1))
+
+    return app
+
+
+@pytest.mark.unit
+def test_batch_handler_receives_all_pending_events_at_once():
+    history = []
+    app = create_app(history)
+
+    with app.transaction_context() as ctx:
+        ctx.execute_command(ImportBids(count=3))
+
+    assert history == [
+        "imported 0",
+        "imported 1",
+        "imported 2",
+        "indexing 3 bids",
+        "indexed 3 bids",
+    ]
+
+
+@pytest.mark.unit
+def test_batch_handler_must_be_annotated_with_list_of_events():
+    app = Application()
+
+    with pytest.raises(
+        TypeError, match="when_bid_is_imported_index_it.*list\\[Event\\]"
+    ):
+
+        @app.domain_event_batch_handler
+        def when_bid_is_imported_index_it(event: BidImported):
+            pass
+
+
+@pytest.mark.unit
+def test_event_fanout_is_counted():
+    app = create_app([])
+
+    with app.transaction_context() as ctx:
+        ctx.execute_command(ImportBids(count=10_000))
+
+    assert ctx.fanout.events == {BidImported: 10_000, BidsIndexed: 1}
+    assert ctx.fanout.max_depth == 2
+    assert app.fanout_counters[ImportBids][BidImported] == 10_000
+
+
+@pytest.mark.unit
+def test_event_cascade_depth_is_limited():
+    app = create_app([])
+    app.max_event_cascade_depth = 5
+
+    with pytest.raises(EventCascadeLimitExceeded):
+        with app.transaction_context() as ctx:
+            ctx.execute_command(StartPinging())
+
+    assert ctx.fanout.max_depth == 6
+
+
+@pytest.mark.unit
+def test_number_of_events_per_command_is_limited():
+    app = create_app([])
+    app.max_events_per_command = 100
+
+    with pytest.raises(EventCascadeLimitExceeded):
+        with app.transaction_context() as ctx:
+            ctx.execute_command(ImportBids(count=101))
@@ -0,0 +1,163 @@
+import threading
+
+import pytest
+from lato import Application, ApplicationModule
+
+from seedwork.application.commands import Command
+from seedwork.application.execution import (
+    ExecutionPolicy,
+    MessageExecutor,
+    RetryPolicy,
+    execution_policy,
+    publishes,
+    retry_policy,
+)
+from seedwork.domain.events import DomainEvent
+from seedwork.domain.exceptions import ConcurrencyException, EntityNotFoundException
+
+
+class GetThreadOfSyncHandler(Command):
+    pass
+
+
+class GetThreadOfAsyncHandler(Command):
+    pass
+
+
+class GetThreadOfBlockingAsyncHandler(Command):
+    pass
+
+
+class FailTwice(Command):
+    exception_cls: type
+
+
+class PublishThreadWasChecked(Command):
+    pass
+
+
+class ThreadWasChecked(DomainEvent):
+    pass
+
+
+module = ApplicationModule("threads")
+attempts: list[int] = []
+
+
+@module.handler(GetThreadOfSyncHandler)
+def get_thread_of_sync_handler(command: GetThreadOfSyncHandler):
+    return threading.current_thread()
+
+
+@module.handler(GetThreadOfAsyncHandler)
+async def get_thread_of_async_handler(command: GetThreadOfAsyncHandler):
+    return threading.current_thread()
+
+
+@module.handler(GetThreadOfBlockingAsyncHandler)
+@execution_policy(ExecutionPolicy.THREADPOOL)
+async def get_thread_of_blocking_async_handler(
+    command: GetThreadOfBlockingAsyncHandler,
+):
+    return threading.current_thread()
+
+
+@module.handler(PublishThreadWasChecked)
+@publishes(ThreadWasChecked)
+async def publish_thread_was_checked(command: PublishThreadWasChecked, publish):
+    publish(ThreadWasChecked())
+
+
+@module.handler(ThreadWasChecked)
+def when_thread_was_checked(event: ThreadWasChecked):
+    pass
+
+
+@module.handler(FailTwice)
+@retry_policy(RetryPolicy(max_attempts=3, backoff=0))
+async def fail_twice(command: FailTwice):
+    attempts.append(len(attempts) + 1)
+    if len(attempts) < 3:
+        raise command.exception_cls(repository=None)
+    return len(attempts)
+
+
+@pytest.fixture
+def executor():
+    application = Application("test")
+    application.include_submodule(module)
+    executor = MessageExecutor(application, max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sync_handler_runs_in_thread_pool(executor):
+    thread = await executor.execute(GetThreadOfSyncHandler())
+
+    assert thread is not threading.current_thread()
+    assert thread.name.startswith("message-executor")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_async_handler_runs_natively(executor):
+    thread = await executor.execute(GetThreadOfAsyncHandler())
+
+    assert thread is threading.current_thread()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_handler_policy_can_be_set_explicitly(executor):
+    thread = await executor.execute(GetThreadOfBlockingAsyncHandler())
+
+    assert thread is not threading.current_thread()
+    assert executor.get_policy(GetThreadOfBlockingAsyncHandler) is (
+        ExecutionPolicy.THREADPOOL
+    )
+
+
+@pytest.mark.unit
+def test_handlers_of_published_events_are_included_in_policy(executor):
+    assert executor.get_policy(PublishThreadWasChecked) is ExecutionPolicy.THREADPOOL
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_event_loops_of_worker_threads_are_closed_on_shutdown(executor):
+    await executor.execute(GetThreadOfSyncHandler())
+    (loop,) = executor._loops
+
+    executor.shutdown()
+
+    assert loop.is_closed()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_route_policy_overrides_handler_policy(executor):
+    thread = await executor.execute(
+        GetThreadOfAsyncHandler(), policy=ExecutionPolicy.THREADPOOL
+    )
+
+    assert thread is not threading.current_thread()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrency_conflict_is_retried(executor):
+    attempts.clear()
+
+    assert await executor.execute(FailTwice(exception_cls=ConcurrencyException)) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_other_exceptions_are_not_retried(executor):
+    attempts.clear()
+
+    with pytest.raises(EntityNotFoundException):
+        await executor.execute(FailTwice(exception_cls=EntityNotFoundException))
+    assert attempts == [1]
@@ -0,0 +1,82 @@
+import pytest
+from lato import ApplicationModule, BasicDependencyProvider
+
+from seedwork.application import DependencyProvider
+from seedwork.application.commands import Command
+from seedwork.application.handler_plans import (
+    HandlerPlan,
+    get_dependency_types,
+    get_handler_plan,
+)
+
+
+class SendPing(Command):
+    pass
+
+
+class Clock:
+    ...
+
+
+def handle_ping(command: SendPing, clock: Clock, correlation_id, trace: list = None):
+    ...
+
+
+async def handle_ping_async(command: SendPing):
+    ...
+
+
+@pytest.mark.unit
+def test_handler_plan_is_compiled_once():
+    assert get_handler_plan(handle_ping) is get_handler_plan(handle_ping)
+
+
+@pytest.mark.unit
+def test_handler_plan_holds_ordered_parameters():
+    plan = HandlerPlan.compile(handle_ping)
+
+    assert [p.name for p in plan.parameters] == [
+        "command",
+        "clock",
+        "correlation_id",
+        "trace",
+    ]
+    assert plan.message_type is SendPing
+    assert plan.parameters[1].lookup_keys == (Clock, "clock")
+    assert plan.parameters[2].lookup_keys == ("correlation_id",)
+    assert not plan.is_async
+    assert HandlerPlan.compile(handle_ping_async).is_async
+
+
+@pytest.mark.unit
+def test_handler_plan_resolves_kwargs_by_type_then_by_name():
+    clock = Clock()
+    dependency_provider = BasicDependencyProvider(correlation_id=1)
+    dependency_provider.register_dependency(Clock, clock)
+    command = SendPing()
+
+    kwargs = get_handler_plan(handle_ping).resolve_kwargs(
+        dependency_provider, args=(command,), kwargs={"trace": []}
+    )
+
+    assert kwargs == dict(command=command, clock=clock, correlation_id=1, trace=[])
+
+
+@pytest.mark.unit
+def test_legacy_dependency_provider_uses_handler_plan():
+    dependency_provider = DependencyProvider(correlation_id=1, clock="clock")
+
+    kwargs = dependency_provider.get_handler_kwargs(handle_ping, trace=[])
+
+    assert kwargs == dict(clock="clock", correlation_id=1, trace=[])
+
+
+@pytest.mark.unit
+def test_dependency_types_are_collected_from_submodules():
+    module = ApplicationModule("module")
+    submodule = ApplicationModule("submodule")
+    module.include_submodule(submodule)
+    submodule.handler(SendPing)(handle_ping)
+
+    # the message and parameters without an annotation are not dependency types
+    assert get_dependency_types(module) == {Clock, list}
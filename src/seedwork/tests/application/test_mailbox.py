@@ -0,0 +1,214 @@
+import asyncio
+
+import pytest
+from lato import Application, ApplicationModule, Event, TransactionContext
+
+from seedwork.application.commands import Command
+from seedwork.application.execution import RetryPolicy, retry_policy
+from seedwork.application.mailbox import AggregateMailboxExecutor, aggregate_mailbox
+from seedwork.domain.exceptions import ConcurrencyException
+
+
+class Deposit(Command):
+    account_id: int
+    amount: int
+
+
+class Withdraw(Command):
+    account_id: int
+    amount: int
+
+
+class OpenAccount(Command):
+    account_id: int
+
+
+class AccountOpened(Event):
+    account_id: int
+
+
+class Accounts:
+    """Repository of account balances, counting writes of changes"""
+
+    def __init__(self):
+        self.balances: dict[int, int] = {}
+        self.writes = 0
+        self.conflicts = 0  # number of next writes failing with a concurrency conflict
+
+    def persist_all(self):
+        if self.conflicts:
+            self.conflicts -= 1
+            raise ConcurrencyException(repository=self)
+        self.writes += 1
+
+    def checkpoint(self, account_ids):
+        return dict(self.balances)
+
+    def restore(self, checkpoint):
+        self.balances = dict(checkpoint)
+
+
+class Statements:
+    """Repository of account statements, resolved with the same parameter name as Accounts"""
+
+    def __init__(self):
+        self.statements: list[int] = []
+        self.writes = 0
+
+    def persist_all(self):
+        self.writes += 1
+
+
+module = ApplicationModule("accounts")
+
+
+@module.handler(Deposit)
+@retry_policy(RetryPolicy(backoff=0))
+@aggregate_mailbox("account_id")
+def deposit(command: Deposit, accounts: Accounts):
+    if command.amount <= 0:
+        raise ValueError("amount must be positive")
+    balance = accounts.balances.get(command.account_id, 0) + command.amount
+    accounts.balances[command.account_id] = balance
+    return balance
+
+
+@module.handler(Withdraw)
+@aggregate_mailbox("account_id")
+def withdraw(command: Withdraw, accounts: Accounts):
+    balance = accounts.balances.get(command.account_id, 0) - command.amount
+    accounts.balances[command.account_id] = balance
+    if balance < 0:
+        raise ValueError("insufficient funds")
+    return balance
+
+
+@module.handler(OpenAccount)
+@aggregate_mailbox("account_id")
+def open_account(command: OpenAccount, accounts: Accounts, ctx: TransactionContext):
+    accounts.balances[command.account_id] = 0
+    ctx.publish(AccountOpened(account_id=command.account_id))
+
+
+@module.handler(AccountOpened)
+def create_statement(event: AccountOpened, accounts: Statements):
+    accounts.statements.append(event.account_id)
+
+
+@pytest.fixture
+def accounts():
+    return Accounts()
+
+
+@pytest.fixture
+def statements():
+    return Statements()
+
+
+@pytest.fixture
+def transactions():
+    return []
+
+
+@pytest.fixture
+def executor(accounts, statements, transactions):
+    application = Application("test", accounts=accounts, statements=statements)
+    application.include_submodule(module)
+
+    @application.on_enter_transaction_context
+    def on_enter_transaction_context(ctx: TransactionContext):
+        transactions.append(ctx)
+
+    executor = AggregateMailboxExecutor(application, max_workers=2, batch_window=0.01)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_commands_of_aggregate_are_executed_in_order_in_one_batch(
+    executor, accounts, transactions
+):
+    results = await asyncio.gather(
+        *(executor.execute(Deposit(account_id=1, amount=i)) for i in range(1, 11))
+    )
+
+    assert results == [sum(range(1, i + 1)) for i in range(1, 11)]
+    assert len(transactions) == 1
+    assert accounts.writes == 1
+    assert executor.stats.batches == 1
+    assert executor.stats.average_batch_size == 10
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rejected_command_does_not_fail_its_batch(executor, accounts):
+    results = await asyncio.gather(
+        executor.execute(Deposit(account_id=1, amount=1)),
+        executor.execute(Deposit(account_id=1, amount=-1)),
+        executor.execute(Deposit(account_id=1, amount=2)),
+        return_exceptions=True,
+    )
+
+    assert results[0] == 1
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 3
+    assert accounts.writes == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_changes_of_failed_command_are_undone(executor, accounts):
+    results = await asyncio.gather(
+        executor.execute(Deposit(account_id=1, amount=5)),
+        executor.execute(Withdraw(account_id=1, amount=10)),
+        executor.execute(Withdraw(account_id=1, amount=3)),
+        return_exceptions=True,
+    )
+
+    assert results[0] == 5
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 2
+    assert accounts.balances == {1: 2}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_aggregates_have_separate_mailboxes(executor, accounts):
+    results = await asyncio.gather(
+        executor.execute(Deposit(account_id=1, amount=1)),
+        executor.execute(Deposit(account_id=2, amount=2)),
+        executor.execute(Deposit(account_id=1, amount=3)),
+    )
+
+    assert results == [1, 2, 4]
+    assert executor.stats.batches == 2
+    assert executor._mailboxes == {}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_batch_is_retried_after_concurrency_conflict(executor, accounts):
+    accounts.conflicts = 1
+
+    results = await asyncio.gather(
+        executor.execute(Deposit(account_id=1, amount=1)),
+        executor.execute(Deposit(account_id=1, amount=2)),
+    )
+
+    # balances are kept in memory by this repository, so the retried batch adds to them again
+    assert results == [4, 6]
+    assert executor.stats.retries == 1
+    assert accounts.writes == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_repositories_resolved_with_same_parameter_name_are_persisted(
+    executor, accounts, statements
+):
+    await executor.execute(OpenAccount(account_id=1))
+
+    assert statements.statements == [1]
+    assert accounts.writes == 1
+    assert statements.writes == 1
@@ -0,0 +1,109 @@
+import pytest
+
+from modules.catalog.application.command import PublishListingDraftCommand
+from modules.catalog.domain.events import ListingPublishedEvent
+from seedwork.application.commands import Command
+from seedwork.application.metrics import HandlerMetrics, Histogram
+from seedwork.domain.events import DomainEvent
+from seedwork.domain.value_objects import GenericUUID
+
+
+class CreateItem(Command):
+    item_id: int
+
+
+class ItemCreated(DomainEvent):
+    item_id: int
+
+
+@pytest.mark.unit
+def test_histogram_counts_observations_in_buckets():
+    histogram = Histogram([0.1, 1.0])
+
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+
+
+@pytest.mark.unit
+def test_event_cascade_is_excluded_from_handler_time():
+    metrics = HandlerMetrics(buckets=[1.0])
+
+    command = metrics.begin_dispatch(CreateItem, dependencies=0.25)
+    event = metrics.begin_dispatch(ItemCreated, dependencies=0.5)
+    metrics.end_dispatch(event, elapsed=2.0, error=False)
+    metrics.end_dispatch(command, elapsed=4.0, error=True)
+
+    command_metrics = metrics.get(CreateItem)
+    assert command_metrics.count == 1
+    assert command_metrics.errors == 1
+    assert command_metrics.events.sum == 2.5
+    assert command_metrics.handler.sum == 1.5
+    assert command_metrics.dependencies.sum == 0.25
+    event_metrics = metrics.get(ItemCreated)
+    assert event_metrics.errors == 0
+    assert event_metrics.handler.sum == 2.0
+    assert event_metrics.events.sum == 0.0
+
+
+@pytest.mark.unit
+def test_dispatches_after_a_nested_one_are_not_nested():
+    metrics = HandlerMetrics()
+
+    first = metrics.begin_dispatch(CreateItem, dependencies=0.0)
+    metrics.end_dispatch(first, elapsed=1.0, error=False)
+    second = metrics.begin_dispatch(CreateItem, dependencies=0.0)
+    metrics.end_dispatch(second, elapsed=1.0, error=False)
+
+    assert second.parent is None
+
+
+@pytest.mark.unit
+def test_metrics_are_rendered_in_prometheus_text_format():
+    metrics = HandlerMetrics(buckets=[0.5])
+    dispatch = metrics.begin_dispatch(CreateItem, dependencies=0.0)
+    metrics.end_dispatch(dispatch, elapsed=0.25, error=False)
+    metrics.observe_commit([CreateItem], 1.0)
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE lato_messages_total counter" in lines
+    assert 'lato_messages_total{message_type="CreateItem"} 1' in lines
+    assert 'lato_message_errors_total{message_type="CreateItem"} 0' in lines
+    assert "# TYPE lato_handler_seconds histogram" in lines
+    assert 'lato_handler_seconds_bucket{message_type="CreateItem",le="0.5"} 1' in lines
+    assert 'lato_handler_seconds_sum{message_type="CreateItem"} 0.25' in lines
+    assert 'lato_commit_seconds_bucket{message_type="CreateItem",le="0.5"} 0' in lines
+    assert 'lato_commit_seconds_bucket{message_type="CreateItem",le="+Inf"} 1' in lines
+    assert 'lato_commit_seconds_count{message_type="CreateItem"} 1' in lines
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_handler_metrics_measure_event_cascade_and_commit(
+    engine, create_application_container, create_listing_draft_command
+):
+    container = create_application_container()
+    app = container.application()
+    metrics = container.handler_metrics()
+    listing_id = GenericUUID.next_id()
+    seller_id = GenericUUID.next_id()
+
+    await app.execute_async(create_listing_draft_command(listing_id, seller_id))
+    await app.execute_async(
+        PublishListingDraftCommand(listing_id=listing_id, seller_id=seller_id)
+    )
+
+    publish_metrics = metrics.get(PublishListingDraftCommand)
+    event_metrics = metrics.get(ListingPublishedEvent)
+    assert publish_metrics.count == 1
+    assert publish_metrics.errors == 0
+    assert event_metrics.count == 1  # handled by the bidding module
+    assert publish_metrics.events.sum >= event_metrics.handler.sum > 0
+    assert publish_metrics.commit.count == 1
+    # commits are measured for top-level messages
+    assert event_metrics.commit.count == 0
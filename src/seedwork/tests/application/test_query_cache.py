@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from seedwork.application.queries import Query
+from seedwork.application.query_cache import CachePolicy, QueryCache
+from seedwork.domain.events import DomainEvent
+
+
+class GetItem(Query):
+    item_id: int
+
+
+class ItemChanged(DomainEvent):
+    item_id: int
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    """Loads values of a key, counting the loads"""
+
+    def __init__(self, value="value"):
+        self.value = value
+        self.loads = 0
+
+    async def __call__(self):
+        self.loads += 1
+        await asyncio.sleep(0)
+        return {"value": self.value}
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    return QueryCache(
+        ttl=10,
+        max_size=2,
+        invalidations={ItemChanged: ["item:{item_id}"]},
+        clock=clock,
+    )
+
+
+@pytest.mark.unit
+def test_policy_formats_key_and_tags_with_query_fields():
+    policy = CachePolicy(key="{item_id}", tags=("item:{item_id}", "items"))
+
+    assert policy.get_key(GetItem(item_id=1)) == "GetItem:1"
+    assert policy.get_tags(GetItem(item_id=1)) == ("item:1", "items")
+    assert CachePolicy().get_key(GetItem(item_id=1)) == 'GetItem:{"item_id":1}'
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cached_result_is_returned_as_a_copy(cache):
+    load = Loader()
+
+    first = await cache.get_or_load("a", (), load)
+    first["value"] = "changed"
+    second = await cache.get_or_load("a", (), load)
+
+    assert second == {"value": "value"}
+    assert load.loads == 1
+    assert cache.stats().hits == 1
+    assert cache.stats().hit_ratio == 0.5
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_expired_result_is_loaded_again(cache, clock):
+    load = Loader()
+
+    await cache.get_or_load("a", (), load)
+    clock.now = 10
+    await cache.get_or_load("a", (), load)
+
+    assert load.loads == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_least_recently_used_result_is_evicted(cache):
+    load = Loader()
+
+    await cache.get_or_load("a", (), load)
+    await cache.get_or_load("b", (), load)
+    await cache.get_or_load("a", (), load)
+    await cache.get_or_load("c", (), load)  # evicts "b"
+    await cache.get_or_load("a", (), load)
+
+    assert load.loads == 3
+    assert cache.stats().evictions == 1
+    assert cache.stats().size == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced(cache):
+    load = Loader()
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("a", (), load) for _ in range(5))
+    )
+
+    assert results == [{"value": "value"}] * 5
+    assert load.loads == 1
+    assert cache.stats().coalesced == 4
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_load_is_not_cached(cache):
+    async def fail():
+        raise LookupError()
+
+    with pytest.raises(LookupError):
+        await cache.get_or_load("a", (), fail)
+
+    assert await cache.get_or_load("a", (), Loader()) == {"value": "value"}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_results_are_invalidated_by_events(cache):
+    load = Loader()
+    await cache.get_or_load("1", ("item:1",), load)
+    await cache.get_or_load("2", ("item:2",), load)
+
+    cache.invalidate(cache.tags_invalidated_by(ItemChanged(item_id=1)))
+    await cache.get_or_load("1", ("item:1",), load)
+    await cache.get_or_load("2", ("item:2",), load)
+
+    assert load.loads == 3
+    assert cache.stats().invalidations == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_result_loaded_during_invalidation_is_not_stored(cache):
+    load = Loader()
+
+    async def load_and_invalidate():
+        result = await load()
+        cache.invalidate(
+            ["item:1"]
+        )  # i.e. a change committed while the result was read
+        return result
+
+    await cache.get_or_load("1", ("item:1",), load_and_invalidate)
+    await cache.get_or_load("1", ("item:1",), load)
+
+    assert load.loads == 2
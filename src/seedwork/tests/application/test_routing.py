@@ -0,0 +1,83 @@
+import pytest
+
+from seedwork.application import Application, ApplicationModule
+from seedwork.application.commands import Command
+from seedwork.domain.events import DomainEvent
+
+
+class SendPing(Command):
+    pass
+
+
+class PingSent(DomainEvent):
+    pass
+
+
+class UrgentPingSent(PingSent):
+    pass
+
+
+@pytest.mark.unit
+def test_routing_table_is_invalidated_on_include_module():
+    app = Application()
+    module = ApplicationModule("ping")
+
+    @module.command_handler
+    def handle_ping(command: SendPing):
+        ...
+
+    routing_table = app.routing_table
+    app.include_module(module)
+
+    assert app.routing_table is not routing_table
+    assert app.get_command_handler(SendPing()) is handle_ping
+
+
+@pytest.mark.unit
+def test_routing_table_is_invalidated_on_handler_registration():
+    app = Application()
+    module = ApplicationModule("ping")
+    app.include_module(module)
+    assert app.get_event_handlers(PingSent()) == []
+
+    @module.domain_event_handler
+    def handle_ping_sent(event: PingSent):
+        ...
+
+    assert app.get_event_handlers(PingSent()) == [handle_ping_sent]
+
+
+@pytest.mark.unit
+def test_event_handlers_are_ordered_by_module_inclusion():
+    app = Application()
+    modules = [ApplicationModule(f"module{i}") for i in range(10)]
+    handlers = []
+    for module in modules:
+
+        def handle_ping_sent(event: PingSent):
+            ...
+
+        module.domain_event_handler(handle_ping_sent)
+        handlers.append(handle_ping_sent)
+        app.include_module(module)
+
+    assert app.get_event_handlers(PingSent()) == handlers
+
+
+@pytest.mark.unit
+def test_event_handlers_are_dispatched_along_mro():
+    app = Application()
+
+    @app.domain_event_handler
+    def handle_ping_sent(event: PingSent):
+        ...
+
+    @app.domain_event_handler
+    def handle_urgent_ping_sent(event: UrgentPingSent):
+        ...
+
+    assert app.get_event_handlers(PingSent()) == [handle_ping_sent]
+    assert app.get_event_handlers(UrgentPingSent()) == [
+        handle_urgent_ping_sent,
+        handle_ping_sent,
+    ]
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+from lato import Application, TransactionContext
+
+from seedwork.application.execution import MessageExecutor
+from seedwork.application.unit_of_work import UnitOfWork
+
+
+@pytest.fixture
+def commit_threads():
+    return []
+
+
+@pytest.fixture
+def executor(commit_threads):
+    application = Application("test")
+
+    @application.on_enter_transaction_context
+    def on_enter_transaction_context(ctx: TransactionContext):
+        ctx.set_dependency(
+            "commit", lambda: commit_threads.append(threading.current_thread())
+        )
+
+    @application.on_exit_transaction_context
+    def on_exit_transaction_context(ctx: TransactionContext, exception=None):
+        ctx["commit"]()
+
+    executor = MessageExecutor(application, max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_synchronous_commits_run_in_worker_thread(executor, commit_threads):
+    async with UnitOfWork(executor) as uow:
+        await uow.commit()
+
+    assert len(commit_threads) == 2
+    assert threading.main_thread() not in commit_threads
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_blocking_function_runs_in_worker_thread(executor):
+    async with UnitOfWork(executor) as uow:
+        thread = await uow.run_blocking(threading.current_thread)
+
+    assert thread is not threading.main_thread()
@@ -0,0 +1,223 @@
+import io
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+from seedwork.infrastructure.logging import (
+    BoundedQueueHandler,
+    ElkJsonFormatter,
+    LazyLogger,
+    LogBatchListener,
+    lazy,
+)
+
+
+class CountingStream(io.StringIO):
+    """A stream counting flushes"""
+
+    flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def create_record(level=logging.INFO, msg="message", args=()):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+@pytest.mark.unit
+def test_record_is_dropped_when_queue_is_full():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+
+    for i in range(3):
+        handler.handle(create_record(msg="message %d", args=(i,)))
+
+    assert handler.stats.enqueued == 2
+    assert handler.stats.dropped == 1
+    assert handler.queue.get_nowait().getMessage() == "message 0"
+
+
+@pytest.mark.unit
+def test_debug_records_are_sampled():
+    samples = iter([0.05, 0.5, 0.95])
+    handler = BoundedQueueHandler(
+        queue.Queue(), sample_rates={logging.DEBUG: 0.1}, random=lambda: next(samples)
+    )
+
+    for _ in range(3):
+        handler.handle(create_record(level=logging.DEBUG))
+    handler.handle(create_record(level=logging.INFO))
+
+    assert handler.stats.enqueued == 2
+    assert handler.stats.sampled_out == 2
+
+
+@pytest.mark.unit
+def test_listener_writes_records_in_batches_and_flushes_on_stop():
+    records: queue.Queue = queue.Queue()
+    stream = CountingStream()
+    stream_handler = logging.StreamHandler(stream)
+    handler = BoundedQueueHandler(records)
+    for i in range(10):
+        handler.handle(create_record(msg="message %d", args=(i,)))
+    listener = LogBatchListener(records, stream_handler, batch_size=4)
+
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue().splitlines() == [f"message {i}" for i in range(10)]
+    assert listener.stats.batches == 3
+    assert stream.flushes == 3
+
+
+@pytest.mark.unit
+def test_lazy_arguments_are_formatted_by_listener():
+    records: queue.Queue = queue.Queue()
+    stream = io.StringIO()
+    handler = BoundedQueueHandler(records)
+    thread_name = lazy(lambda: threading.current_thread().name)
+    handler.handle(create_record(msg="formatted in %s", args=(thread_name,)))
+    listener = LogBatchListener(records, logging.StreamHandler(stream))
+
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue() == "formatted in log-batch-listener\n"
+
+
+@pytest.mark.unit
+def test_exception_is_formatted_as_json_field_by_listener():
+    records: queue.Queue = queue.Queue()
+    stream = io.StringIO()
+    json_handler = logging.StreamHandler(stream)
+    json_handler.setFormatter(ElkJsonFormatter())
+    test_logger = logging.getLogger("test_queue_exception")
+    test_logger.propagate = False
+    queue_handler = BoundedQueueHandler(records)
+    test_logger.addHandler(queue_handler)
+    listener = LogBatchListener(records, json_handler)
+
+    try:
+        raise ValueError("invalid value")
+    except ValueError:
+        test_logger.exception("failed with %s", "error")
+    finally:
+        test_logger.removeHandler(queue_handler)
+    listener.start()
+    listener.stop()
+
+    document = json.loads(stream.getvalue())
+    assert document["message"] == "failed with error"
+    assert document["exc_info"].startswith("Traceback")
+    assert "ValueError: invalid value" in document["exc_info"]
+
+
+@pytest.mark.unit
+def test_listener_respects_handler_level():
+    records: queue.Queue = queue.Queue()
+    stream = io.StringIO()
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setLevel(logging.WARNING)
+    records.put(create_record(level=logging.INFO, msg="info"))
+    records.put(create_record(level=logging.WARNING, msg="warning"))
+    listener = LogBatchListener(records, stream_handler)
+
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue() == "warning\n"
+
+
+@pytest.mark.unit
+def test_listener_rolls_over_rotating_file_handler(tmp_path):
+    records: queue.Queue = queue.Queue()
+    file_handler = RotatingFileHandler(
+        tmp_path / "logs.json", maxBytes=25, backupCount=5
+    )
+    for i in range(4):
+        records.put(create_record(msg="message %d", args=(i,)))
+    listener = LogBatchListener(records, file_handler)
+
+    listener.start()
+    listener.stop()
+    file_handler.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "logs.json",
+        "logs.json.1",
+    ]
+    assert (tmp_path / "logs.json").read_text() == "message 2\nmessage 3\n"
+
+
+@pytest.fixture
+def stream_logger():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(funcName)s %(message)s"))
+    test_logger = logging.getLogger("test_lazy_logger")
+    test_logger.addHandler(handler)
+    test_logger.propagate = False
+    yield test_logger, stream
+    test_logger.removeHandler(handler)
+
+
+@pytest.mark.unit
+def test_lazy_message_is_not_built_when_level_is_disabled(stream_logger):
+    test_logger, stream = stream_logger
+    test_logger.setLevel(logging.INFO)
+    calls = []
+    lazy_logger = LazyLogger(test_logger)
+
+    lazy_logger.debug("debug %s", lazy(calls.append, "debug"))
+    lazy_logger.info("info %s", lazy(lambda: calls.append("info") or "built"))
+
+    assert calls == ["info"]
+    assert stream.getvalue() == (
+        "test_lazy_message_is_not_built_when_level_is_disabled info built\n"
+    )
+
+
+@pytest.mark.unit
+def test_lazy_message_is_built_once_for_all_handlers(stream_logger):
+    test_logger, stream = stream_logger
+    test_logger.setLevel(logging.DEBUG)
+    other_stream = io.StringIO()
+    other_handler = logging.StreamHandler(other_stream)
+    test_logger.addHandler(other_handler)
+    calls = []
+
+    try:
+        LazyLogger(test_logger).debug("%s", lazy(lambda: calls.append(1) or "built"))
+    finally:
+        test_logger.removeHandler(other_handler)
+
+    assert calls == [1]
+    assert other_stream.getvalue() == "built\n"
+
+
+@pytest.mark.unit
+def test_lazy_logger_follows_level_changes(stream_logger):
+    test_logger, stream = stream_logger
+    lazy_logger = LazyLogger(test_logger)
+    test_logger.setLevel(logging.INFO)
+    assert not lazy_logger.is_enabled_for(logging.DEBUG)
+
+    test_logger.setLevel(logging.DEBUG)
+
+    assert lazy_logger.is_enabled_for(logging.DEBUG)
+
+
+@pytest.mark.unit
+def test_elk_timestamp_is_time_of_record():
+    record = create_record()
+    record.created = datetime(2024, 1, 2, 3, 4, 5).timestamp()
+
+    document = json.loads(ElkJsonFormatter().format(record))
+
+    assert document["@timestamp"] == "2024-01-02T03:04:05"
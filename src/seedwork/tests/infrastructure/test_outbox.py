@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+
+import pytest
+from lato import Application, ApplicationModule, TransactionContext
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from seedwork.domain.events import DomainEvent
+from seedwork.infrastructure.outbox import (
+    InboxMessageModel,
+    OutboxMessageModel,
+    OutboxRelay,
+    SqlAlchemyOutbox,
+    get_subscribed_event_types,
+)
+
+
+class SomethingHappened(DomainEvent):
+    value: int
+
+
+class NothingHappened(DomainEvent):
+    ...
+
+
+@pytest.fixture
+def engine():
+    # SQLite stand-in for Postgres, it has no row locks, so SKIP LOCKED is not rendered
+    engine = create_engine("sqlite://")
+    OutboxMessageModel.metadata.create_all(
+        engine, tables=[OutboxMessageModel.__table__, InboxMessageModel.__table__]
+    )
+    return engine
+
+
+@pytest.fixture
+def handled_events():
+    return []
+
+
+@pytest.fixture
+def subscribers(handled_events):
+    module = ApplicationModule("subscriber")
+
+    @module.handler(SomethingHappened)
+    def on_something_happened(event: SomethingHappened):
+        if event.value < 0:
+            raise ValueError("negative value")
+        handled_events.append(event)
+
+    return [module]
+
+
+@pytest.fixture
+def application(engine):
+    application = Application("test")
+
+    @application.on_enter_transaction_context
+    def on_enter_transaction_context(ctx: TransactionContext):
+        ctx.set_dependencies(db_session=Session(engine))
+
+    @application.on_exit_transaction_context
+    def on_exit_transaction_context(ctx: TransactionContext, exception=None):
+        session = ctx["db_session"]
+        if exception:
+            session.rollback()
+        else:
+            session.commit()
+        session.close()
+
+    return application
+
+
+def save_events(engine, *events):
+    with Session(engine) as session:
+        outbox = SqlAlchemyOutbox(db_session=session)
+        for event in events:
+            outbox.save(event)
+        session.commit()
+
+
+def get_messages(engine):
+    with Session(engine) as session:
+        return session.query(OutboxMessageModel).all()
+
+
+@pytest.mark.unit
+def test_subscribed_event_types(subscribers):
+    assert get_subscribed_event_types(subscribers) == (SomethingHappened,)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_relay_delivers_saved_events_in_batches(
+    engine, application, subscribers, handled_events
+):
+    events = [SomethingHappened(value=i) for i in range(3)]
+    save_events(engine, *events)
+    relay = OutboxRelay(application, engine, subscribers, batch_size=2)
+
+    assert await relay.relay_batch() == 2
+    assert await relay.relay_batch() == 1
+    assert await relay.relay_batch() == 0
+
+    assert handled_events == events
+    assert all(message.processed_at for message in get_messages(engine))
+    assert relay.stats.relayed == 3
+    assert relay.stats.batches == 2
+    assert relay.stats.max_lag_seconds >= relay.stats.lag_seconds >= 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_redelivered_event_is_handled_once(
+    engine, application, subscribers, handled_events
+):
+    event = SomethingHappened(value=1)
+    relay = OutboxRelay(application, engine, subscribers)
+
+    await relay.dispatch(event)
+    await relay.dispatch(event)
+
+    assert handled_events == [event]
+    assert relay.stats.duplicates == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_event_is_retried_up_to_max_attempts(
+    engine, application, subscribers, handled_events
+):
+    save_events(engine, SomethingHappened(value=-1))
+    relay = OutboxRelay(application, engine, subscribers, max_attempts=2)
+
+    assert await relay.relay_batch() == 1
+    assert await relay.relay_batch() == 1
+    assert await relay.relay_batch() == 0
+
+    (message,) = get_messages(engine)
+    assert message.processed_at is None
+    assert message.attempts == 2
+    assert "negative value" in message.last_error
+    assert relay.stats.failed == 2
+    with Session(engine) as session:
+        # the inbox entry is rolled back together with the handler
+        assert session.query(InboxMessageModel).count() == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_claimed_event_is_relayed_again_when_claim_expires(
+    engine, application, subscribers, handled_events
+):
+    event = SomethingHappened(value=1)
+    save_events(engine, event)
+    # a relay which claimed the event and crashed before delivering it
+    OutboxRelay(application, engine, subscribers, claim_timeout=60)._claim_batch()
+    relay = OutboxRelay(application, engine, subscribers)
+
+    assert await relay.relay_batch() == 0
+
+    with Session(engine) as session:
+        session.query(OutboxMessageModel).update(
+            {OutboxMessageModel.claimed_until: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        session.commit()
+
+    assert await relay.relay_batch() == 1
+    assert handled_events == [event]
+    (message,) = get_messages(engine)
+    assert message.attempts == 2
+    assert message.claimed_until is None
@@ -54,3 +54,16 @@ def test_InMemoryRepository_remove_by_id_raises_exception():
     repository = InMemoryRepository()
     with pytest.raises(EntityNotFoundException):
         repository.remove_by_id(Person.next_id())
+
+
+@pytest.mark.unit
+def test_InMemoryRepository_get_by_ids_returns_entities_in_requested_order():
+    person1 = Person(id=Person.next_id(), first_name="John", last_name="Doe")
+    person2 = Person(id=Person.next_id(), first_name="Mary", last_name="Doe")
+    repository = InMemoryRepository()
+    repository.add(person1)
+    repository.add(person2)
+
+    assert repository.get_by_ids([person2.id, person1.id]) == [person2, person1]
+    with pytest.raises(EntityNotFoundException):
+        repository.get_by_ids([person1.id, Person.next_id()])
@@ -0,0 +1,134 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from modules.catalog.application.command import (
+    CreateListingDraftCommand,
+    PublishListingDraftCommand,
+)
+from modules.catalog.domain.events import ListingPublishedEvent
+from seedwork.application.commands import Command
+from seedwork.application.metrics import HandlerMetrics
+from seedwork.domain.value_objects import GenericUUID
+from seedwork.infrastructure.sql_accounting import (
+    StatementAccounting,
+    StatementBudgetExceeded,
+    StatementStats,
+    count_statements,
+    instrument_engine,
+)
+
+
+class CreateItem(Command):
+    item_id: int
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+    return engine
+
+
+def create_stats(statements):
+    stats = StatementStats()
+    stats.statements = statements
+    return stats
+
+
+@pytest.mark.unit
+def test_statements_and_rows_are_counted(sqlite_engine):
+    with sqlite_engine.begin() as connection, count_statements() as stats:
+        connection.execute(text("INSERT INTO item (id) VALUES (1), (2)"))
+        connection.execute(text("DELETE FROM item"))
+
+    assert stats.statements == 2
+    assert stats.rows == 4
+    assert stats.seconds > 0
+
+
+@pytest.mark.unit
+def test_statements_of_nested_scope_are_counted_by_enclosing_scope(sqlite_engine):
+    with sqlite_engine.connect() as connection:
+        with count_statements() as outer:
+            connection.execute(text("SELECT 1"))
+            with count_statements() as inner:
+                connection.execute(text("SELECT 2"))
+
+    assert inner.statements == 1
+    assert outer.statements == 2
+
+
+@pytest.mark.unit
+def test_engine_instrumented_twice_counts_statements_once(sqlite_engine):
+    instrument_engine(sqlite_engine)
+
+    with sqlite_engine.connect() as connection, count_statements() as stats:
+        connection.execute(text("SELECT 1"))
+
+    assert stats.statements == 1
+
+
+@pytest.mark.unit
+def test_nested_dispatch_is_counted_by_top_level_dispatch(sqlite_engine):
+    accounting = StatementAccounting()
+
+    with sqlite_engine.connect() as connection:
+        with accounting.dispatch() as stats:
+            connection.execute(text("SELECT 1"))
+            with accounting.dispatch() as nested_stats:
+                connection.execute(text("SELECT 2"))
+
+    assert nested_stats is None
+    assert stats.statements == 2
+
+
+@pytest.mark.unit
+def test_exceeded_budget_raises_exception_in_strict_mode():
+    accounting = StatementAccounting(budgets={"CreateItem": 2}, strict=True)
+
+    accounting.observe(CreateItem, create_stats(2))
+    with pytest.raises(StatementBudgetExceeded):
+        accounting.observe(CreateItem, create_stats(3))
+
+
+@pytest.mark.unit
+def test_statements_are_added_to_handler_metrics():
+    handler_metrics = HandlerMetrics()
+    accounting = StatementAccounting(
+        budgets={"CreateItem": 1}, handler_metrics=handler_metrics
+    )
+
+    accounting.observe(CreateItem, create_stats(3))
+
+    assert handler_metrics.get(CreateItem).sql_statements == 3
+    assert 'lato_sql_statements_total{message_type="CreateItem"} 3' in (
+        handler_metrics.render().splitlines()
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_statements_of_commands_are_counted_and_checked_against_budget(
+    engine, create_application_container, create_listing_draft_command
+):
+    container = create_application_container(
+        SQL_STATEMENT_BUDGETS={"PublishListingDraftCommand": 1},
+        SQL_STATEMENT_BUDGET_STRICT=True,
+    )
+    app = container.application()
+    metrics = container.handler_metrics()
+    listing_id = GenericUUID.next_id()
+    seller_id = GenericUUID.next_id()
+
+    await app.execute_async(create_listing_draft_command(listing_id, seller_id))
+    with pytest.raises(StatementBudgetExceeded):
+        await app.execute_async(
+            PublishListingDraftCommand(listing_id=listing_id, seller_id=seller_id)
+        )
+
+    assert metrics.get(CreateListingDraftCommand).sql_statements == 1  # INSERT
+    assert metrics.get(PublishListingDraftCommand).sql_statements > 1
+    # statements of event handlers are counted by the command
+    assert metrics.get(ListingPublishedEvent).sql_statements == 0
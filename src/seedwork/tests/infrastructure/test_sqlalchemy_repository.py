@@ -2,7 +2,7 @@ import uuid
 from dataclasses import dataclass
 
 import pytest
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, event
 from sqlalchemy.orm import Session
 from sqlalchemy_utils import UUIDType
 
@@ -168,3 +168,150 @@ def test_sqlalchemy_repository_remove_by_id_raises_exception(db_session):
     repository = PersonSqlAlchemyRepository(db_session=db_session)
     with pytest.raises(EntityNotFoundException):
         repository.remove_by_id(Person.next_id())
+
+
+@pytest.mark.integration
+def test_sqlalchemy_repository_persist_all_writes_only_changed_entities(engine):
+    # arrange
+    people = [
+        Person(id=Person.next_id(), first_name=f"John {i}", last_name="Doe")
+        for i in range(5)
+    ]
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        for person in people:
+            repository.add(person)
+        db_session.commit()
+
+    statements = []
+
+    def count_statements(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    # act
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        loaded = [repository.get_by_id(person.id) for person in people]
+        loaded[0].first_name = "Johnny"
+        loaded[1].first_name = "Jack"
+
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            repository.persist_all()
+            db_session.flush()
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+        db_session.commit()
+
+    # assert
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE person")
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        assert [repository.get_by_id(person.id).first_name for person in people] == [
+            "Johnny",
+            "Jack",
+            "John 2",
+            "John 3",
+            "John 4",
+        ]
+
+
+@pytest.mark.integration
+def test_sqlalchemy_repository_persist_all_refreshes_new_entities(engine):
+    # arrange
+    person = Person(id=Person.next_id(), first_name="John", last_name="Doe")
+
+    # act
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        repository.add(person)
+        person.last_name = "Smith"
+        repository.persist_all()
+        db_session.commit()
+
+    # assert
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        assert repository.get_by_id(person.id).last_name == "Smith"
+
+
+@pytest.mark.integration
+def test_sqlalchemy_repository_restore_undoes_changes_since_checkpoint(engine):
+    # arrange
+    john = Person(id=Person.next_id(), first_name="John", last_name="Doe")
+    jane = Person(id=Person.next_id(), first_name="Jane", last_name="Doe")
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        repository.add(john)
+        repository.add(jane)
+        db_session.commit()
+
+    # act
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(
+            db_session=db_session, write_behind=True
+        )
+        repository.get_by_id(john.id).first_name = "Johnny"
+        checkpoint = repository.checkpoint([john.id])
+        repository.get_by_id(john.id).last_name = "Smith"
+        repository.remove_by_id(jane.id)
+        added = Person(id=Person.next_id(), first_name="Jack", last_name="Doe")
+        repository.add(added)
+        repository.restore(checkpoint)
+        repository.persist_all()
+        db_session.commit()
+
+    # assert
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        loaded = repository.get_by_id(john.id)
+        assert (loaded.first_name, loaded.last_name) == ("Johnny", "Doe")
+        assert repository.get_by_id(jane.id) == jane
+        assert repository.count() == 2
+
+
+@pytest.mark.integration
+def test_sqlalchemy_repository_get_by_ids(engine):
+    # arrange
+    people = [
+        Person(id=Person.next_id(), first_name=f"John {i}", last_name="Doe")
+        for i in range(5)
+    ]
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        for person in people:
+            repository.add(person)
+        db_session.commit()
+
+    statements = []
+
+    def count_statements(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    # act
+    with Session(engine) as db_session:
+        repository = PersonSqlAlchemyRepository(db_session=db_session)
+        repository.get_by_ids_chunk_size = 2
+        already_loaded = repository.get_by_id(people[3].id)
+
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            result = repository.get_by_ids([person.id for person in reversed(people)])
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+
+    # assert
+    assert result == list(reversed(people))
+    assert result[1] is already_loaded
+    assert len(statements) == 2  # 4 missing ids, 2 per chunk
+
+
+@pytest.mark.integration
+def test_sqlalchemy_repository_get_by_ids_raises_exception(db_session):
+    person = Person(id=Person.next_id(), first_name="John", last_name="Doe")
+    repository = PersonSqlAlchemyRepository(db_session=db_session)
+    repository.add(person)
+
+    with pytest.raises(EntityNotFoundException):
+        repository.get_by_ids([person.id, Person.next_id()])